@@ -0,0 +1,62 @@
+"""
+批量校验的数值核心：对 (N, 9) 数组逐行检查温度、压力、摩尔分数范围与摩尔分数之和，
+返回每行的违规位掩码。安装了 numba 时 JIT 编译逐行循环，否则退回 numpy 整列运算。
+"""
+
+import numpy
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None
+
+
+# 违规位
+TEMPERATURE_OUT = 1
+PRESSURE_OUT = 2
+FRACTION_OUT = 4
+SUM_OUT = 8
+
+
+def _violation_mask_loop(arr, lower, upper, tolerance):
+    """逐行循环版本（供 numba 编译）；摩尔分数按列顺序累加，与逐条校验的舍入一致"""
+    n, m = arr.shape
+    out = numpy.zeros(n, dtype=numpy.uint8)
+    for i in range(n):
+        flags = 0
+        for j in range(m):
+            value = arr[i, j]
+            if value < lower[j] or value > upper[j]:
+                if j == 0:
+                    flags |= TEMPERATURE_OUT
+                elif j == 1:
+                    flags |= PRESSURE_OUT
+                else:
+                    flags |= FRACTION_OUT
+        total = 0.0
+        for j in range(2, m):
+            total += arr[i, j]
+        if total == 0.0 or abs(total - 1.0) > tolerance:
+            flags |= SUM_OUT
+        out[i] = flags
+    return out
+
+
+def _violation_mask_numpy(arr, lower, upper, tolerance):
+    """numpy 整列版本"""
+    out_of_range = (arr < lower) | (arr > upper)
+    mask = out_of_range[:, 0] * numpy.uint8(TEMPERATURE_OUT)
+    mask |= out_of_range[:, 1] * numpy.uint8(PRESSURE_OUT)
+    mask |= out_of_range[:, 2:].any(axis=1) * numpy.uint8(FRACTION_OUT)
+    total = arr[:, 2].copy()
+    for j in range(3, arr.shape[1]):
+        total += arr[:, j]
+    mask |= ((total == 0) | (numpy.abs(total - 1.0) > tolerance)) * numpy.uint8(SUM_OUT)
+    return mask
+
+
+# 不开启 fastmath：它假定没有 NaN，会改变 NaN 比较结果，与逐条校验不一致
+if njit is not None:
+    violation_mask = njit(cache=True)(_violation_mask_loop)
+else:
+    violation_mask = _violation_mask_numpy
@@ -3,20 +3,43 @@
 """
 
 import base64
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
 import hashlib
 import hmac
 import json
+import multiprocessing
 import os
+import re
+import secrets
+import threading
 import time
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, List, Tuple
 
-from backend.db import open_security_connection
+try:
+    from fastpbkdf2 import pbkdf2_hmac as _fast_pbkdf2_hmac
+except ImportError:  # pragma: no cover
+    _fast_pbkdf2_hmac = None
+
+try:
+    import pybase64 as _b64
+except ImportError:  # pragma: no cover
+    _b64 = base64
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from backend.db import get_security_connection, is_security_mysql
 # ==================== 配置 ====================
 
 # JWT 密钥（生产环境应使用环境变量）
 DEFAULT_SECRET_KEY = "your-super-secret-key-change-in-production-2024"
 SECRET_KEY = os.getenv("SECRET_KEY", DEFAULT_SECRET_KEY)
+_SECRET_BYTES = SECRET_KEY.encode('utf-8')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24小时
 
@@ -36,20 +59,157 @@ ADMIN_USERS = {
 # 角色列表
 ALLOWED_ROLES = {"admin", "user"}
 
+# 已验证 Token 的进程内缓存（秒），0 表示禁用
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "5"))
+TOKEN_CACHE_MAXSIZE = 10000
+
+# 用户账户查询的进程内缓存（秒），0 表示禁用
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "5"))
+USER_CACHE_MAXSIZE = 1024
+
+
+# ==================== 进程内缓存 ====================
+
+class _TTLCache:
+    """线程安全的 TTL + LRU 缓存，超过 maxsize 时淘汰最久未使用的条目"""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if self.ttl <= 0:
+            return default
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# 以 sha256(token) 为键，不保存原始 Token
+_token_cache = _TTLCache(TOKEN_CACHE_MAXSIZE, TOKEN_CACHE_TTL)
+_current_user_cache = _TTLCache(TOKEN_CACHE_MAXSIZE, TOKEN_CACHE_TTL)
+_user_cache = _TTLCache(USER_CACHE_MAXSIZE, USER_CACHE_TTL)
+
+
+def clear_auth_caches() -> None:
+    """清空 Token/用户缓存（用户信息变更或直接修改数据库后调用）"""
+    _token_cache.clear()
+    _current_user_cache.clear()
+    _user_cache.clear()
+
 # ==================== 密码加密 ====================
 
+PBKDF2_ITERATIONS = 100000  # 迭代次数
+SALT_BYTES = 16  # RFC 8018 要求至少 8 字节
+_LEGACY_SALT_BYTES = 32  # 早期版本的盐长度（无前缀格式）
+_HASH_V2_PREFIX = "v2:"
+BULK_HASH_MIN_PARALLEL = 4  # 批量哈希少于该数量时不启动进程池
+
+# 批量哈希共用的进程池：首次需要时创建，避免每次调用都重新拉起工作进程
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+
+
+def _pbkdf2_sha256(password: bytes, salt: bytes) -> bytes:
+    """
+    PBKDF2-HMAC-SHA256，优先使用 fastpbkdf2（C 实现，可利用 SHA-NI/ARMv8 SHA2 指令），
+    未安装时回退到 hashlib；两者输出完全一致，已有密码哈希保持兼容。
+
+    两个后端都只在开始时对密钥做一次 ipad/opad 压缩，之后每轮迭代从缓存的
+    HMAC 中间状态复制继续计算（每轮 2 次而非 4 次 SHA-256 压缩），
+    因此不要在 Python 层自行实现迭代循环。
+    """
+    if _fast_pbkdf2_hmac is not None:
+        return _fast_pbkdf2_hmac('sha256', password, salt, PBKDF2_ITERATIONS)
+    return hashlib.pbkdf2_hmac('sha256', password, salt, PBKDF2_ITERATIONS)
+
+
+def _hash_password_with_salt(password: str, salt: bytes) -> str:
+    key = _pbkdf2_sha256(password.encode('utf-8'), salt)
+    return _HASH_V2_PREFIX + base64.b64encode(salt + key).decode('utf-8')
+
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            # Web 进程是多线程的，fork 会继承其他线程持有的锁，改用 forkserver/spawn 启动工作进程
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context(method),
+            )
+        return _hash_executor
+
+
+def shutdown_hash_executor() -> None:
+    """关闭批量哈希进程池（应用关闭或测试结束时调用），之后再用会重新创建"""
+    global _hash_executor
+    with _hash_executor_lock:
+        executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _discard_hash_executor(executor: ProcessPoolExecutor) -> None:
+    """进程池损坏（工作进程异常退出）后丢弃，下次调用重新创建"""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is executor:
+            _hash_executor = None
+    executor.shutdown(wait=False)
+
+
+def _hash_passwords(passwords: List[str], salts: List[bytes]) -> List[str]:
+    """
+    批量计算密码哈希，数量较多时分发到共用进程池并行执行；
+    调用会阻塞到全部哈希完成，异步端点中须经 run_in_threadpool 调用
+    """
+    if len(passwords) != len(salts):
+        raise ValueError("passwords 与 salts 数量不一致")
+    if len(passwords) < BULK_HASH_MIN_PARALLEL:
+        return [_hash_password_with_salt(p, salt) for p, salt in zip(passwords, salts, strict=True)]
+    executor = _get_hash_executor()
+    try:
+        return list(executor.map(_hash_password_with_salt, passwords, salts))
+    except BrokenProcessPool:
+        _discard_hash_executor(executor)
+        raise
+
+
 def hash_password(password: str) -> str:
     """
     使用 PBKDF2 算法加密密码
+    格式：v2:base64(salt(16) + key)；旧格式 base64(salt(32) + key) 仍可验证
     """
-    salt = os.urandom(32)
-    key = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt,
-        100000  # 迭代次数
-    )
-    return base64.b64encode(salt + key).decode('utf-8')
+    return _hash_password_with_salt(password, secrets.token_bytes(SALT_BYTES))
 
 
 def verify_password(password: str, password_hash: str) -> bool:
@@ -57,16 +217,16 @@ def verify_password(password: str, password_hash: str) -> bool:
     验证密码是否正确
     """
     try:
+        if password_hash.startswith(_HASH_V2_PREFIX):
+            salt_len = SALT_BYTES
+            password_hash = password_hash[len(_HASH_V2_PREFIX):]
+        else:
+            salt_len = _LEGACY_SALT_BYTES
         decoded = base64.b64decode(password_hash.encode('utf-8'))
-        salt = decoded[:32]
-        stored_key = decoded[32:]
+        salt = decoded[:salt_len]
+        stored_key = decoded[salt_len:]
         
-        key = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt,
-            100000
-        )
+        key = _pbkdf2_sha256(password.encode('utf-8'), salt)
         return hmac.compare_digest(key, stored_key)
     except Exception:
         return False
@@ -75,20 +235,71 @@ def verify_password(password: str, password_hash: str) -> bool:
 if ADMIN_PASSWORD:
     ADMIN_USERS[ADMIN_USERNAME]["password_hash"] = hash_password(ADMIN_PASSWORD)
 
+# 用户不存在/不可用时也校验一次该哈希，使失败路径与正常校验耗时一致，避免枚举用户名
+_DUMMY_PASSWORD_HASH = hash_password(os.urandom(32).hex())
+
+
+# 用户表 SQL 固定为模块级常量，配合线程内复用的连接命中 sqlite3 语句缓存
+_SQL_GET_USER = """
+    SELECT username, password_hash, role, is_active, created_at
+    FROM user_accounts WHERE username = ?
+"""
+
+_SQL_UPSERT_USER_SQLITE = """
+    INSERT INTO user_accounts (username, password_hash, role, is_active)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(username) DO UPDATE SET
+        password_hash = excluded.password_hash,
+        role = excluded.role,
+        is_active = excluded.is_active,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+_SQL_UPSERT_USER_MYSQL = """
+    INSERT INTO user_accounts (username, password_hash, role, is_active)
+    VALUES (?, ?, ?, ?)
+    ON DUPLICATE KEY UPDATE
+        password_hash = VALUES(password_hash),
+        role = VALUES(role),
+        is_active = VALUES(is_active),
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# 创建用户只插入不覆盖：用户名已存在时影响行数为 0，由调用方返回 False
+_SQL_INSERT_USER_SQLITE = """
+    INSERT INTO user_accounts (username, password_hash, role, is_active)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(username) DO NOTHING
+"""
+
+_SQL_INSERT_USER_MYSQL = """
+    INSERT IGNORE INTO user_accounts (username, password_hash, role, is_active)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_LIST_USERS = """
+    SELECT username, role, is_active, created_at
+    FROM user_accounts
+    ORDER BY created_at ASC
+"""
+
 
 def _get_user_from_db(username: str) -> Optional[Dict]:
+    cached_user = _user_cache.get(username)
+    if cached_user is not None:
+        return dict(cached_user)
+    user = _load_user_from_db(username)
+    if user:
+        _user_cache.set(username, dict(user))
+    return user
+
+
+def _load_user_from_db(username: str) -> Optional[Dict]:
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT username, password_hash, role, is_active, created_at
-            FROM user_accounts WHERE username = ?
-            """,
-            (username,),
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_GET_USER, (username,))
+            row = cursor.fetchone()
         if not row:
             return None
         return {
@@ -103,32 +314,44 @@ def _get_user_from_db(username: str) -> Optional[Dict]:
 
 
 def _upsert_user(username: str, password_hash: str, role: str, is_active: bool = True) -> None:
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT username FROM user_accounts WHERE username = ?",
-        (username,),
-    )
-    exists = cursor.fetchone()
-    if exists:
-        cursor.execute(
-            """
-            UPDATE user_accounts
-            SET password_hash = ?, role = ?, is_active = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE username = ?
-            """,
-            (password_hash, role, 1 if is_active else 0, username),
-        )
-    else:
-        cursor.execute(
-            """
-            INSERT INTO user_accounts (username, password_hash, role, is_active)
-            VALUES (?, ?, ?, ?)
-            """,
-            (username, password_hash, role, 1 if is_active else 0),
+    _upsert_users([(username, password_hash, role, is_active)])
+
+
+def _upsert_users(rows: List[Tuple[str, str, str, bool]]) -> None:
+    """在同一事务内写入多条 (username, password_hash, role, is_active)"""
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+        sql = _SQL_UPSERT_USER_MYSQL if is_security_mysql() else _SQL_UPSERT_USER_SQLITE
+        cursor.executemany(
+            sql,
+            [
+                (username, password_hash, role, 1 if is_active else 0)
+                for username, password_hash, role, is_active in rows
+            ],
         )
-    conn.commit()
-    conn.close()
+        conn.commit()
+    for username, _, _, _ in rows:
+        _user_cache.pop(username)
+    _current_user_cache.clear()
+
+
+def _insert_users(rows: List[Tuple[str, str, str, bool]]) -> List[bool]:
+    """
+    在同一事务内插入多条 (username, password_hash, role, is_active)，已存在的用户名跳过；
+    返回与输入顺序一致的结果列表（True 表示本次插入成功）
+    """
+    inserted = []
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+        sql = _SQL_INSERT_USER_MYSQL if is_security_mysql() else _SQL_INSERT_USER_SQLITE
+        for username, password_hash, role, is_active in rows:
+            cursor.execute(sql, (username, password_hash, role, 1 if is_active else 0))
+            inserted.append(cursor.rowcount == 1)
+        conn.commit()
+    for username, _, _, _ in rows:
+        _user_cache.pop(username)
+    _current_user_cache.clear()
+    return inserted
 
 
 def ensure_admin_user() -> None:
@@ -159,17 +382,54 @@ def is_using_default_secret_key() -> bool:
 
 # ==================== JWT Token ====================
 
+def _base64url_encode_bytes(data: bytes) -> bytes:
+    return _b64.urlsafe_b64encode(data).rstrip(b'=')
+
+
 def base64url_encode(data: bytes) -> str:
     """Base64 URL 安全编码"""
-    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('utf-8')
+    return _base64url_encode_bytes(data).decode('ascii')
+
+
+# 按 len(data) % 4 补齐的 '=' 后缀
+_B64_PADDING = (b'', b'===', b'==', b'=')
+
+
+def _base64url_decode_bytes(data: bytes) -> bytes:
+    return _b64.urlsafe_b64decode(data + _B64_PADDING[len(data) & 3])
 
 
 def base64url_decode(data: str) -> bytes:
     """Base64 URL 安全解码"""
-    padding = 4 - len(data) % 4
-    if padding != 4:
-        data += '=' * padding
-    return base64.urlsafe_b64decode(data.encode('utf-8'))
+    return _base64url_decode_bytes(data.encode('ascii'))
+
+
+def _json_dumps(obj: dict) -> bytes:
+    """JSON 编码为 UTF-8 字节，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _json_loads(data: bytes):
+    """JSON 解码，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Header 固定不变，导入时编码一次（JWT 各段均为 ASCII，签名/拼接直接在 bytes 上进行）
+_JWT_HEADER_B64 = _base64url_encode_bytes(_json_dumps({"alg": ALGORITHM, "typ": "JWT"}))
+
+# 已用 SECRET_KEY 初始化（ipad/opad 已压缩）的 HMAC 模板，签名时 copy() 复用
+_HMAC_TEMPLATE = hmac.new(_SECRET_BYTES, None, hashlib.sha256)
+
+
+def _sign(message: bytes) -> bytes:
+    """计算 HS256 签名"""
+    h = _HMAC_TEMPLATE.copy()
+    h.update(message)
+    return h.digest()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -178,33 +438,44 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     """
     to_encode = data.copy()
     
+    now = int(time.time())
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + int(expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
     
     to_encode.update({
-        "exp": int(expire.timestamp()),
-        "iat": int(datetime.utcnow().timestamp())
+        "exp": expire,
+        "iat": now
     })
     
-    # 创建 JWT Header
-    header = {"alg": ALGORITHM, "typ": "JWT"}
-    header_encoded = base64url_encode(json.dumps(header).encode('utf-8'))
-    
-    # 创建 JWT Payload
-    payload_encoded = base64url_encode(json.dumps(to_encode).encode('utf-8'))
+    # 创建 JWT Payload（Header 使用预编码的 _JWT_HEADER_B64）
+    payload_encoded = _base64url_encode_bytes(_json_dumps(to_encode))
     
     # 创建签名
-    message = f"{header_encoded}.{payload_encoded}"
-    signature = hmac.new(
-        SECRET_KEY.encode('utf-8'),
-        message.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    signature_encoded = base64url_encode(signature)
+    message = _JWT_HEADER_B64 + b"." + payload_encoded
+    signature_encoded = _base64url_encode_bytes(_sign(message))
     
-    return f"{header_encoded}.{payload_encoded}.{signature_encoded}"
+    return b".".join((message, signature_encoded)).decode('ascii')
+
+
+_TOKEN_MAX_LENGTH = 4096
+_match_token_format = re.compile(
+    r'[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+'
+).fullmatch
+
+
+def _is_well_formed_token(token: str) -> bool:
+    """在任何哈希/HMAC 计算之前拒绝长度或字符集明显不合法的 Token"""
+    return (
+        isinstance(token, str)
+        and len(token) <= _TOKEN_MAX_LENGTH
+        and _match_token_format(token) is not None
+    )
+
+
+def _token_cache_key(token: bytes) -> bytes:
+    return hashlib.sha256(token).digest()
 
 
 def verify_token(token: str) -> Optional[Dict]:
@@ -212,39 +483,55 @@ def verify_token(token: str) -> Optional[Dict]:
     验证 JWT Token
     返回解码后的 payload，验证失败返回 None
     """
-    try:
-        parts = token.split('.')
-        if len(parts) != 3:
+    if not _is_well_formed_token(token):
+        return None
+    token_bytes = token.encode('ascii')
+    return _verify_token_with_key(token_bytes, _token_cache_key(token_bytes))
+
+
+def _verify_token_with_key(token: bytes, cache_key: bytes) -> Optional[Dict]:
+    cached_payload = _token_cache.get(cache_key)
+    if cached_payload is not None:
+        if cached_payload.get("exp", 0) < time.time():
             return None
+        return dict(cached_payload)
+
+    try:
+        # 格式已由 _is_well_formed_token 保证为三段
+        message, _, signature_encoded = token.rpartition(b'.')
+        payload_encoded = message.partition(b'.')[2]
         
-        header_encoded, payload_encoded, signature_encoded = parts
-        
-        # 验证签名
-        message = f"{header_encoded}.{payload_encoded}"
-        expected_signature = hmac.new(
-            SECRET_KEY.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).digest()
-        
-        actual_signature = base64url_decode(signature_encoded)
-        
-        if not hmac.compare_digest(expected_signature, actual_signature):
+        # 验证签名：直接比较编码后的签名，省去解码
+        expected_signature = _base64url_encode_bytes(_sign(message))
+        if not hmac.compare_digest(expected_signature, signature_encoded):
             return None
         
         # 解码 payload
-        payload = json.loads(base64url_decode(payload_encoded).decode('utf-8'))
+        payload = _json_loads(_base64url_decode_bytes(payload_encoded))
         
         # 检查过期时间
         if payload.get("exp", 0) < time.time():
             return None
         
+        _token_cache.set(cache_key, dict(payload))
         return payload
         
     except Exception:
         return None
 
 
+def verify_tokens_batch(tokens: List[str]) -> List[Optional[Dict]]:
+    """
+    批量验证 JWT Token，结果与输入顺序一一对应
+    所有 Token 共用同一个已初始化的 HMAC 模板，重复的 Token 只验证一次
+    """
+    results: Dict[str, Optional[Dict]] = {}
+    for token in tokens:
+        if token not in results:
+            results[token] = verify_token(token)
+    return [dict(results[token]) if results[token] else None for token in tokens]
+
+
 # ==================== 用户认证 ====================
 
 def authenticate_user(username: str, password: str) -> Optional[Dict]:
@@ -253,9 +540,8 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
     """
     user = _get_user_from_db(username)
     if user:
-        if not user.get("is_active"):
-            return None
-        if not user.get("password_hash"):
+        if not user.get("is_active") or not user.get("password_hash"):
+            verify_password(password, _DUMMY_PASSWORD_HASH)
             return None
         if not verify_password(password, user["password_hash"]):
             return None
@@ -265,10 +551,8 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
         }
 
     user = ADMIN_USERS.get(username)
-    if not user:
-        return None
-
-    if not user.get("password_hash"):
+    if not user or not user.get("password_hash"):
+        verify_password(password, _DUMMY_PASSWORD_HASH)
         return None
 
     if not verify_password(password, user["password_hash"]):
@@ -284,14 +568,29 @@ def get_current_user(token: str) -> Optional[Dict]:
     """
     从 Token 获取当前用户
     """
-    payload = verify_token(token)
+    if not _is_well_formed_token(token):
+        return None
+    token_bytes = token.encode('ascii')
+    cache_key = _token_cache_key(token_bytes)
+    payload = _verify_token_with_key(token_bytes, cache_key)
     if not payload:
         return None
-    
+
+    cached_user = _current_user_cache.get(cache_key)
+    if cached_user is not None:
+        return dict(cached_user)
+
     username = payload.get("sub")
     if not username:
         return None
-    
+
+    user = _resolve_user(username)
+    if user:
+        _current_user_cache.set(cache_key, dict(user))
+    return user
+
+
+def _resolve_user(username: str) -> Optional[Dict]:
     user = _get_user_from_db(username)
     if user:
         if not user.get("is_active"):
@@ -326,8 +625,48 @@ def create_user(username: str, password: str, role: str = "user") -> bool:
         return False
 
     password_hash = hash_password(password)
-    _upsert_user(username, password_hash, role, True)
-    return True
+    # 检查与写入之间可能有并发创建，插入不覆盖已有账号
+    return _insert_users([(username, password_hash, role, True)])[0]
+
+
+def create_users_bulk(items: List[Tuple[str, str, str]]) -> List[bool]:
+    """
+    批量创建用户，items 为 (username, password, role)
+    返回与输入顺序一致的结果列表；盐值与 hash_password 一样取自 secrets.token_bytes（一次调用生成全部），
+    密码哈希在进程池中并行计算，最后在单个事务内以插入不覆盖的方式写入，
+    哈希期间被其他请求抢先创建的用户名返回 False。
+    同步阻塞调用，异步端点中须经 run_in_threadpool 调用
+    """
+    salts = secrets.token_bytes(SALT_BYTES * len(items))
+    results = []
+    accepted = []
+    seen = set()
+    for index, (username, password, role) in enumerate(items):
+        if (
+            role not in ALLOWED_ROLES
+            or username in ADMIN_USERS
+            or username in seen
+            or _get_user_from_db(username)
+        ):
+            results.append(False)
+            continue
+        seen.add(username)
+        salt = salts[index * SALT_BYTES:(index + 1) * SALT_BYTES]
+        accepted.append((index, username, password, role, salt))
+        results.append(False)
+
+    if accepted:
+        hashes = _hash_passwords(
+            [password for _, _, password, _, _ in accepted],
+            [salt for _, _, _, _, salt in accepted],
+        )
+        inserted = _insert_users([
+            (username, password_hash, role, True)
+            for (_, username, _, role, _), password_hash in zip(accepted, hashes, strict=True)
+        ])
+        for (index, _, _, _, _), ok in zip(accepted, inserted, strict=True):
+            results[index] = ok
+    return results
 
 
 def change_password(username: str, old_password: str, new_password: str) -> bool:
@@ -354,6 +693,7 @@ def change_password(username: str, old_password: str, new_password: str) -> bool
         return False
 
     user["password_hash"] = hash_password(new_password)
+    _current_user_cache.clear()
     return True
 
 
@@ -371,6 +711,7 @@ def reset_user_password(username: str, new_password: str) -> bool:
         return False
 
     user["password_hash"] = hash_password(new_password)
+    _current_user_cache.clear()
     return True
 
 
@@ -380,23 +721,19 @@ def list_users() -> list:
     """
     users = []
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT username, role, is_active, created_at
-            FROM user_accounts
-            ORDER BY created_at ASC
-            """
-        )
-        for row in cursor.fetchall():
-            users.append({
-                "username": row["username"],
-                "role": row["role"],
-                "is_active": bool(row["is_active"]),
-                "created_at": row["created_at"],
-            })
-        conn.close()
+        # 使用元组游标直接解包，避免逐行构造 Row 对象再按列名取值
+        with get_security_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_LIST_USERS)
+            users = [
+                {
+                    "username": username,
+                    "role": role,
+                    "is_active": bool(is_active),
+                    "created_at": created_at,
+                }
+                for username, role, is_active, created_at in cursor.fetchall()
+            ]
     except Exception:
         pass
 
@@ -2,32 +2,31 @@
 自动备份模块 - 数据库定时备份
 """
 
+import json
 import os
 import shutil
 import sqlite3
 import threading
 import time
 from datetime import datetime
-from typing import List, Optional
+from operator import itemgetter
+from typing import Callable, List, Optional, Tuple, Union
 
-from backend.config import get_backup_dir, get_database_path
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+from backend.config import (
+    get_backup_compression, get_backup_dir, get_backup_enabled, get_database_path
+)
 from backend.db import is_mysql
 
 # ==================== 配置 ====================
+# 环境变量由 backend.config 统一读取并缓存；修改环境变量后调用 config.reload_config()
 
-def _backup_enabled() -> bool:
-    raw = os.getenv("BACKUP_ENABLED")
-    if raw is None:
-        return True
-    return raw.strip().lower() not in ("0", "false", "no", "off", "")
-
-
-def _backup_dir() -> str:
-    return get_backup_dir()
-
-
-def _database_path() -> str:
-    return get_database_path()
+def _compression_enabled() -> bool:
+    return zstandard is not None and get_backup_compression()
 
 # 保留备份数量
 MAX_BACKUPS = 10
@@ -35,22 +34,71 @@ MAX_BACKUPS = 10
 # 自动备份间隔（秒）- 默认6小时
 BACKUP_INTERVAL = 6 * 60 * 60
 
+# 在线备份每步复制的页数及步间休眠（秒）；分步复制使源库读锁只在每步内持有，
+# 写入方可在步与步之间提交。默认不休眠（0.0），步与步之间连续复制；
+# 存在明显写入竞争时可调为 256 / 0.01，给写入方留出提交的间隙
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_SLEEP = 0.0
+
+# 备份 API 目标连接的页缓存大小（KB）
+BACKUP_DEST_CACHE_KB = 65536
+
+# 恢复时的文件复制缓冲区大小
+RESTORE_COPY_BUFFER = 1 << 20
+
+# 恢复时等待目标库写锁的超时（秒）
+RESTORE_BUSY_TIMEOUT = 30.0
+
+# 备份文件后缀：安装 zstandard 时压缩为 .db.zst，恢复时两种格式均支持
+BACKUP_SUFFIX = '.db'
+COMPRESSED_SUFFIX = '.db.zst'
+_BACKUP_SUFFIXES = (BACKUP_SUFFIX, COMPRESSED_SUFFIX)
+
+# 记录最近一次备份对应的源库指纹，用于识别未变化的数据库
+LAST_BACKUP_FILE = 'last_backup.json'
+ZSTD_LEVEL = 3
+# 压缩工作线程数；备份在 Web 进程内执行，不占满全部核心
+ZSTD_THREADS = 2
+
 # 备份线程
 _backup_thread: Optional[threading.Thread] = None
 _backup_running = False
+_stop_event = threading.Event()
+
+# 常驻的源库连接（由 _source_lock 保护；不使用只读模式，检查点需要写权限）
+_source_lock = threading.Lock()
+_source_conn: Optional[sqlite3.Connection] = None
+_source_key: Optional[Tuple[str, int, int]] = None
+
+# VACUUM INTO 每执行多少条虚拟机指令检查一次取消标记
+BACKUP_CANCEL_CHECK_OPS = 1000
+
+
+class BackupCancelled(Exception):
+    """自动备份因 stop_auto_backup() 被中途取消"""
+
+# list_backups 结果缓存（按备份目录及其 mtime 校验）
+BACKUP_LIST_CACHE_TTL = 2.0
+_backups_cache_lock = threading.Lock()
+_backups_cache = {"dir": None, "mtime": None, "ts": 0.0, "data": [], "total_size": 0}
+
+
+def _invalidate_backups_cache() -> None:
+    with _backups_cache_lock:
+        _backups_cache["ts"] = 0.0
 
 
 # ==================== 备份功能 ====================
 
 def is_backup_supported() -> bool:
-    return _backup_enabled() and (not is_mysql())
+    return get_backup_enabled() and (not is_mysql())
 
 
 def ensure_backup_dir():
     """确保备份目录存在"""
     if not is_backup_supported():
         return
-    backup_dir = _backup_dir()
+    backup_dir = get_backup_dir()
     if not os.path.exists(backup_dir):
         os.makedirs(backup_dir)
         print(f"[Backup] 创建备份目录: {backup_dir}")
@@ -59,8 +107,8 @@ def ensure_backup_dir():
 def create_backup(manual: bool = False) -> Optional[str]:
     """
     创建数据库备份
-    :param manual: 是否为手动备份
-    :return: 备份文件路径
+    :param manual: 是否为手动备份；自动备份在数据库自上次备份后无变化时跳过
+    :return: 备份文件路径，跳过或失败时为 None
     """
     try:
         if not is_backup_supported():
@@ -69,25 +117,46 @@ def create_backup(manual: bool = False) -> Optional[str]:
         ensure_backup_dir()
         
         # 检查源数据库是否存在
-        db_path = _database_path()
+        db_path = get_database_path()
         if not os.path.exists(db_path):
             print("[Backup] 数据库文件不存在")
             return None
         
+        # 写入前的备份文件名（不取元数据），写入后直接把新备份放到最前面用于清理
+        existing_backups = list_backups(details=False)
+        
         # 生成备份文件名
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_type = "manual" if manual else "auto"
-        backup_filename = f"gas_data_{backup_type}_{timestamp}.db"
-        backup_path = os.path.join(_backup_dir(), backup_filename)
-        
-        # 使用 SQLite 的备份 API 进行安全备份
-        source_conn = sqlite3.connect(db_path)
-        backup_conn = sqlite3.connect(backup_path)
+        backup_filename = f"gas_data_{backup_type}_{timestamp}{BACKUP_SUFFIX}"
+        backup_path = os.path.join(get_backup_dir(), backup_filename)
         
-        source_conn.backup(backup_conn)
+        # 自动备份可被 stop_auto_backup() 中途取消；手动备份总是执行完毕
+        cancelled = None if manual else _stop_event.is_set
         
-        source_conn.close()
-        backup_conn.close()
+        # 复用常驻源连接；锁同时串行化后台线程与 API 请求发起的备份
+        with _source_lock:
+            source_conn = _get_source_connection(db_path)
+            # 先做一次被动检查点，让备份尽量基于已合并的页面
+            source_conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            
+            # 检查点之后取指纹；源库自上次备份以来未变化时硬链接上次的备份，不再复制
+            fingerprint = _source_fingerprint(db_path)
+            previous_path = _unchanged_backup_path(fingerprint)
+            if previous_path and not manual:
+                # 定时备份在数据无变化时直接跳过；手动备份总是生成新的备份项
+                print("[Backup] 无变化，跳过")
+                return None
+            linked_path = _link_previous_backup(previous_path, backup_path)
+            if linked_path:
+                backup_path = linked_path
+            else:
+                _write_backup(source_conn, backup_path, cancelled)
+                if _compression_enabled():
+                    backup_path = _compress_backup(backup_path)
+            backup_filename = os.path.basename(backup_path)
+            _save_last_backup(fingerprint, backup_filename)
+        _invalidate_backups_cache()
         
         # 获取备份文件大小
         backup_size = os.path.getsize(backup_path)
@@ -95,11 +164,16 @@ def create_backup(manual: bool = False) -> Optional[str]:
         
         print(f"[Backup] 备份成功: {backup_filename} ({size_str})")
         
-        # 清理旧备份
-        cleanup_old_backups()
+        # 清理旧备份（复用写入前的列表，不再重新扫描目录）
+        backups = [backup_filename]
+        backups.extend(name for name in existing_backups if name != backup_filename)
+        cleanup_old_backups(backups)
         
         return backup_path
         
+    except BackupCancelled:
+        print("[Backup] 备份已取消")
+        return None
     except Exception as e:
         print(f"[Backup] 备份失败: {e}")
         return None
@@ -115,17 +189,21 @@ def restore_backup(backup_filename: str) -> bool:
         if not is_backup_supported():
             print("[Backup] MySQL 使用托管备份，无法从文件恢复")
             return False
-        backup_path = os.path.join(_backup_dir(), backup_filename)
+        backup_path = os.path.join(get_backup_dir(), backup_filename)
         
         if not os.path.exists(backup_path):
             print(f"[Backup] 备份文件不存在: {backup_filename}")
             return False
         
-        # 先备份当前数据库
-        create_backup(manual=True)
+        # 先备份当前数据库；安全备份失败时不再继续，避免当前数据无法找回
+        db_path = get_database_path()
+        if os.path.exists(db_path) and create_backup(manual=True) is None:
+            print("[Backup] 恢复前备份当前数据库失败，已中止恢复")
+            return False
         
-        # 恢复备份
-        shutil.copy2(backup_path, _database_path())
+        with _source_lock:
+            _restore_database(backup_path, db_path)
+        _invalidate_backups_cache()
         
         print(f"[Backup] 恢复成功: {backup_filename}")
         return True
@@ -135,77 +213,434 @@ def restore_backup(backup_filename: str) -> bool:
         return False
 
 
-def list_backups() -> List[dict]:
+def _get_source_connection(db_path: str) -> sqlite3.Connection:
+    """
+    获取常驻的源库连接（调用方需持有 _source_lock）
+    库路径变化或文件被替换（inode 变化）时重新连接
+    """
+    global _source_conn, _source_key
+    st = os.stat(db_path)
+    key = (db_path, st.st_dev, st.st_ino)
+    if _source_conn is not None and _source_key == key:
+        return _source_conn
+    _close_source_connection()
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    # WAL 为库文件的持久设置：备份读取期间写入方不再被阻塞
+    conn.execute("PRAGMA journal_mode=WAL")
+    _source_conn, _source_key = conn, key
+    return conn
+
+
+def _close_source_connection() -> None:
+    global _source_conn, _source_key
+    if _source_conn is not None:
+        try:
+            _source_conn.close()
+        except sqlite3.Error:
+            pass
+    _source_conn, _source_key = None, None
+
+
+def _write_backup(source_conn: sqlite3.Connection, backup_path: str,
+                  cancelled: Optional[Callable[[], bool]]) -> None:
+    """把源库完整写出到 backup_path（调用方需持有 _source_lock）"""
+    # 先写临时文件再改名：VACUUM INTO 要求目标不存在，也避免留下半成品
+    tmp_path = backup_path + ".tmp"
+    try:
+        _remove_if_exists(tmp_path)
+        _raise_if_cancelled(cancelled)
+        if cancelled is not None:
+            source_conn.set_progress_handler(
+                lambda: 1 if cancelled() else 0, BACKUP_CANCEL_CHECK_OPS
+            )
+        try:
+            # VACUUM INTO 输出整理过碎片、不含空闲页的精简副本
+            source_conn.execute("VACUUM INTO ?", (tmp_path,))
+        except sqlite3.OperationalError as e:
+            _raise_if_cancelled(cancelled)
+            # 旧版 SQLite 不支持或库被锁定时退回页面级备份 API
+            print(f"[Backup] VACUUM INTO 不可用，改用备份 API: {e}")
+            _remove_if_exists(tmp_path)
+            _copy_with_backup_api(source_conn, tmp_path, cancelled)
+        # 两种方式写出时均未同步，改名前统一落盘一次
+        _fsync_file(tmp_path)
+        os.replace(tmp_path, backup_path)
+    except BaseException:
+        _remove_if_exists(tmp_path)
+        raise
+    finally:
+        source_conn.set_progress_handler(None, 0)
+
+
+def _source_fingerprint(db_path: str) -> List[int]:
+    """源库文件及其 WAL 的 inode、大小与修改时间，任一变化即视为数据已变"""
+    st = os.stat(db_path)
+    try:
+        wal = os.stat(db_path + "-wal")
+        wal_size, wal_mtime = wal.st_size, wal.st_mtime_ns
+    except FileNotFoundError:
+        wal_size, wal_mtime = 0, 0
+    return [st.st_ino, st.st_size, st.st_mtime_ns, wal_size, wal_mtime]
+
+
+def _load_last_backup() -> Optional[dict]:
+    try:
+        with open(os.path.join(get_backup_dir(), LAST_BACKUP_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_last_backup(fingerprint: List[int], backup_filename: str) -> None:
+    path = os.path.join(get_backup_dir(), LAST_BACKUP_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"fingerprint": fingerprint, "filename": backup_filename}, f)
+    os.replace(tmp_path, path)
+
+
+def _unchanged_backup_path(fingerprint: List[int]) -> Optional[str]:
+    """源库指纹与上次备份一致且该备份仍存在时返回其路径"""
+    last = _load_last_backup()
+    if not last or last.get("fingerprint") != fingerprint:
+        return None
+    previous_path = os.path.join(get_backup_dir(), last.get("filename", ""))
+    return previous_path if os.path.isfile(previous_path) else None
+
+
+def _link_previous_backup(previous_path: Optional[str], backup_path: str) -> Optional[str]:
+    """
+    源库未变化时把上次的备份硬链接为本次备份（不占额外空间）
+    :return: 新备份路径；无可复用的备份或链接失败时返回 None
+    """
+    if not previous_path:
+        return None
+    suffix = COMPRESSED_SUFFIX if previous_path.endswith(COMPRESSED_SUFFIX) else BACKUP_SUFFIX
+    link_path = backup_path[:-len(BACKUP_SUFFIX)] + suffix
+    if link_path == previous_path:
+        return link_path
+    try:
+        os.link(previous_path, link_path)
+    except OSError:
+        # 上次备份已被清理、目标已存在或文件系统不支持硬链接时完整复制
+        return None
+    print(f"[Backup] 数据库无变化，硬链接上次备份: {os.path.basename(previous_path)}")
+    return link_path
+
+
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _fsync_file(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path: str) -> None:
+    """同步目录项，使改名在崩溃后仍然生效（Windows 不支持打开目录，跳过）"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _raise_if_cancelled(cancelled: Optional[Callable[[], bool]]) -> None:
+    if cancelled is not None and cancelled():
+        raise BackupCancelled()
+
+
+def _copy_with_backup_api(source_conn: sqlite3.Connection, path: str,
+                          cancelled: Optional[Callable[[], bool]] = None) -> None:
+    """使用 SQLite 备份 API 按页复制到 path，每步之间检查取消标记"""
+    def _progress(status, remaining, total):
+        _raise_if_cancelled(cancelled)
+
+    backup_conn = sqlite3.connect(path)
+    try:
+        # 备份文件只写一次，失败即丢弃，无需回滚日志与同步；
+        # 独占锁与大页缓存让写入合并为更大的顺序 I/O，完成后统一 fsync
+        backup_conn.execute("PRAGMA journal_mode=OFF")
+        backup_conn.execute("PRAGMA synchronous=OFF")
+        backup_conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+        backup_conn.execute(f"PRAGMA cache_size=-{BACKUP_DEST_CACHE_KB}")
+        backup_conn.execute("PRAGMA temp_store=MEMORY")
+        source_conn.backup(
+            backup_conn,
+            pages=BACKUP_PAGES_PER_STEP,
+            progress=_progress if cancelled is not None else None,
+            sleep=BACKUP_STEP_SLEEP,
+        )
+    finally:
+        backup_conn.close()
+
+
+def _compress_backup(path: str) -> str:
+    """
+    将备份流式压缩为 .zst 并删除原文件，返回压缩后路径
+    先写临时文件并落盘、改名后同步目录，确认压缩文件完整持久化后才删除原备份
+    """
+    compressed_path = path[:-len(BACKUP_SUFFIX)] + COMPRESSED_SUFFIX
+    tmp_path = compressed_path + ".tmp"
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=ZSTD_THREADS)
+    try:
+        with open(path, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+            compressor.copy_stream(fsrc, fdst, write_size=RESTORE_COPY_BUFFER)
+            fdst.flush()
+            os.fsync(fdst.fileno())
+        os.replace(tmp_path, compressed_path)
+        _fsync_dir(os.path.dirname(compressed_path))
+    except BaseException:
+        _remove_if_exists(tmp_path)
+        raise
+    os.remove(path)
+    return compressed_path
+
+
+def _copy_file_contents(fsrc, fdst) -> None:
+    """
+    优先用 os.copy_file_range 在内核中复制（支持 reflink 的文件系统上为写时复制克隆），
+    不可用或失败时回退到带大缓冲区的用户态复制
+    """
+    src_fd = fsrc.fileno()
+    dst_fd = fdst.fileno()
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    if hasattr(os, "copy_file_range"):
+        remaining = os.fstat(src_fd).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            return
+        except OSError:
+            # 例如旧内核跨文件系统复制或文件系统不支持，从头改用普通复制
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+    shutil.copyfileobj(fsrc, fdst, length=RESTORE_COPY_BUFFER)
+
+
+def _atomic_copy(src: str, dst: str) -> None:
+    """
+    先复制到目标同目录下的临时文件并 fsync，再用 os.replace 原子替换，
+    中途崩溃不会留下写了一半的数据库文件
+    """
+    tmp_path = dst + ".restore.tmp"
+    try:
+        with open(src, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+            if src.endswith(COMPRESSED_SUFFIX):
+                if zstandard is None:
+                    raise RuntimeError("恢复压缩备份需要安装 zstandard")
+                zstandard.ZstdDecompressor().copy_stream(
+                    fsrc, fdst, write_size=RESTORE_COPY_BUFFER
+                )
+            else:
+                _copy_file_contents(fsrc, fdst)
+            fdst.flush()
+            os.fsync(fdst.fileno())
+        if os.path.exists(dst):
+            shutil.copymode(dst, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _restore_database(backup_path: str, db_path: str) -> None:
+    """
+    通过 SQLite 备份 API 把备份内容写回正在使用的库（调用方需持有 _source_lock）
+    复制在目标库的单个写事务内完成：期间持有写锁，其他写入方只能等待，
+    WAL 也由 SQLite 自身维护，不存在替换文件后旧 WAL 帧被重放或新写入落到旧文件上的问题；
+    已打开的连接在事务提交后直接读到恢复后的数据
+    """
+    # 备份可能是压缩格式，先解压（或复制）到库文件同目录的临时文件
+    plain_path = db_path + ".restore.src"
+    try:
+        _atomic_copy(backup_path, plain_path)
+        src = sqlite3.connect(plain_path)
+        try:
+            dest = sqlite3.connect(db_path, timeout=RESTORE_BUSY_TIMEOUT)
+            try:
+                src.backup(dest)
+            finally:
+                dest.close()
+        finally:
+            src.close()
+    finally:
+        _remove_if_exists(plain_path)
+
+
+def _parse_backup_filename(filename: str) -> Optional[Tuple[str, str]]:
+    """
+    从 gas_data_{type}_{YYYYMMDD}_{HHMMSS}.db[.zst] 中解析 (备份类型, ISO 时间)
+    文件名不符合约定时返回 None
+    """
+    parts = filename.partition('.')[0].rsplit('_', 3)
+    if len(parts) != 4 or parts[0] != 'gas_data':
+        return None
+    _, backup_type, day, clock = parts
+    if len(day) != 8 or len(clock) != 6 or not (day + clock).isdigit():
+        return None
+    created_at = f"{day[:4]}-{day[4:6]}-{day[6:]}T{clock[:2]}:{clock[2:4]}:{clock[4:]}"
+    return backup_type, created_at
+
+
+def _backup_entry(filename: str, size: int, mtime: float) -> dict:
+    # 解析备份类型和时间（文件名不符合约定时回退到修改时间）
+    parsed = _parse_backup_filename(filename)
+    if parsed:
+        backup_type, created_at = parsed
+    else:
+        backup_type, created_at = 'unknown', datetime.fromtimestamp(mtime).isoformat()
+    
+    return {
+        'filename': filename,
+        'size': size,
+        'size_formatted': format_size(size),
+        'created_at': created_at,
+        'type': backup_type
+    }
+
+
+def _backup_name_key(filename: str) -> str:
+    # 文件名以 YYYYMMDD_HHMMSS 结尾，按该后缀排序即按创建时间排序
+    return filename.partition('.')[0][-15:]
+
+
+def _backup_sort_key(filename: str, mtime: float) -> Tuple[str, float]:
+    # 硬链接的备份与上次备份共用 inode 及修改时间，因此优先按文件名中的时间排序；
+    # 文件名不符合约定时用修改时间换算成同样的 YYYYMMDD_HHMMSS 格式
+    if _parse_backup_filename(filename):
+        return _backup_name_key(filename), mtime
+    return datetime.fromtimestamp(mtime).strftime("%Y%m%d_%H%M%S"), mtime
+
+
+def list_backups(details: bool = True) -> Union[List[dict], List[str]]:
     """
     列出所有备份文件
+    :param details: 为 False 时只返回按文件名时间倒序排列的文件名，不读取文件元数据
     """
     if not is_backup_supported():
         return []
     ensure_backup_dir()
     
-    backup_dir = _backup_dir()
-    backups = []
-    for filename in os.listdir(backup_dir):
-        if filename.endswith('.db'):
-            filepath = os.path.join(backup_dir, filename)
-            stat = os.stat(filepath)
-            
-            # 解析备份类型和时间
-            parts = filename.replace('.db', '').split('_')
-            backup_type = parts[2] if len(parts) > 2 else 'unknown'
-            
-            backups.append({
-                'filename': filename,
-                'size': stat.st_size,
-                'size_formatted': format_size(stat.st_size),
-                'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                'type': backup_type
-            })
+    backup_dir = get_backup_dir()
+    if not details:
+        with os.scandir(backup_dir) as it:
+            names = [entry.name for entry in it if entry.name.endswith(_BACKUP_SUFFIXES)]
+        names.sort(key=_backup_name_key, reverse=True)
+        return names
+    
+    return _list_backup_details(backup_dir)[0]
+
+
+def _list_backup_details(backup_dir: str) -> Tuple[List[dict], int]:
+    """返回 (按创建时间倒序的备份详情, 去重硬链接后的总字节数)"""
+    dir_mtime = os.stat(backup_dir).st_mtime_ns
+    now = time.monotonic()
+    with _backups_cache_lock:
+        if (
+            _backups_cache["dir"] == backup_dir
+            and _backups_cache["mtime"] == dir_mtime
+            and now - _backups_cache["ts"] < BACKUP_LIST_CACHE_TTL
+        ):
+            return list(_backups_cache["data"]), _backups_cache["total_size"]
+    
+    # scandir 在读目录时一并返回元数据，避免逐个 os.stat 和重复拼接路径
+    entries = []
+    inode_sizes = {}
+    with os.scandir(backup_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(_BACKUP_SUFFIXES):
+                continue
+            stat = entry.stat()
+            entries.append((_backup_sort_key(entry.name, stat.st_mtime), entry.name, stat.st_size, stat.st_mtime))
+            # 硬链接的备份共用同一 inode，总大小只计一次（取不到 inode 的平台按文件计）
+            inode_key = (stat.st_dev, stat.st_ino) if stat.st_ino else entry.path
+            inode_sizes[inode_key] = stat.st_size
+    
+    entries.sort(key=itemgetter(0), reverse=True)
     
-    # 按时间倒序排列
-    backups.sort(key=lambda x: x['created_at'], reverse=True)
-    return backups
+    backups = [_backup_entry(filename, size, mtime) for _, filename, size, mtime in entries]
+    total_size = sum(inode_sizes.values())
+    
+    with _backups_cache_lock:
+        _backups_cache.update(
+            dir=backup_dir, mtime=dir_mtime, ts=now, data=backups, total_size=total_size
+        )
+    return list(backups), total_size
 
 
 def delete_backup(backup_filename: str) -> bool:
     """
     删除指定备份
     """
+    if not is_backup_supported():
+        return False
+    deleted = _delete_backup_unchecked(backup_filename, get_backup_dir())
+    if deleted:
+        _invalidate_backups_cache()
+    return deleted
+
+
+def _delete_backup_unchecked(backup_filename: str, backup_dir: str) -> bool:
+    """删除备份文件，不做配置检查也不失效列表缓存，供批量清理使用"""
     try:
-        if not is_backup_supported():
-            return False
-        backup_path = os.path.join(_backup_dir(), backup_filename)
-        if os.path.exists(backup_path):
-            os.remove(backup_path)
-            print(f"[Backup] 删除备份: {backup_filename}")
-            return True
+        os.unlink(os.path.join(backup_dir, backup_filename))
+    except FileNotFoundError:
         return False
     except Exception as e:
         print(f"[Backup] 删除失败: {e}")
         return False
+    print(f"[Backup] 删除备份: {backup_filename}")
+    return True
 
 
-def cleanup_old_backups():
+def cleanup_old_backups(backups: Optional[List[str]] = None):
     """
     清理超出数量限制的旧备份
+    :param backups: 已按时间倒序排列的备份文件名，调用方已有时传入以免重复扫描目录
     """
     if not is_backup_supported():
         return
-    backups = list_backups()
+    if backups is None:
+        backups = list_backups(details=False)
+    if len(backups) <= MAX_BACKUPS:
+        return
     
-    if len(backups) > MAX_BACKUPS:
-        # 删除最旧的备份
-        for backup in backups[MAX_BACKUPS:]:
-            delete_backup(backup['filename'])
+    # 删除最旧的备份
+    backup_dir = get_backup_dir()
+    for filename in backups[MAX_BACKUPS:]:
+        _delete_backup_unchecked(filename, backup_dir)
+    _invalidate_backups_cache()
+
+
+_SIZE_UNITS = (('TB', 1 << 40), ('GB', 1 << 30), ('MB', 1 << 20), ('KB', 1 << 10))
 
 
 def format_size(size_bytes: int) -> str:
     """格式化文件大小"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.1f} TB"
+    for unit, threshold in _SIZE_UNITS:
+        if size_bytes >= threshold:
+            return f"{size_bytes / threshold:.1f} {unit}"
+    return f"{size_bytes:.1f} B"
 
 
 # ==================== 自动备份 ====================
@@ -216,15 +651,12 @@ def _backup_worker():
     
     print(f"[Backup] 自动备份已启动，间隔: {BACKUP_INTERVAL // 3600} 小时")
     
-    while _backup_running:
-        # 等待指定间隔
-        for _ in range(BACKUP_INTERVAL):
-            if not _backup_running:
-                break
-            time.sleep(1)
-        
-        if _backup_running:
-            create_backup(manual=False)
+    # 启动后先在本线程内立即备份一次，再按间隔循环
+    while _backup_running and not _stop_event.is_set():
+        create_backup(manual=False)
+        # 等待指定间隔；stop_auto_backup() 置位事件时立即返回
+        if _stop_event.wait(timeout=BACKUP_INTERVAL):
+            break
 
 
 def start_auto_backup():
@@ -236,30 +668,29 @@ def start_auto_backup():
         return
     
     _backup_running = True
+    _stop_event.clear()
     _backup_thread = threading.Thread(target=_backup_worker, daemon=True)
     _backup_thread.start()
-    
-    # 启动时立即创建一次备份
-    create_backup(manual=False)
 
 
 def stop_auto_backup():
     """停止自动备份"""
     global _backup_running
     _backup_running = False
+    _stop_event.set()
     print("[Backup] 自动备份已停止")
 
 
 def get_backup_status() -> dict:
     """获取备份状态"""
-    if not _backup_enabled():
+    if not get_backup_enabled():
         return {
             "auto_backup_enabled": False,
             "backup_interval_hours": 0,
             "backup_count": 0,
             "total_size": format_size(0),
             "max_backups": MAX_BACKUPS,
-            "backup_dir": _backup_dir(),
+            "backup_dir": get_backup_dir(),
             "last_backup": None,
             "managed_by": "disabled",
         }
@@ -270,12 +701,12 @@ def get_backup_status() -> dict:
             'backup_count': 0,
             'total_size': format_size(0),
             'max_backups': MAX_BACKUPS,
-            'backup_dir': _backup_dir(),
+            'backup_dir': get_backup_dir(),
             'last_backup': None,
             'managed_by': 'rds'
         }
-    backups = list_backups()
-    total_size = sum(b['size'] for b in backups)
+    ensure_backup_dir()
+    backups, total_size = _list_backup_details(get_backup_dir())
     
     return {
         'auto_backup_enabled': _backup_running,
@@ -283,7 +714,7 @@ def get_backup_status() -> dict:
         'backup_count': len(backups),
         'total_size': format_size(total_size),
         'max_backups': MAX_BACKUPS,
-        'backup_dir': _backup_dir(),
+        'backup_dir': get_backup_dir(),
         'last_backup': backups[0]['created_at'] if backups else None
     }
 
@@ -292,7 +723,7 @@ def get_backup_status() -> dict:
 
 def init_backup_system():
     """初始化备份系统"""
-    if not _backup_enabled():
+    if not get_backup_enabled():
         print("[Backup] 备份已通过 BACKUP_ENABLED 禁用")
         return
     if not is_backup_supported():
@@ -3,21 +3,61 @@ Redis缓存模块
 为数据库查询和API响应提供缓存功能
 """
 
+import asyncio
 import hashlib
 import inspect
 import json
 import logging
+import math
 import os
 import pickle
+import struct
+import threading
 import time
-from functools import wraps
-from typing import Any, Callable, Optional
+import weakref
+from binascii import hexlify
+from functools import lru_cache, wraps
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Union
 
 import redis
+import redis.asyncio as redis_async
+from redis.utils import HIREDIS_AVAILABLE
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover
+    xxhash = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 缓存键：装饰器内部直接使用 bytes 键，省去 redis-py 的编码
+KeyT = Union[str, bytes]
+
+# 热路径上的函数预先绑定为模块级名称，省去每次调用时的模块属性查找
+_monotonic = time.monotonic
+_pickle_dumps = pickle.dumps
+_pickle_loads = pickle.loads
+_orjson_dumps = orjson.dumps if orjson is not None else None
+_orjson_loads = orjson.loads if orjson is not None else None
+_isfinite = math.isfinite
+_JSON_SCALARS = frozenset((str, int, bool, type(None)))
+
 
 def _env_flag(name: str, default: bool = True) -> bool:
     raw = os.getenv(name)
@@ -26,6 +66,206 @@ def _env_flag(name: str, default: bool = True) -> bool:
     return raw.strip().lower() not in ("0", "false", "no", "off", "")
 
 
+# 连接池：等待空闲连接的超时（秒）、空闲连接健康检查间隔（秒）
+REDIS_POOL_TIMEOUT = 5
+REDIS_HEALTH_CHECK_INTERVAL = 30
+
+# 连接状态确认的有效期（秒）
+PING_INTERVAL = 1.0
+
+# clear_pattern：每次 SCAN 的提示数量、每条 UNLINK 的键数、每次管道往返包含的 UNLINK 条数
+CLEAR_SCAN_COUNT = 10000
+CLEAR_BATCH_SIZE = 500
+CLEAR_PIPELINE_BATCHES = 8
+
+# clear_pattern 的服务端脚本：每次调用推进一个 SCAN 游标并 UNLINK 本轮命中的键，
+# 返回 {下一游标, 删除数量}；键名不经过客户端。每次调用只扫一轮，避免长时间阻塞 Redis，
+# UNLINK 按 CLEAR_BATCH_SIZE 分段，避免 unpack 超出 Lua 栈上限
+_CLEAR_PATTERN_LUA = """
+local r = redis.call('SCAN', ARGV[1], 'MATCH', ARGV[2], 'COUNT', ARGV[3])
+local keys = r[2]
+local n = 0
+local step = tonumber(ARGV[4])
+for i = 1, #keys, step do
+    n = n + redis.call('UNLINK', unpack(keys, i, math.min(i + step - 1, #keys)))
+end
+return {r[1], n}
+"""
+
+# 缓存值首字节为格式标记，读取时按标记直接解码
+_FMT_RAW = b'\x00'      # bytes 原样存储
+_FMT_MSGPACK = b'\x01'  # msgspec msgpack
+_FMT_PICKLE = b'\x02'   # msgspec 不可用或无法编码的对象
+_FMT_PICKLE_OOB = b'\x03'  # pickle 协议 5 + 带外缓冲区（大块二进制数据）
+_FMT_JSON = b'\x04'     # orjson（dict/list/tuple 的快速路径）
+_FMT_ZSTD = b'\x05'     # zstd 压缩后的带标记值
+
+# 序列化结果超过该大小时用 zstd 压缩（需安装 zstandard）
+CACHE_COMPRESS_MIN_BYTES = 4096
+CACHE_COMPRESS_LEVEL = 3
+_zstd_local = threading.local()
+
+PICKLE_PROTOCOL = 5
+# 带外缓冲区总大小达到该值才使用分帧格式，小对象直接内联
+PICKLE_OOB_MIN_BYTES = 64 * 1024
+_OOB_COUNT = struct.Struct('<I')
+_OOB_LENGTH = struct.Struct('<Q')
+
+_msgpack_encoder = msgspec.msgpack.Encoder() if msgspec is not None else None
+_msgpack_decoder = msgspec.msgpack.Decoder() if msgspec is not None else None
+
+
+def _serialize(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        # 原始字节不压缩（常见为已压缩或不可压缩的数据）
+        return _FMT_RAW + value
+    data = _encode_value(value)
+    # 带外缓冲区格式本身是大块二进制数据，同样不压缩
+    if (zstandard is not None and len(data) > CACHE_COMPRESS_MIN_BYTES
+            and data[:1] != _FMT_PICKLE_OOB):
+        return _FMT_ZSTD + _zstd_contexts().compressor.compress(data)
+    return data
+
+
+def _zstd_contexts() -> threading.local:
+    # zstd 压缩/解压上下文不能被多个线程同时使用，每个线程各建一份
+    ctx = _zstd_local
+    if not hasattr(ctx, 'compressor'):
+        ctx.compressor = zstandard.ZstdCompressor(level=CACHE_COMPRESS_LEVEL)
+        ctx.decompressor = zstandard.ZstdDecompressor()
+    return ctx
+
+
+def _is_plain_json(value: Any) -> bool:
+    """
+    值仅由 str/int/有限 float/bool/None、list 及 str 键 dict 组成（按精确类型判断）时返回 True；
+    只有这类值经 JSON/msgpack 往返后类型不变。tuple、datetime、UUID、dataclass、numpy
+    以及各类子类都会被转换成别的类型，需走 pickle
+    """
+    value_type = type(value)
+    if value_type in _JSON_SCALARS:
+        return True
+    if value_type is float:
+        return _isfinite(value)
+    if value_type is list:
+        return all(_is_plain_json(item) for item in value)
+    if value_type is dict:
+        return all(type(key) is str and _is_plain_json(item) for key, item in value.items())
+    return False
+
+
+def _encode_value(value: Any) -> bytes:
+    if _is_plain_json(value):
+        if _orjson_dumps is not None:
+            try:
+                return _FMT_JSON + _orjson_dumps(value)
+            except TypeError:
+                # 例如超出 64 位的整数
+                pass
+        if _msgpack_encoder is not None:
+            try:
+                return _FMT_MSGPACK + _msgpack_encoder.encode(value)
+            except (TypeError, ValueError, OverflowError):
+                pass
+    return _pickle_value(value)
+
+
+def _pickle_value(value: Any) -> bytes:
+    """
+    pickle 协议 5 序列化；对象含大块缓冲区（如 numpy 数组、bytearray）时以带外方式导出，
+    避免先拷贝进 pickle 流。分帧格式：缓冲区个数、pickle 流长度、各缓冲区长度，随后依次为数据
+    """
+    buffers: List[pickle.PickleBuffer] = []
+    payload = _pickle_dumps(value, protocol=PICKLE_PROTOCOL, buffer_callback=buffers.append)
+    if not buffers:
+        return _FMT_PICKLE + payload
+    views = [buf.raw() for buf in buffers]
+    if sum(view.nbytes for view in views) < PICKLE_OOB_MIN_BYTES:
+        return _FMT_PICKLE + _pickle_dumps(value, protocol=PICKLE_PROTOCOL)
+    parts = [_FMT_PICKLE_OOB, _OOB_COUNT.pack(len(views)), _OOB_LENGTH.pack(len(payload))]
+    parts.extend(_OOB_LENGTH.pack(view.nbytes) for view in views)
+    parts.append(payload)
+    parts.extend(views)
+    return b''.join(parts)
+
+
+def _unpickle_oob(value: bytes) -> Any:
+    # 复制为可写缓冲区，反序列化出的数组等对象与原先一样可修改
+    data = memoryview(bytearray(value))
+    (count,) = _OOB_COUNT.unpack_from(data, 1)
+    offset = 1 + _OOB_COUNT.size
+    lengths = []
+    for _ in range(count + 1):
+        lengths.append(_OOB_LENGTH.unpack_from(data, offset)[0])
+        offset += _OOB_LENGTH.size
+    chunks = []
+    for length in lengths:
+        chunks.append(data[offset:offset + length])
+        offset += length
+    return _pickle_loads(chunks[0], buffers=chunks[1:])
+
+
+def _decode_msgpack(value: bytes) -> Any:
+    if _msgpack_decoder is None:
+        raise RuntimeError("读取 msgpack 缓存值需要安装 msgspec")
+    return _msgpack_decoder.decode(memoryview(value)[1:])
+
+
+def _decode_pickle(value: bytes) -> Any:
+    return _pickle_loads(memoryview(value)[1:])
+
+
+def _decode_raw(value: bytes) -> bytes:
+    return value[1:]
+
+
+def _decode_zstd(value: bytes) -> Any:
+    if zstandard is None:
+        raise RuntimeError("读取压缩缓存值需要安装 zstandard")
+    return _deserialize(_zstd_contexts().decompressor.decompress(memoryview(value)[1:]))
+
+
+def _decode_json(value: bytes) -> Any:
+    if _orjson_loads is None:
+        raise RuntimeError("读取 JSON 缓存值需要安装 orjson")
+    return _orjson_loads(memoryview(value)[1:])
+
+
+# 格式标记 -> 解码函数（解码函数接收含标记的完整值）
+_DECODERS = {
+    _FMT_RAW: _decode_raw,
+    _FMT_MSGPACK: _decode_msgpack,
+    _FMT_PICKLE: _decode_pickle,
+    _FMT_PICKLE_OOB: _unpickle_oob,
+    _FMT_JSON: _decode_json,
+    _FMT_ZSTD: _decode_zstd,
+}
+
+
+def _deserialize(value: bytes) -> Any:
+    # 按首字节查表解码，正常路径不产生异常；无标记的旧值走兼容解析
+    decoder = _DECODERS.get(value[:1])
+    if decoder is None:
+        return _deserialize_legacy(value)
+    return decoder(value)
+
+
+def _deserialize_legacy(value: bytes) -> Any:
+    """兼容未带格式标记的旧缓存值"""
+    try:
+        # 尝试JSON解码（orjson 直接解析 bytes）
+        if orjson is not None:
+            return orjson.loads(value)
+        return json.loads(value.decode('utf-8'))
+    except Exception:
+        try:
+            # 尝试pickle解码
+            return pickle.loads(value)
+        except Exception:
+            # 返回原始字节
+            return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
 def _cache_enabled() -> bool:
     return _env_flag("CACHE_ENABLED", True)
 
@@ -34,6 +274,10 @@ def _redis_url() -> str:
     return os.getenv("REDIS_URL", "").strip()
 
 
+def _redis_max_connections() -> int:
+    return int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+
+
 class RedisCache:
     """Redis缓存管理器"""
     
@@ -56,7 +300,11 @@ class RedisCache:
         self.password = password
         self.default_ttl = default_ttl
         self._client = None
+        self._pool = None
         self._connected = False
+        self._last_ping_ts = 0.0
+        # 服务端批量删除脚本；None 表示尚未注册，False 表示服务端禁用了 EVAL
+        self._clear_script = None
         
     def connect(self) -> bool:
         """连接Redis服务器"""
@@ -67,30 +315,41 @@ class RedisCache:
             return False
 
         try:
+            # 有界阻塞连接池：并发高峰时等待空闲连接而不是无限新建；
+            # 定期健康检查与 TCP keepalive 及时发现长连接失效
+            pool_options = dict(
+                decode_responses=False,  # 不自动解码，支持二进制数据
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                socket_keepalive=True,
+                retry_on_timeout=True,
+                health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                max_connections=_redis_max_connections(),
+                timeout=REDIS_POOL_TIMEOUT,
+            )
+            if self._pool is not None:
+                self._pool.disconnect()
             url = _redis_url()
             if url:
-                self._client = redis.Redis.from_url(
-                    url,
-                    decode_responses=False,
-                    socket_connect_timeout=5,
-                    socket_timeout=5,
-                    retry_on_timeout=True,
-                )
+                self._pool = redis.BlockingConnectionPool.from_url(url, **pool_options)
             else:
-                self._client = redis.Redis(
+                self._pool = redis.BlockingConnectionPool(
                     host=self.host,
                     port=self.port,
                     db=self.db,
                     password=self.password,
-                    decode_responses=False,  # 不自动解码，支持二进制数据
-                    socket_connect_timeout=5,
-                    socket_timeout=5,
-                    retry_on_timeout=True,
+                    **pool_options,
                 )
+            self._client = redis.Redis(connection_pool=self._pool)
+            self._clear_script = None
             # 测试连接
             self._client.ping()
             self._connected = True
-            logger.info("Redis连接成功")
+            self._last_ping_ts = _monotonic()
+            # 安装 hiredis 时 redis-py 自动使用 C 实现的响应解析器
+            logger.info(f"Redis连接成功（响应解析器: {'hiredis' if HIREDIS_AVAILABLE else '纯 Python'}）")
+            if not HIREDIS_AVAILABLE:
+                logger.warning("未安装 hiredis，Redis 响应使用纯 Python 解析")
             return True
         except Exception as e:
             logger.error(f"Redis连接失败: {e}")
@@ -98,16 +357,30 @@ class RedisCache:
             return False
     
     def is_connected(self) -> bool:
-        """检查Redis连接状态"""
+        """
+        检查Redis连接状态
+        
+        最近 PING_INTERVAL 秒内确认过连接时直接返回，不再为每次缓存操作多发一次 PING；
+        真正的断线由各操作捕获连接错误后标记
+        """
         if not self._connected or not self._client:
             return False
+        now = _monotonic()
+        if now - self._last_ping_ts < PING_INTERVAL:
+            return True
         try:
             self._client.ping()
+            self._last_ping_ts = now
             return True
         except Exception:
             self._connected = False
             return False
     
+    def _note_failure(self, error: Exception) -> None:
+        """连接类错误时标记断开，下次操作重新 PING / 重连"""
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            self._connected = False
+    
     def get_client(self) -> Optional[redis.Redis]:
         """获取Redis客户端实例"""
         if not self.is_connected():
@@ -115,7 +388,7 @@ class RedisCache:
                 return None
         return self._client
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    def set(self, key: KeyT, value: Any, ttl: Optional[int] = None, nx: bool = False) -> bool:
         """
         设置缓存
         
@@ -123,6 +396,7 @@ class RedisCache:
             key: 缓存键
             value: 缓存值
             ttl: 过期时间（秒），None使用默认值
+            nx: 仅在键不存在时写入（SET ... EX ttl NX，不覆盖并发写入者的结果）
             
         Returns:
             是否设置成功
@@ -132,26 +406,25 @@ class RedisCache:
             return False
         
         try:
-            # 序列化值
-            if isinstance(value, (str, int, float, bool, bytes)):
-                serialized = value
-            else:
-                serialized = pickle.dumps(value)
+            # 序列化值（带格式标记）
+            serialized = _serialize(value)
             
             ttl = ttl if ttl is not None else self.default_ttl
-            result = client.setex(key, ttl, serialized)
+            result = client.set(key, serialized, ex=ttl, nx=nx)
             return bool(result)
         except Exception as e:
             logger.error(f"设置缓存失败: {e}")
+            self._note_failure(e)
             return False
     
-    def get(self, key: str, default: Any = None) -> Any:
+    def get(self, key: KeyT, default: Any = None, touch_ttl: Optional[int] = None) -> Any:
         """
         获取缓存
         
         Args:
             key: 缓存键
             default: 缓存不存在时的默认值
+            touch_ttl: 命中时同时把过期时间重置为该值（GETEX，需 Redis 6.2+）
             
         Returns:
             缓存值或默认值
@@ -161,25 +434,71 @@ class RedisCache:
             return default
         
         try:
-            value = client.get(key)
+            if touch_ttl is None:
+                value = client.get(key)
+            else:
+                value = client.getex(key, ex=touch_ttl)
             if value is None:
                 return default
             
-            # 反序列化值
-            try:
-                # 尝试JSON解码
-                return json.loads(value.decode('utf-8'))
-            except Exception:
-                try:
-                    # 尝试pickle解码
-                    return pickle.loads(value)
-                except Exception:
-                    # 返回原始字节
-                    return value.decode('utf-8') if isinstance(value, bytes) else value
+            # 按格式标记反序列化
+            return _deserialize(value)
         except Exception as e:
             logger.error(f"获取缓存失败: {e}")
+            self._note_failure(e)
             return default
     
+    def mget(self, keys: List[str], default: Any = None) -> List[Any]:
+        """
+        批量获取缓存（一次 MGET 往返）
+        
+        Args:
+            keys: 缓存键列表
+            default: 缓存不存在时的默认值
+            
+        Returns:
+            与 keys 顺序一致的值列表
+        """
+        if not keys:
+            return []
+        client = self.get_client()
+        if not client:
+            return [default] * len(keys)
+        
+        try:
+            values = client.mget(keys)
+            return [default if value is None else _deserialize(value) for value in values]
+        except Exception as e:
+            logger.error(f"批量获取缓存失败: {e}")
+            self._note_failure(e)
+            return [default] * len(keys)
+    
+    def mset_ex(self, items: Iterable[Tuple[str, Any]], ttl: Optional[int] = None) -> bool:
+        """
+        批量设置缓存（非事务管道，一次往返）
+        
+        Args:
+            items: (键, 值) 序列
+            ttl: 过期时间（秒），None使用默认值
+            
+        Returns:
+            是否全部设置成功
+        """
+        client = self.get_client()
+        if not client:
+            return False
+        
+        try:
+            ttl = ttl if ttl is not None else self.default_ttl
+            pipe = client.pipeline(transaction=False)
+            for key, value in items:
+                pipe.setex(key, ttl, _serialize(value))
+            return all(pipe.execute())
+        except Exception as e:
+            logger.error(f"批量设置缓存失败: {e}")
+            self._note_failure(e)
+            return False
+    
     def delete(self, key: str) -> bool:
         """删除缓存"""
         client = self.get_client()
@@ -191,6 +510,7 @@ class RedisCache:
             return bool(result)
         except Exception as e:
             logger.error(f"删除缓存失败: {e}")
+            self._note_failure(e)
             return False
     
     def exists(self, key: str) -> bool:
@@ -203,6 +523,7 @@ class RedisCache:
             return bool(client.exists(key))
         except Exception as e:
             logger.error(f"检查缓存失败: {e}")
+            self._note_failure(e)
             return False
     
     def clear_pattern(self, pattern: str) -> int:
@@ -219,21 +540,58 @@ class RedisCache:
         if not client:
             return 0
         
+        if self._clear_script is not False:
+            try:
+                return self._clear_pattern_script(client, pattern)
+            except redis.ResponseError as e:
+                # 部分托管 Redis 禁用 EVAL/EVALSHA，之后固定走客户端扫描
+                logger.warning(f"服务端批量删除不可用，改用客户端扫描: {e}")
+                self._clear_script = False
+            except Exception as e:
+                logger.error(f"清除模式缓存失败: {e}")
+                self._note_failure(e)
+                return 0
+        
         try:
+            # UNLINK 在后台线程释放内存，不阻塞 Redis 主线程；
+            # 删除命令攒在非事务管道中，每 CLEAR_PIPELINE_BATCHES 批才往返一次
             deleted = 0
+            pending = 0
+            pipe = client.pipeline(transaction=False)
             batch: list[bytes] = []
-            for key in client.scan_iter(match=pattern, count=1000):
+            for key in client.scan_iter(match=pattern, count=CLEAR_SCAN_COUNT):
                 batch.append(key)
-                if len(batch) >= 500:
-                    deleted += int(client.delete(*batch))
-                    batch.clear()
+                if len(batch) >= CLEAR_BATCH_SIZE:
+                    pipe.unlink(*batch)
+                    batch = []
+                    pending += 1
+                    if pending >= CLEAR_PIPELINE_BATCHES:
+                        deleted += sum(int(n) for n in pipe.execute())
+                        pending = 0
             if batch:
-                deleted += int(client.delete(*batch))
+                pipe.unlink(*batch)
+                pending += 1
+            if pending:
+                deleted += sum(int(n) for n in pipe.execute())
             return deleted
         except Exception as e:
             logger.error(f"清除模式缓存失败: {e}")
+            self._note_failure(e)
             return 0
     
+    def _clear_pattern_script(self, client, pattern: str) -> int:
+        """用 Lua 脚本在服务端逐个游标扫描并删除，每个游标位置一次往返"""
+        if self._clear_script is None:
+            self._clear_script = client.register_script(_CLEAR_PATTERN_LUA)
+        script = self._clear_script
+        deleted = 0
+        cursor = 0
+        while True:
+            cursor, n = script(args=[cursor, pattern, CLEAR_SCAN_COUNT, CLEAR_BATCH_SIZE])
+            deleted += int(n)
+            if int(cursor) == 0:
+                return deleted
+    
     def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """递增计数器"""
         client = self.get_client()
@@ -244,6 +602,7 @@ class RedisCache:
             return client.incrby(key, amount)
         except Exception as e:
             logger.error(f"递增计数器失败: {e}")
+            self._note_failure(e)
             return None
     
     def get_stats(self) -> dict:
@@ -253,21 +612,290 @@ class RedisCache:
             return {"connected": False}
         
         try:
-            info = client.info()
+            # 只取用到的三个 INFO 分区，合并在一次管道往返中
+            pipe = client.pipeline(transaction=False)
+            pipe.info(section='stats')
+            pipe.info(section='memory')
+            pipe.info(section='clients')
+            stats, memory, clients = pipe.execute()
+            hits = stats.get('keyspace_hits', 0)
+            misses = stats.get('keyspace_misses', 0)
             return {
                 "connected": True,
-                "used_memory": info.get('used_memory_human', 'N/A'),
-                "connected_clients": info.get('connected_clients', 0),
-                "total_commands_processed": info.get('total_commands_processed', 0),
-                "keyspace_hits": info.get('keyspace_hits', 0),
-                "keyspace_misses": info.get('keyspace_misses', 0),
-                "hit_rate": info.get('keyspace_hits', 0) / max(1, info.get('keyspace_hits', 0) + info.get('keyspace_misses', 0))
+                "used_memory": memory.get('used_memory_human', 'N/A'),
+                "connected_clients": clients.get('connected_clients', 0),
+                "total_commands_processed": stats.get('total_commands_processed', 0),
+                "keyspace_hits": hits,
+                "keyspace_misses": misses,
+                "hit_rate": hits / (hits + misses or 1)
             }
         except Exception as e:
             logger.error(f"获取缓存统计失败: {e}")
+            self._note_failure(e)
             return {"connected": False, "error": str(e)}
 
 
+class AsyncRedisCache:
+    """
+    基于 redis.asyncio 的缓存管理器，供装饰器包装的协程使用
+    
+    Redis I/O 期间让出事件循环；连接绑定事件循环，通过 get_async_cache() 按循环获取实例
+    """
+    
+    def __init__(self, host: str = 'localhost', port: int = 6379, 
+                 db: int = 0, password: Optional[str] = None,
+                 default_ttl: int = 300):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.default_ttl = default_ttl
+        self._client = None
+        self._connected = False
+        self._last_ping_ts = 0.0
+        self._last_connect_ts = float('-inf')
+    
+    async def connect(self) -> bool:
+        """连接Redis服务器"""
+        self._last_connect_ts = _monotonic()
+        if not _cache_enabled():
+            self._connected = False
+            self._client = None
+            return False
+        
+        try:
+            pool_options = dict(
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                socket_keepalive=True,
+                retry_on_timeout=True,
+                health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                max_connections=_redis_max_connections(),
+                timeout=REDIS_POOL_TIMEOUT,
+            )
+            url = _redis_url()
+            if url:
+                pool = redis_async.BlockingConnectionPool.from_url(url, **pool_options)
+            else:
+                pool = redis_async.BlockingConnectionPool(
+                    host=self.host,
+                    port=self.port,
+                    db=self.db,
+                    password=self.password,
+                    **pool_options,
+                )
+            self._client = redis_async.Redis(connection_pool=pool)
+            await self._client.ping()
+            self._connected = True
+            self._last_ping_ts = _monotonic()
+            return True
+        except Exception as e:
+            logger.error(f"Redis异步连接失败: {e}")
+            self._connected = False
+            return False
+    
+    async def _reconnect(self) -> bool:
+        """
+        断开后重新连接，PING_INTERVAL 内最多尝试一次（对应 RedisCache.get_client 的重连）
+        已有客户端时只需 PING：连接池会重建底层连接
+        """
+        now = _monotonic()
+        if now - self._last_connect_ts < PING_INTERVAL:
+            return False
+        if self._client is None:
+            return await self.connect()
+        self._last_connect_ts = now
+        try:
+            await self._client.ping()
+        except Exception as e:
+            logger.debug("Redis异步重连失败: %s", e)
+            return False
+        self._connected = True
+        self._last_ping_ts = now
+        return True
+    
+    async def is_connected(self) -> bool:
+        """检查Redis连接状态（与 RedisCache 相同，PING_INTERVAL 内不重复 PING；断开时尝试重连）"""
+        if not self._connected or not self._client:
+            return await self._reconnect()
+        now = _monotonic()
+        if now - self._last_ping_ts < PING_INTERVAL:
+            return True
+        try:
+            await self._client.ping()
+            self._last_ping_ts = now
+            return True
+        except Exception:
+            self._connected = False
+            return False
+    
+    def _note_failure(self, error: Exception) -> None:
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            self._connected = False
+    
+    async def _ensure_connected(self) -> bool:
+        """读写前的可用性检查：已连接直接返回，断开时按 PING_INTERVAL 限频重连"""
+        if self._connected and self._client:
+            return True
+        return await self._reconnect()
+    
+    async def get(self, key: KeyT, default: Any = None, touch_ttl: Optional[int] = None) -> Any:
+        """获取缓存（touch_ttl 同 RedisCache.get）"""
+        if not await self._ensure_connected():
+            return default
+        try:
+            if touch_ttl is None:
+                value = await self._client.get(key)
+            else:
+                value = await self._client.getex(key, ex=touch_ttl)
+            if value is None:
+                return default
+            return _deserialize(value)
+        except Exception as e:
+            logger.error(f"获取缓存失败: {e}")
+            self._note_failure(e)
+            return default
+    
+    async def set(self, key: KeyT, value: Any, ttl: Optional[int] = None, nx: bool = False) -> bool:
+        """设置缓存（nx 同 RedisCache.set）"""
+        if not await self._ensure_connected():
+            return False
+        try:
+            ttl = ttl if ttl is not None else self.default_ttl
+            return bool(await self._client.set(key, _serialize(value), ex=ttl, nx=nx))
+        except Exception as e:
+            logger.error(f"设置缓存失败: {e}")
+            self._note_failure(e)
+            return False
+    
+    async def mget(self, keys: List[str], default: Any = None) -> List[Any]:
+        """批量获取缓存（一次 MGET 往返）"""
+        if not keys:
+            return []
+        if not await self._ensure_connected():
+            return [default] * len(keys)
+        try:
+            values = await self._client.mget(keys)
+            return [default if value is None else _deserialize(value) for value in values]
+        except Exception as e:
+            logger.error(f"批量获取缓存失败: {e}")
+            self._note_failure(e)
+            return [default] * len(keys)
+    
+    async def mset_ex(self, items: Iterable[Tuple[str, Any]], ttl: Optional[int] = None) -> bool:
+        """批量设置缓存（非事务管道，一次往返）"""
+        if not await self._ensure_connected():
+            return False
+        try:
+            ttl = ttl if ttl is not None else self.default_ttl
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in items:
+                pipe.setex(key, ttl, _serialize(value))
+            return all(await pipe.execute())
+        except Exception as e:
+            logger.error(f"批量设置缓存失败: {e}")
+            self._note_failure(e)
+            return False
+
+
+# 缓存键参数的规范化编码：优先 msgpack（无法编码的对象退回 repr），否则使用 repr
+_key_encoder = msgspec.msgpack.Encoder(enc_hook=repr) if msgspec is not None else None
+
+
+_SET_MARKER = "\x00set"
+
+
+def _sort_canonical(items: list) -> list:
+    try:
+        return sorted(items)
+    except TypeError:
+        # 元素类型不可互相比较时按 repr 排序
+        return sorted(items, key=repr)
+
+
+def _canonical(obj: Any) -> Any:
+    """
+    规范化缓存键参数：字典按键排序，集合转为排好序的列表（带标记以区别于普通列表），
+    使内容相同的参数无论插入顺序如何都得到相同的键
+    """
+    obj_type = type(obj)
+    if obj_type is dict:
+        return {key: _canonical(obj[key]) for key in _sort_canonical(list(obj))}
+    if obj_type in (list, tuple):
+        return [_canonical(item) for item in obj]
+    if obj_type in (set, frozenset):
+        return [_SET_MARKER] + _sort_canonical([_canonical(item) for item in obj])
+    return obj
+
+
+def _encode_key_args(args: tuple, kwargs: dict) -> bytes:
+    payload = (_canonical(args), _canonical(kwargs) if kwargs else ())
+    if _key_encoder is not None:
+        try:
+            return _key_encoder.encode(payload)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return repr(payload).encode('utf-8')
+
+
+# 参数直接拼接成的缓存键的最大长度，超过则改为哈希
+KEY_INLINE_MAX_LEN = 128
+
+
+def _inline_part(value: Any) -> Optional[str]:
+    # 类型标记区分 1、True、1.0 与 "1"；字符串带长度前缀，内容含 "|" 也不会产生歧义
+    value_type = type(value)
+    if value_type is str:
+        return f"s{len(value)}:{value}"
+    if value_type is int:
+        return f"i:{value}"
+    if value_type is bool:
+        return f"b:{value}"
+    if value_type is float:
+        return f"f:{value!r}"
+    if value is None:
+        return "n:"
+    return None
+
+
+def _inline_key(args: tuple, kwargs: dict) -> Optional[str]:
+    """参数均为 int/str/bool/float/None 时返回可读的缓存键（总含 ":"，不会与十六进制摘要冲突）"""
+    parts = []
+    for value in args:
+        part = _inline_part(value)
+        if part is None:
+            return None
+        parts.append(part)
+    if kwargs:
+        for name in sorted(kwargs):
+            part = _inline_part(kwargs[name])
+            if part is None:
+                return None
+            parts.append(f"{name}={part}")
+    key = "|".join(parts)
+    if len(key) > KEY_INLINE_MAX_LEN:
+        return None
+    return key
+
+
+def _hash_digest(data: bytes) -> bytes:
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _hash_key(data: bytes) -> str:
+    return _hash_digest(data).hex()
+
+
+def _cache_key_bytes(args: tuple, kwargs: dict) -> bytes:
+    """与 cache_key_generator 相同的键，直接以 bytes 返回（redis-py 对 bytes 键不再编码）"""
+    key = _inline_key(args, kwargs)
+    if key is not None:
+        return key.encode('utf-8')
+    return hexlify(_hash_digest(_encode_key_args(args, kwargs)))
+
+
 def cache_key_generator(*args, **kwargs) -> str:
     """
     生成缓存键
@@ -279,50 +907,70 @@ def cache_key_generator(*args, **kwargs) -> str:
     Returns:
         缓存键字符串
     """
-    # 创建参数的字符串表示
-    args_str = str(args)
-    kwargs_str = str(sorted(kwargs.items()))
-    
-    # 生成MD5哈希作为键
-    key_data = f"{args_str}:{kwargs_str}".encode('utf-8')
-    return hashlib.md5(key_data).hexdigest()
+    # 参数全为基本类型且较短时直接拼成键，不做编码和哈希
+    key = _inline_key(args, kwargs)
+    if key is not None:
+        return key
+    # 参数规范化编码后取 128 位哈希（xxh3 可用时使用 xxh3，否则 blake2b）
+    return _hash_key(_encode_key_args(args, kwargs))
 
 
-def cached(ttl: int = 300, key_prefix: str = "func"):
+def cached(
+    ttl: int = 300,
+    key_prefix: str = "func",
+    sliding: bool = False,
+    cache_none: bool = False,
+    cache_empty: bool = False,
+):
     """
     缓存装饰器
     
     Args:
         ttl: 缓存时间（秒）
         key_prefix: 缓存键前缀
+        sliding: 命中时用 GETEX 顺带续期；默认按写入时间固定过期，避免热点数据永不刷新
+        cache_none: 是否缓存 None 结果；默认不缓存，下次调用重新计算
+        cache_empty: 是否缓存空容器/空字符串等长度为 0 的结果；默认不缓存
         
     Returns:
         装饰器函数
     """
+    def _storable(result: Any) -> bool:
+        if result is None:
+            return cache_none
+        if not cache_empty and hasattr(result, "__len__") and len(result) == 0:
+            return False
+        return True
+
     def decorator(func: Callable):
         missing = object()
+        touch_ttl = ttl if sliding else None
+
+        # 统一以 "cache:" 开头，便于按前缀清理；前缀在装饰时拼好并编码为 bytes
+        prefix = f"cache:{key_prefix}:{func.__module__}:{func.__name__}:".encode('utf-8')
 
-        def _build_key(args: tuple[object, ...], kwargs: dict[str, object]) -> str:
-            digest = cache_key_generator(*args, **kwargs)
-            # 统一以 "cache:" 开头，便于按前缀清理
-            return f"cache:{key_prefix}:{func.__module__}:{func.__name__}:{digest}"
+        def _build_key(args: tuple[object, ...], kwargs: dict[str, object]) -> bytes:
+            return prefix + _cache_key_bytes(args, kwargs)
 
         if inspect.iscoroutinefunction(func):
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
-                cache = get_cache()
-                if not cache or not cache.is_connected():
+                # 协程使用异步客户端，Redis 往返期间不阻塞事件循环
+                cache = await get_async_cache()
+                if not await cache.is_connected():
                     return await func(*args, **kwargs)
 
                 cache_key = _build_key(args, kwargs)
-                cached_result = cache.get(cache_key, default=missing)
+                cached_result = await cache.get(cache_key, default=missing, touch_ttl=touch_ttl)
                 if cached_result is not missing:
-                    logger.debug(f"缓存命中: {cache_key}")
+                    logger.debug("缓存命中: %r", cache_key)
                     return cached_result
 
-                logger.debug(f"缓存未命中: {cache_key}")
+                logger.debug("缓存未命中: %r", cache_key)
                 result = await func(*args, **kwargs)
-                cache.set(cache_key, result, ttl)
+                # NX：并发未命中时保留先写入的结果
+                if _storable(result):
+                    await cache.set(cache_key, result, ttl, nx=True)
                 return result
 
             return async_wrapper
@@ -334,20 +982,91 @@ def cached(ttl: int = 300, key_prefix: str = "func"):
                 return func(*args, **kwargs)
 
             cache_key = _build_key(args, kwargs)
-            cached_result = cache.get(cache_key, default=missing)
+            cached_result = cache.get(cache_key, default=missing, touch_ttl=touch_ttl)
             if cached_result is not missing:
-                logger.debug(f"缓存命中: {cache_key}")
+                logger.debug("缓存命中: %r", cache_key)
                 return cached_result
 
-            logger.debug(f"缓存未命中: {cache_key}")
+            logger.debug("缓存未命中: %r", cache_key)
             result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
+            if _storable(result):
+                cache.set(cache_key, result, ttl, nx=True)
             return result
 
         return sync_wrapper
     return decorator
 
 
+def cached_batch(ttl: int = 300, key_prefix: str = "batch"):
+    """
+    批量缓存装饰器
+    
+    被装饰函数的第一个参数为输入序列，返回与之等长、顺序一致的结果列表；
+    每个输入单独缓存，命中的直接返回，只把未命中的输入交给被装饰函数，
+    读写各用一次 MGET / 管道往返。
+    
+    Args:
+        ttl: 缓存时间（秒）
+        key_prefix: 缓存键前缀
+        
+    Returns:
+        装饰器函数
+    """
+    def decorator(func: Callable):
+        missing = object()
+
+        prefix = f"cache:{key_prefix}:{func.__module__}:{func.__name__}:"
+
+        def _build_keys(items: list, args: tuple, kwargs: dict) -> List[str]:
+            return [prefix + cache_key_generator(item, *args, **kwargs) for item in items]
+
+        def _misses(results: list) -> List[int]:
+            return [i for i, value in enumerate(results) if value is missing]
+
+        def _merge(keys: List[str], results: list, misses: List[int], computed: list):
+            for i, value in zip(misses, computed, strict=True):
+                results[i] = value
+            return [(keys[i], results[i]) for i in misses]
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(items, *args, **kwargs):
+                items = list(items)
+                cache = await get_async_cache()
+                if not items or not await cache.is_connected():
+                    return await func(items, *args, **kwargs)
+
+                keys = _build_keys(items, args, kwargs)
+                results = await cache.mget(keys, default=missing)
+                misses = _misses(results)
+                if not misses:
+                    return results
+                computed = await func([items[i] for i in misses], *args, **kwargs)
+                await cache.mset_ex(_merge(keys, results, misses, list(computed)), ttl)
+                return results
+
+            return async_wrapper
+
+        @wraps(func)
+        def sync_wrapper(items, *args, **kwargs):
+            items = list(items)
+            cache = get_cache()
+            if not items or not cache or not cache.is_connected():
+                return func(items, *args, **kwargs)
+
+            keys = _build_keys(items, args, kwargs)
+            results = cache.mget(keys, default=missing)
+            misses = _misses(results)
+            if not misses:
+                return results
+            computed = func([items[i] for i in misses], *args, **kwargs)
+            cache.mset_ex(_merge(keys, results, misses, list(computed)), ttl)
+            return results
+
+        return sync_wrapper
+    return decorator
+
+
 def invalidate_cache(pattern: str = None):
     """
     缓存失效装饰器
@@ -388,6 +1107,24 @@ def invalidate_cache(pattern: str = None):
 
 # 全局缓存实例
 _cache_instance: Optional[RedisCache] = None
+_init_lock = threading.Lock()
+# 事件循环 -> 异步缓存实例（循环销毁后自动移除）
+_async_caches: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncRedisCache]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _cache_settings(host: str = 'localhost', port: int = 6379,
+                    db: int = 0, password: Optional[str] = None,
+                    default_ttl: int = 300) -> dict:
+    """连接参数：环境变量优先于传入的默认值"""
+    return dict(
+        host=os.getenv("REDIS_HOST", host),
+        port=int(os.getenv("REDIS_PORT", str(port))),
+        db=int(os.getenv("REDIS_DB", str(db))),
+        password=os.getenv("REDIS_PASSWORD") or password,
+        default_ttl=int(os.getenv("CACHE_DEFAULT_TTL", str(default_ttl))),
+    )
 
 
 def init_cache(host: str = 'localhost', port: int = 6379, 
@@ -401,27 +1138,44 @@ def init_cache(host: str = 'localhost', port: int = 6379,
     """
     global _cache_instance
     if _cache_instance is None:
-        host = os.getenv("REDIS_HOST", host)
-        port = int(os.getenv("REDIS_PORT", str(port)))
-        db = int(os.getenv("REDIS_DB", str(db)))
-        password = os.getenv("REDIS_PASSWORD") or password
-        default_ttl = int(os.getenv("CACHE_DEFAULT_TTL", str(default_ttl)))
-
-        _cache_instance = RedisCache(
-            host=host, port=port, db=db, 
-            password=password, default_ttl=default_ttl
-        )
-        _cache_instance.connect()
+        # 双重检查加锁：避免多个线程同时初始化并重复连接
+        with _init_lock:
+            if _cache_instance is None:
+                instance = RedisCache(**_cache_settings(host, port, db, password, default_ttl))
+                instance.connect()
+                _cache_instance = instance
     return _cache_instance
 
 
+@lru_cache(maxsize=1)
 def get_cache() -> Optional[RedisCache]:
-    """获取全局缓存实例"""
+    """获取全局缓存实例（首次调用时按默认配置初始化，之后直接返回同一实例）"""
+    return init_cache()
+
+
+async def get_async_cache() -> AsyncRedisCache:
+    """
+    获取当前事件循环的异步缓存实例
+    
+    redis.asyncio 的连接绑定创建时的事件循环，因此每个循环各自持有一个实例
+    """
+    loop = asyncio.get_running_loop()
+    cache = _async_caches.get(loop)
+    if cache is None:
+        cache = AsyncRedisCache(**_cache_settings())
+        # 先登记再连接：同一循环内并发的首次调用不会重复创建
+        _async_caches[loop] = cache
+        await cache.connect()
+    return cache
+
+
+def reset_cache() -> None:
+    """丢弃全局缓存实例，下次 get_cache() 时重新初始化（用于测试或配置变更）"""
     global _cache_instance
-    if _cache_instance is None:
-        # 尝试使用默认配置初始化
-        _cache_instance = init_cache()
-    return _cache_instance
+    with _init_lock:
+        _cache_instance = None
+        get_cache.cache_clear()
+        _async_caches.clear()
 
 
 def clear_cache() -> bool:
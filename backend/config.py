@@ -1,8 +1,12 @@
 """
 Shared configuration helpers.
+
+Values are read from the environment once and memoized; call reload_config()
+after changing the environment (e.g. in tests).
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -15,28 +19,33 @@ def _get_env_path(var_name: str, default_name: str) -> str:
     return str(BASE_DIR / default_name)
 
 
+@lru_cache(maxsize=None)
 def ensure_parent_dir(path: str) -> None:
     parent = os.path.dirname(path)
     if parent:
         os.makedirs(parent, exist_ok=True)
 
 
+@lru_cache(maxsize=None)
 def get_database_path() -> str:
     path = _get_env_path("DATABASE_PATH", "gas_data.db")
     ensure_parent_dir(path)
     return path
 
 
+@lru_cache(maxsize=None)
 def get_security_db_path() -> str:
     path = _get_env_path("SECURITY_DB_PATH", "security.db")
     ensure_parent_dir(path)
     return path
 
 
+@lru_cache(maxsize=None)
 def get_database_url() -> str:
     return os.getenv("DATABASE_URL", "").strip()
 
 
+@lru_cache(maxsize=None)
 def get_security_database_url() -> str:
     value = os.getenv("SECURITY_DATABASE_URL", "").strip()
     if value:
@@ -44,13 +53,48 @@ def get_security_database_url() -> str:
     return get_database_url()
 
 
+@lru_cache(maxsize=None)
 def get_backup_dir() -> str:
     path = _get_env_path("BACKUP_DIR", "backups")
     return path
 
 
-def get_cors_origins() -> list:
+def _get_env_flag(var_name: str, default: bool = True) -> bool:
+    raw = os.getenv(var_name)
+    if raw is None:
+        return default
+    return raw.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+@lru_cache(maxsize=None)
+def get_backup_enabled() -> bool:
+    return _get_env_flag("BACKUP_ENABLED")
+
+
+@lru_cache(maxsize=None)
+def get_backup_compression() -> bool:
+    return _get_env_flag("BACKUP_COMPRESSION")
+
+
+@lru_cache(maxsize=None)
+def get_cors_origins() -> tuple:
     raw = os.getenv("CORS_ORIGINS", "")
     if not raw:
-        return []
-    return [origin.strip() for origin in raw.split(",") if origin.strip()]
+        return ()
+    return tuple(origin.strip() for origin in raw.split(",") if origin.strip())
+
+
+def reload_config() -> None:
+    """Drop memoized values so the next call re-reads the environment."""
+    for func in (
+        ensure_parent_dir,
+        get_database_path,
+        get_security_db_path,
+        get_database_url,
+        get_security_database_url,
+        get_backup_dir,
+        get_backup_enabled,
+        get_backup_compression,
+        get_cors_origins,
+    ):
+        func.cache_clear()
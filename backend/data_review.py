@@ -2,11 +2,145 @@
 数据审核模块 - 处理同组分同温度下多压力值的数据
 """
 
-from typing import List, Dict, Any
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List
+
+from pymysql.cursors import SSCursor
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
 
 from backend.db import get_connection, is_mysql
 
 
+# MySQL GROUP_CONCAT 默认只保留 1024 字节，查找重复组前放宽到会话级上限
+MYSQL_GROUP_CONCAT_MAX_LEN = 16 * 1024 * 1024
+
+# 待审核组总数的进程内缓存（秒），翻页时不必每页重新 COUNT(DISTINCT)；0 表示禁用
+PENDING_TOTAL_CACHE_TTL = float(os.getenv("PENDING_TOTAL_CACHE_TTL", "5"))
+PENDING_TOTAL_CACHE_MAXSIZE = 256
+
+_pending_total_cache: Dict[tuple, tuple] = {}
+_pending_total_lock = threading.Lock()
+
+
+def clear_review_caches() -> None:
+    """清空待审核统计缓存（待审核数据变更或直接修改数据库后调用）"""
+    with _pending_total_lock:
+        _pending_total_cache.clear()
+
+
+def _cached_pending_total(key: tuple) -> Any:
+    if PENDING_TOTAL_CACHE_TTL <= 0:
+        return None
+    with _pending_total_lock:
+        item = _pending_total_cache.get(key)
+    if item is None or item[1] <= time.monotonic():
+        return None
+    return item[0]
+
+
+def _store_pending_total(key: tuple, total: int) -> None:
+    if PENDING_TOTAL_CACHE_TTL <= 0:
+        return
+    with _pending_total_lock:
+        if len(_pending_total_cache) >= PENDING_TOTAL_CACHE_MAXSIZE:
+            _pending_total_cache.clear()
+        _pending_total_cache[key] = (total, time.monotonic() + PENDING_TOTAL_CACHE_TTL)
+
+
+# 审核表结构版本：修改 init_review_tables 中的表、列或索引时递增
+SCHEMA_NAME = "data_review"
+REVIEW_SCHEMA_VERSION = 1
+
+# 审核通过时多行 INSERT 每批的行数（每行 9 个参数，保持在 SQLite 999 个绑定参数以内）
+APPROVE_INSERT_BATCH_SIZE = 100
+
+# GROUP_CONCAT 的 id 串超过该长度时用 numpy 向量化解析（短串调用 numpy 的固定开销更大）
+NUMPY_PARSE_MIN_LEN = 256
+
+# 同组判定所用的列（组分 + 温度，与 idx_gas_comp_temp 的列顺序一致）与移入待审核表时复制的列。
+# 分组按原始列精确比较：覆盖索引已让分组按索引顺序流式进行，若改用组分哈希列，
+# 哈希碰撞或取整会把不同组分并入同一组
+_GROUP_FIELDS = ("x_ch4", "x_c2h6", "x_c3h8", "x_co2", "x_n2", "x_h2s", "x_ic4h10", "temperature")
+_PENDING_FIELDS = _GROUP_FIELDS + ("pressure",)
+_GROUP_KEY = ", ".join(_GROUP_FIELDS)
+_PENDING_COLUMNS = ", ".join(_PENDING_FIELDS)
+_pending_values = itemgetter(*_PENDING_FIELDS)
+
+# 审核通过时写入正式表的语句，模块加载时拼好，各次执行的语句文本相同
+_GAS_VALUES = "(" + ", ".join("?" * len(_PENDING_FIELDS)) + ")"
+_INSERT_GAS_SQL = f"INSERT INTO gas_mixture ({_PENDING_COLUMNS}) VALUES {_GAS_VALUES}"
+
+
+def _begin_transaction(conn) -> None:
+    """
+    批量操作前显式开启事务，整个操作只提交（fsync）一次
+    SQLite 用 BEGIN IMMEDIATE 立即取得写锁，避免读出下一个组号后被其他写入方抢先
+    """
+    if is_mysql():
+        conn.begin()
+        return
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("BEGIN IMMEDIATE")
+
+
+def _id_list_sql() -> str:
+    """
+    以单个 JSON 参数绑定整数 id 列表的子查询：语句文本固定，可命中预编译语句缓存，
+    也不受 SQLite 绑定参数数量上限约束
+    """
+    if is_mysql():
+        return "SELECT id FROM JSON_TABLE(?, '$[*]' COLUMNS(id BIGINT PATH '$')) AS id_list"
+    return "SELECT value FROM json_each(?)"
+
+
+def _group_id_sql(number: str) -> str:
+    """组序号格式化为 G0001 形式的 SQL 表达式（超过 4 位时不截断）"""
+    if is_mysql():
+        return f"CONCAT('G', LPAD({number}, GREATEST(4, CHAR_LENGTH({number})), '0'))"
+    return f"printf('G%04d', {number})"
+
+
+def _move_to_review(cursor, numbered_sql: str, params: tuple) -> tuple:
+    """
+    在数据库内把记录移到待审核表，返回 (移动记录数, 组数)
+    numbered_sql 需选出 _PENDING_COLUMNS、id 以及组序号 group_number
+    """
+    cursor.execute("SELECT COALESCE(MAX(id), 0) as max_id FROM pending_review")
+    marker = cursor.fetchone()['max_id']
+
+    # INSERT ... SELECT 直接在服务端复制，记录不经过 Python
+    cursor.execute(f'''
+        INSERT INTO pending_review (group_id, original_id, {_PENDING_COLUMNS})
+        SELECT {_group_id_sql('numbered.group_number')}, numbered.id, {_PENDING_COLUMNS}
+        FROM ({numbered_sql}) numbered
+    ''', params)
+    moved = cursor.rowcount
+    if moved <= 0:
+        return 0, 0
+
+    cursor.execute(
+        "SELECT COUNT(DISTINCT group_id) as group_count FROM pending_review WHERE id > ?",
+        (marker,),
+    )
+    group_count = cursor.fetchone()['group_count']
+    cursor.execute(
+        "DELETE FROM gas_mixture WHERE id IN (SELECT original_id FROM pending_review WHERE id > ?)",
+        (marker,),
+    )
+    return moved, group_count
+
+
 def _ensure_index(cursor, table: str, index_name: str, columns: str) -> None:
     if is_mysql():
         cursor.execute(
@@ -48,14 +182,47 @@ def _ensure_column(cursor, table: str, column: str, ddl: str) -> None:
             cursor.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
 
 
+def _get_schema_version(cursor) -> int:
+    try:
+        cursor.execute("SELECT version FROM schema_version WHERE name = ?", (SCHEMA_NAME,))
+    except Exception:
+        # 版本表尚不存在
+        return 0
+    row = cursor.fetchone()
+    return row['version'] if row else 0
+
+
+def _set_schema_version(cursor, mysql: bool) -> None:
+    name_type = "VARCHAR(64)" if mysql else "TEXT"
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            name {name_type} PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute("DELETE FROM schema_version WHERE name = ?", (SCHEMA_NAME,))
+    cursor.execute(
+        "INSERT INTO schema_version (name, version) VALUES (?, ?)",
+        (SCHEMA_NAME, REVIEW_SCHEMA_VERSION),
+    )
+
+
 def init_review_tables():
     """初始化审核相关的数据表"""
-    id_column = "BIGINT PRIMARY KEY AUTO_INCREMENT" if is_mysql() else "INTEGER PRIMARY KEY AUTOINCREMENT"
-    group_id_type = "VARCHAR(32)" if is_mysql() else "TEXT"
-    status_type = "VARCHAR(20)" if is_mysql() else "TEXT"
-    reviewed_by_type = "VARCHAR(64)" if is_mysql() else "TEXT"
-    approved_id_type = "BIGINT" if is_mysql() else "INTEGER"
+    mysql = is_mysql()
+    id_column = "BIGINT PRIMARY KEY AUTO_INCREMENT" if mysql else "INTEGER PRIMARY KEY AUTOINCREMENT"
+    group_id_type = "VARCHAR(32)" if mysql else "TEXT"
+    status_type = "VARCHAR(20)" if mysql else "TEXT"
+    reviewed_by_type = "VARCHAR(64)" if mysql else "TEXT"
+    approved_id_type = "BIGINT" if mysql else "INTEGER"
     with get_connection(dict_cursor=True) as conn:
+        # 表结构已是当前版本时只需这一次查询，跳过全部建表/建索引检查
+        if _get_schema_version(conn.cursor()) == REVIEW_SCHEMA_VERSION:
+            return
+        if not mysql:
+            # WAL 为库文件的持久设置：读不阻塞写，提交只需追加日志
+            conn.execute("PRAGMA journal_mode=WAL")
+        _begin_transaction(conn)
         cursor = conn.cursor()
         
         # 待审核数据表
@@ -92,120 +259,124 @@ def init_review_tables():
         _ensure_index(cursor, "pending_review", "idx_pending_group", "group_id")
         _ensure_index(cursor, "pending_review", "idx_pending_status", "status")
         _ensure_index(cursor, "pending_review", "idx_pending_group_status", "group_id, status")
-        
+        _ensure_index(cursor, "pending_review", "idx_pending_status_group", "status, group_id")
+
+        _set_schema_version(cursor, mysql)
         conn.commit()
         print("[DataReview] 审核数据表初始化完成")
 
 
-def find_duplicate_pressure_records() -> List[Dict]:
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def ensure_initialized() -> None:
+    """首次调用时初始化审核数据表（应用启动时调用），之后直接返回"""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if not _initialized:
+            init_review_tables()
+            _initialized = True
+
+
+def _parse_ids(text: str) -> List[int]:
+    if numpy is not None and len(text) >= NUMPY_PARSE_MIN_LEN:
+        return numpy.fromstring(text, dtype=numpy.int64, sep=',').tolist()
+    return list(map(int, text.split(',')))
+
+
+def _duplicate_group(row: tuple) -> Dict:
+    x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10, temperature, count, ids, pressures = row
+    return {
+        'composition': {
+            'x_ch4': x_ch4,
+            'x_c2h6': x_c2h6,
+            'x_c3h8': x_c3h8,
+            'x_co2': x_co2,
+            'x_n2': x_n2,
+            'x_h2s': x_h2s,
+            'x_ic4h10': x_ic4h10
+        },
+        'temperature': temperature,
+        'count': count,
+        'ids': _parse_ids(ids),
+        # 浮点解析的耗时在 strtod 本身，numpy 并不更快，直接 map(float)
+        'pressures': list(map(float, pressures.split(',')))
+    }
+
+
+def iter_duplicate_pressure_records() -> Iterator[Dict]:
     """
-    查找同组分、同温度下有多个不同压力值的记录
-    返回按组分+温度分组的数据
+    逐组产出同组分、同温度下有多个压力值的记录
+    结果不整体读入内存：SQLite 游标本身按需取行，MySQL 使用服务端游标
     """
-    with get_connection(dict_cursor=True) as conn:
-        cursor = conn.cursor()
+    # SQLite 的 GROUP_CONCAT 只保留 15 位有效数字，用 %!.17g 保证压力值能精确还原
+    mysql = is_mysql()
+    pressure_text = "pressure" if mysql else "printf('%!.17g', pressure)"
+
+    # 行按位置解包，不为每行构造字典
+    with get_connection() as conn:
+        if mysql:
+            conn.cursor().execute(f"SET SESSION group_concat_max_len = {MYSQL_GROUP_CONCAT_MAX_LEN}")
+            cursor = conn.cursor(SSCursor)
+        else:
+            cursor = conn.cursor()
         
         # 查找重复的组分+温度组合
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT 
                 x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10,
                 temperature,
                 COUNT(*) as count,
                 GROUP_CONCAT(id) as ids,
-                GROUP_CONCAT(pressure) as pressures
+                GROUP_CONCAT({pressure_text}) as pressures
             FROM gas_mixture
             GROUP BY x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10, temperature
             HAVING COUNT(*) > 1
             ORDER BY count DESC
         ''')
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'composition': {
-                    'x_ch4': row['x_ch4'],
-                    'x_c2h6': row['x_c2h6'],
-                    'x_c3h8': row['x_c3h8'],
-                    'x_co2': row['x_co2'],
-                    'x_n2': row['x_n2'],
-                    'x_h2s': row['x_h2s'],
-                    'x_ic4h10': row['x_ic4h10']
-                },
-                'temperature': row['temperature'],
-                'count': row['count'],
-                'ids': [int(x) for x in row['ids'].split(',')],
-                'pressures': [float(x) for x in row['pressures'].split(',')]
-            })
-        
-        return results
+        for row in cursor:
+            yield _duplicate_group(row)
+
+
+def find_duplicate_pressure_records() -> List[Dict]:
+    """
+    查找同组分、同温度下有多个不同压力值的记录
+    返回按组分+温度分组的数据
+    """
+    return list(iter_duplicate_pressure_records())
 
 
 def move_duplicates_to_review() -> Dict:
     """
     将所有同组分同温度的重复压力数据移到待审核表
     """
-    duplicates = find_duplicate_pressure_records()
-    
-    if not duplicates:
-        return {'moved': 0, 'groups': 0}
-    
-    moved_count = 0
-    group_count = 0
-    
     with get_connection(dict_cursor=True) as conn:
+        _begin_transaction(conn)
         cursor = conn.cursor()
 
         group_number = _get_next_group_number(cursor)
 
-        for dup in duplicates:
-            # 生成组ID
-            group_id = f"G{group_number:04d}"
-            
-            # 获取这组数据的详细信息
-            ids = [int(x) for x in dup["ids"]]
-            if not ids:
-                continue
-            placeholders = ",".join("?" * len(ids))
-            cursor.execute(
-                f"SELECT * FROM gas_mixture WHERE id IN ({placeholders})",
-                ids,
-            )
-            
-            records = cursor.fetchall()
-            
-            for record in records:
-                # 插入到待审核表
-                cursor.execute('''
-                    INSERT INTO pending_review 
-                    (group_id, original_id, temperature, x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10, pressure)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    group_id,
-                    record['id'],
-                    record['temperature'],
-                    record['x_ch4'],
-                    record['x_c2h6'],
-                    record['x_c3h8'],
-                    record['x_co2'],
-                    record['x_n2'],
-                    record['x_h2s'],
-                    record['x_ic4h10'],
-                    record['pressure']
-                ))
-                moved_count += 1
-            
-            # 从原表删除
-            cursor.execute(
-                f"DELETE FROM gas_mixture WHERE id IN ({placeholders})",
-                ids,
-            )
-            
-            group_count += 1
-            group_number += 1
-        
+        # 组按记录数从多到少编号，与 find_duplicate_pressure_records 的顺序一致
+        moved, group_count = _move_to_review(
+            cursor,
+            f'''
+            SELECT dup.*, ? - 1 + DENSE_RANK() OVER (ORDER BY dup.cnt DESC, {_GROUP_KEY}) as group_number
+            FROM (
+                SELECT id, {_PENDING_COLUMNS}, COUNT(*) OVER (PARTITION BY {_GROUP_KEY}) as cnt
+                FROM gas_mixture
+            ) dup
+            WHERE dup.cnt > 1
+            ''',
+            (group_number,),
+        )
         conn.commit()
+        clear_review_caches()
     
-    return {'moved': moved_count, 'groups': group_count}
+    return {'moved': moved, 'groups': group_count}
 
 
 def move_high_pressure_to_review(threshold: float = 50.0) -> Dict:
@@ -213,78 +384,42 @@ def move_high_pressure_to_review(threshold: float = 50.0) -> Dict:
     将压力高于阈值的数据移到待审核表
     """
     with get_connection(dict_cursor=True) as conn:
+        _begin_transaction(conn)
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, temperature, x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10, pressure
-            FROM gas_mixture
-            WHERE pressure > ?
-        ''', (threshold,))
-
-        records = cursor.fetchall()
-        if not records:
-            return {'moved': 0, 'groups': 0, 'threshold': threshold}
-
-        grouped = {}
-        for record in records:
-            key = (
-                record['temperature'],
-                record['x_ch4'],
-                record['x_c2h6'],
-                record['x_c3h8'],
-                record['x_co2'],
-                record['x_n2'],
-                record['x_h2s'],
-                record['x_ic4h10']
-            )
-            grouped.setdefault(key, []).append(record)
 
-        moved_count = 0
-        group_count = 0
         group_number = _get_next_group_number(cursor)
 
-        for _key, group_records in grouped.items():
-            group_id = f"G{group_number:04d}"
-            for record in group_records:
-                cursor.execute('''
-                    INSERT INTO pending_review
-                    (group_id, original_id, temperature, x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10, pressure)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    group_id,
-                    record['id'],
-                    record['temperature'],
-                    record['x_ch4'],
-                    record['x_c2h6'],
-                    record['x_c3h8'],
-                    record['x_co2'],
-                    record['x_n2'],
-                    record['x_h2s'],
-                    record['x_ic4h10'],
-                    record['pressure']
-                ))
-                moved_count += 1
-
-            group_count += 1
-            group_number += 1
-
-        ids = [record['id'] for record in records]
-        placeholders = ','.join('?' * len(ids))
-        cursor.execute(f'DELETE FROM gas_mixture WHERE id IN ({placeholders})', ids)
+        moved, group_count = _move_to_review(
+            cursor,
+            f'''
+            SELECT id, {_PENDING_COLUMNS}, ? - 1 + DENSE_RANK() OVER (ORDER BY {_GROUP_KEY}) as group_number
+            FROM gas_mixture
+            WHERE pressure > ?
+            ''',
+            (group_number, threshold),
+        )
         conn.commit()
+        clear_review_caches()
 
-    return {'moved': moved_count, 'groups': group_count, 'threshold': threshold}
+    return {'moved': moved, 'groups': group_count, 'threshold': threshold}
 
 
 def _get_next_group_number(cursor) -> int:
-    cursor.execute('SELECT group_id FROM pending_review')
-    max_num = 0
-    for row in cursor.fetchall():
-        group_id = row['group_id']
-        if isinstance(group_id, str) and group_id.startswith('G'):
-            suffix = group_id[1:]
-            if suffix.isdigit():
-                max_num = max(max_num, int(suffix))
-    return max_num + 1
+    # 只统计 "G" + 纯数字形式的组号，在数据库内取最大值，只返回一行
+    if is_mysql():
+        cursor.execute('''
+            SELECT MAX(CAST(SUBSTRING(group_id, 2) AS UNSIGNED)) as max_num
+            FROM pending_review
+            WHERE REGEXP_LIKE(group_id, '^G[0-9]+$', 'c')
+        ''')
+    else:
+        cursor.execute('''
+            SELECT MAX(CAST(SUBSTR(group_id, 2) AS INTEGER)) as max_num
+            FROM pending_review
+            WHERE group_id GLOB 'G[0-9]*' AND SUBSTR(group_id, 2) NOT GLOB '*[^0-9]*'
+        ''')
+    row = cursor.fetchone()
+    return (row['max_num'] or 0) + 1 if row else 1
 
 
 def get_pending_groups(
@@ -295,7 +430,8 @@ def get_pending_groups(
     temp_max: Any = None,
 ) -> Dict:
     """获取待审核的数据组（分页）"""
-    with get_connection(dict_cursor=True) as conn:
+    # 行按位置解包，不为每行构造字典
+    with get_connection() as conn:
         cursor = conn.cursor()
 
         page = max(1, page)
@@ -315,16 +451,21 @@ def get_pending_groups(
             params.append(temp_max)
         where_clause = " AND ".join(filters)
 
-        cursor.execute(
-            f'''
-            SELECT COUNT(DISTINCT group_id) as total
-            FROM pending_review
-            WHERE {where_clause}
-            ''',
-            params,
-        )
-        total_row = cursor.fetchone()
-        total = total_row['total'] if total_row else 0
+        total_key = (where_clause, tuple(params))
+        total = _cached_pending_total(total_key)
+        if total is None:
+            # (status, group_id) 索引覆盖该计数
+            cursor.execute(
+                f'''
+                SELECT COUNT(DISTINCT group_id) as total
+                FROM pending_review
+                WHERE {where_clause}
+                ''',
+                params,
+            )
+            total_row = cursor.fetchone()
+            total = total_row[0] if total_row else 0
+            _store_pending_total(total_key, total)
 
         # 获取待审核的组
         cursor.execute(
@@ -342,34 +483,43 @@ def get_pending_groups(
             params + [per_page, offset],
         )
         
+        group_rows = cursor.fetchall()
+
+        # 一次查询取回本页所有组的压力值，再按组归类
+        pressures_by_group = defaultdict(list)
+        group_ids = [row[0] for row in group_rows]
+        if group_ids:
+            placeholders = ','.join('?' * len(group_ids))
+            cursor.execute(f'''
+                SELECT group_id, id, pressure, original_id FROM pending_review
+                WHERE status = 'pending' AND group_id IN ({placeholders})
+                ORDER BY group_id, pressure
+            ''', group_ids)
+            for row_group_id, pending_id, pressure, original_id in cursor:
+                pressures_by_group[row_group_id].append(
+                    {'id': pending_id, 'pressure': pressure, 'original_id': original_id}
+                )
+
         groups = []
-        for row in cursor.fetchall():
-            group_id = row['group_id']
-            
-            # 获取这组的所有压力值
-            cursor.execute('''
-                SELECT id, pressure, original_id FROM pending_review 
-                WHERE group_id = ? AND status = 'pending'
-                ORDER BY pressure
-            ''', (group_id,))
-            
-            pressures = [{'id': r['id'], 'pressure': r['pressure'], 'original_id': r['original_id']} 
-                        for r in cursor.fetchall()]
-            
+        for (
+            group_id, temperature,
+            x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10,
+            pressure_count,
+        ) in group_rows:
             groups.append({
                 'group_id': group_id,
-                'temperature': row['temperature'],
+                'temperature': temperature,
                 'composition': {
-                    'x_ch4': row['x_ch4'],
-                    'x_c2h6': row['x_c2h6'],
-                    'x_c3h8': row['x_c3h8'],
-                    'x_co2': row['x_co2'],
-                    'x_n2': row['x_n2'],
-                    'x_h2s': row['x_h2s'],
-                    'x_ic4h10': row['x_ic4h10']
+                    'x_ch4': x_ch4,
+                    'x_c2h6': x_c2h6,
+                    'x_c3h8': x_c3h8,
+                    'x_co2': x_co2,
+                    'x_n2': x_n2,
+                    'x_h2s': x_h2s,
+                    'x_ic4h10': x_ic4h10
                 },
-                'pressures': pressures,
-                'pressure_count': row['pressure_count']
+                'pressures': pressures_by_group[group_id],
+                'pressure_count': pressure_count
             })
 
         return {
@@ -386,23 +536,22 @@ def get_pending_stats() -> Dict:
     with get_connection(dict_cursor=True) as conn:
         cursor = conn.cursor()
         
-        cursor.execute("SELECT COUNT(DISTINCT group_id) as group_count FROM pending_review WHERE status = 'pending'")
-        groups = cursor.fetchone()['group_count']
-        
-        cursor.execute("SELECT COUNT(*) as records FROM pending_review WHERE status = 'pending'")
-        records = cursor.fetchone()['records']
-        
-        cursor.execute("SELECT COUNT(*) as approved FROM pending_review WHERE status = 'approved'")
-        approved = cursor.fetchone()['approved']
-        
-        cursor.execute("SELECT COUNT(*) as rejected FROM pending_review WHERE status = 'rejected'")
-        rejected = cursor.fetchone()['rejected']
+        # 条件聚合一次扫描得出全部计数；COUNT 对 NULL 不计数，空表时也返回 0
+        cursor.execute('''
+            SELECT
+                COUNT(DISTINCT CASE WHEN status = 'pending' THEN group_id END) as pending_groups,
+                COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_records,
+                COUNT(CASE WHEN status = 'approved' THEN 1 END) as approved,
+                COUNT(CASE WHEN status = 'rejected' THEN 1 END) as rejected
+            FROM pending_review
+        ''')
+        row = cursor.fetchone()
         
         return {
-            'pending_groups': groups,
-            'pending_records': records,
-            'approved': approved,
-            'rejected': rejected
+            'pending_groups': row['pending_groups'],
+            'pending_records': row['pending_records'],
+            'approved': row['approved'],
+            'rejected': row['rejected']
         }
 
 
@@ -415,6 +564,34 @@ def update_pending_pressure(pending_id: int, new_pressure: float) -> bool:
         return cursor.rowcount > 0
 
 
+def _insert_approved_records(cursor, records) -> List[tuple]:
+    """
+    把审核通过的记录写入正式表，返回 [(新记录 id, 待审核记录 id), ...]
+    SQLite 3.35+ 用多行 INSERT ... RETURNING 分批写入；写锁在手时新 id 按 VALUES 顺序递增，
+    排序后即可与记录一一对应。MySQL 不支持 RETURNING，且交错自增锁模式下多行插入的 id 不保证连续，
+    仍逐条插入读取 lastrowid（同一事务内，不逐条提交）
+    """
+    if is_mysql() or sqlite3.sqlite_version_info < (3, 35, 0):
+        # 语句文本固定，循环内只绑定参数
+        id_rows = []
+        for record in records:
+            cursor.execute(_INSERT_GAS_SQL, _pending_values(record))
+            id_rows.append((cursor.lastrowid, record['id']))
+        return id_rows
+
+    id_rows = []
+    for start in range(0, len(records), APPROVE_INSERT_BATCH_SIZE):
+        batch = records[start:start + APPROVE_INSERT_BATCH_SIZE]
+        params = [value for record in batch for value in _pending_values(record)]
+        cursor.execute(
+            _INSERT_GAS_SQL + (", " + _GAS_VALUES) * (len(batch) - 1) + " RETURNING id",
+            params,
+        )
+        new_ids = sorted(row[0] for row in cursor.fetchall())
+        id_rows.extend(zip(new_ids, (record['id'] for record in batch), strict=True))
+    return id_rows
+
+
 def approve_group(group_id: str, selected_pressures: List[int], username: str = None) -> Dict:
     """
     审核通过一组数据
@@ -427,48 +604,33 @@ def approve_group(group_id: str, selected_pressures: List[int], username: str =
         ids = [int(x) for x in selected_pressures if x is not None]
         if not ids:
             return {"approved": 0, "group_id": group_id}
-        placeholders = ",".join("?" * len(ids))
+        _begin_transaction(conn)
         cursor.execute(
-            f"SELECT * FROM pending_review WHERE id IN ({placeholders}) AND group_id = ?",
-            ids + [group_id],
+            f"SELECT id, {_PENDING_COLUMNS} FROM pending_review WHERE id IN ({_id_list_sql()}) AND group_id = ?",
+            (json.dumps(ids), group_id),
         )
 
         records = cursor.fetchall()
-        approved_count = 0
         
-        for record in records:
-            # 插入到正式数据表
-            cursor.execute('''
-                INSERT INTO gas_mixture 
-                (temperature, x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10, pressure)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                record['temperature'],
-                record['x_ch4'],
-                record['x_c2h6'],
-                record['x_c3h8'],
-                record['x_co2'],
-                record['x_n2'],
-                record['x_h2s'],
-                record['x_ic4h10'],
-                record['pressure']
-            ))
-            approved_id = cursor.lastrowid
-            cursor.execute('''
-                UPDATE pending_review
-                SET status = 'approved', reviewed_at = CURRENT_TIMESTAMP, reviewed_by = ?, approved_record_id = ?
-                WHERE id = ?
-            ''', (username, approved_id, record['id']))
-            approved_count += 1
+        id_rows = _insert_approved_records(cursor, records)
+        approved_count = len(id_rows)
         
-        # 其余记录标记为已拒绝
-        cursor.execute('''
-            UPDATE pending_review 
-            SET status = 'rejected', reviewed_at = CURRENT_TIMESTAMP, reviewed_by = ?
-            WHERE group_id = ? AND status = 'pending'
-        ''', (username, group_id))
+        # 选中的记录标记为已通过、其余待审核记录标记为已拒绝，一条语句完成
+        approved_ids = json.dumps([record['id'] for record in records])
+        cursor.execute(f'''
+            UPDATE pending_review
+            SET status = CASE WHEN id IN ({_id_list_sql()}) THEN 'approved' ELSE 'rejected' END,
+                reviewed_at = CURRENT_TIMESTAMP, reviewed_by = ?
+            WHERE group_id = ? AND (status = 'pending' OR id IN ({_id_list_sql()}))
+        ''', (approved_ids, username, group_id, approved_ids))
+        if id_rows:
+            cursor.executemany(
+                'UPDATE pending_review SET approved_record_id = ? WHERE id = ?',
+                id_rows,
+            )
         
         conn.commit()
+        clear_review_caches()
         
         return {'approved': approved_count, 'group_id': group_id}
 
@@ -483,6 +645,7 @@ def reject_group(group_id: str, username: str = None) -> bool:
             WHERE group_id = ? AND status = 'pending'
         ''', (username, group_id))
         conn.commit()
+        clear_review_caches()
         return cursor.rowcount > 0
 
 
@@ -491,14 +654,13 @@ def restore_group(group_id: str) -> Dict:
     with get_connection(dict_cursor=True) as conn:
         cursor = conn.cursor()
         
+        # 删除审核通过时写入正式表的记录，id 由子查询直接给出
         cursor.execute('''
-            SELECT approved_record_id FROM pending_review 
-            WHERE group_id = ? AND status = 'approved' AND approved_record_id IS NOT NULL
+            DELETE FROM gas_mixture WHERE id IN (
+                SELECT approved_record_id FROM pending_review
+                WHERE group_id = ? AND status = 'approved' AND approved_record_id IS NOT NULL
+            )
         ''', (group_id,))
-        approved_ids = [row['approved_record_id'] for row in cursor.fetchall() if row['approved_record_id']]
-        if approved_ids:
-            placeholders = ','.join('?' * len(approved_ids))
-            cursor.execute(f'DELETE FROM gas_mixture WHERE id IN ({placeholders})', approved_ids)
         
         # 重置状态
         cursor.execute('''
@@ -508,8 +670,6 @@ def restore_group(group_id: str) -> Dict:
         ''', (group_id,))
         
         conn.commit()
+        clear_review_caches()
         return {'restored': cursor.rowcount}
 
-
-# 初始化
-init_review_tables()
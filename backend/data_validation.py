@@ -3,18 +3,43 @@
 """
 
 import re
-from typing import List, Dict, Tuple, Any
+from functools import lru_cache
+from typing import List, Dict, Tuple, Any, Callable, Optional
 from dataclasses import dataclass
 
+try:
+    import numpy
+    from backend._validate_kernel import violation_mask
+except ImportError:  # pragma: no cover
+    numpy = None
+    violation_mask = None
+
 
 PRESSURE_SOFT_MAX = 10.0
 SUM_SOFT_TOLERANCE = 0.02
 SUM_HARD_TOLERANCE = 0.05
 
+# validate_batch 记录数达到该值且 numpy 可用时按列向量化校验（行数少时 numpy 的固定开销更大）
+VECTORIZE_MIN_ROWS = 32
+
+# 向量化校验的列顺序：温度、压力、7 个摩尔分数
+BATCH_FIELDS = (
+    'temperature', 'pressure',
+    'x_ch4', 'x_c2h6', 'x_c3h8', 'x_co2', 'x_n2', 'x_h2s', 'x_ic4h10'
+)
+COMPOSITION_FIELDS = BATCH_FIELDS[2:]
+_NUMBER_TYPES = (int, float, bool)
+
+# validate_batch 对相同取值的记录复用校验结果的缓存条数
+VALIDATION_CACHE_SIZE = 4096
+
+# 已编译正则的缓存条数（规则中的正则数量有限）
+PATTERN_CACHE_SIZE = 128
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ValidationRule:
-    """校验规则"""
+    """校验规则（不可变，属性走 slots 访问）"""
     field: str
     rule_type: str
     params: dict
@@ -98,6 +123,68 @@ GAS_MIXTURE_RULES = [
 ]
 
 
+def _mk_range(min_val: float = None, max_val: float = None) -> Callable[[Any], bool]:
+    """
+    生成边界固定的范围校验函数，省去 validate_range 每次的 None 判断
+    无法转换为数值时抛出 ValueError/TypeError；NaN 与 validate_range 一致视为通过
+    """
+    if min_val is not None and max_val is not None:
+        def in_range(value: Any) -> bool:
+            num = value if type(value) is float else float(value)
+            return not (num < min_val or num > max_val)
+    elif min_val is not None:
+        def in_range(value: Any) -> bool:
+            return not float(value) < min_val
+    elif max_val is not None:
+        def in_range(value: Any) -> bool:
+            return not float(value) > max_val
+    else:
+        def in_range(value: Any) -> bool:
+            float(value)
+            return True
+    return in_range
+
+
+def _build_field_plan(rules: List[ValidationRule]) -> Tuple[tuple, ...]:
+    """
+    把 range/required 规则预编译为按字段聚合的元组，避免逐条记录做 rule_type 分支与 params 查找
+    每项: (字段, 范围校验函数或 None, 范围错误信息, 必填错误信息或 None)
+    同一字段的必填与范围错误互斥（空值不做范围校验），按字段首次出现的顺序输出即与逐条规则一致
+    """
+    plan: Dict[str, list] = {}
+    for rule in rules:
+        entry = plan.setdefault(rule.field, [rule.field, None, None, None])
+        message = f"第{rule.field}列: {rule.error_message}"
+        if rule.rule_type == 'range':
+            entry[1] = _mk_range(rule.params.get('min'), rule.params.get('max'))
+            entry[2] = message
+        elif rule.rule_type == 'required':
+            entry[3] = message
+        else:
+            raise ValueError(f"默认规则不支持预编译的类型: {rule.rule_type}")
+    return tuple(tuple(entry) for entry in plan.values())
+
+
+# 默认规则的预编译计划（自定义 rules 仍走通用循环）
+_FIELD_PLAN = _build_field_plan(GAS_MIXTURE_RULES)
+
+# 字段 -> 在 _FIELD_PLAN 中的位置，部分更新时只取出现字段的计划项
+_FIELD_PLAN_INDEX = {entry[0]: i for i, entry in enumerate(_FIELD_PLAN)}
+_COMPOSITION_SET = frozenset(COMPOSITION_FIELDS)
+
+# 向量化校验各列的上下界（按 BATCH_FIELDS 顺序，缺省为不限）
+_PLAN_BOUNDS = {
+    rule.field: (rule.params.get('min'), rule.params.get('max'))
+    for rule in GAS_MIXTURE_RULES if rule.rule_type == 'range'
+}
+_BATCH_LOWER = tuple(
+    float('-inf') if _PLAN_BOUNDS[f][0] is None else float(_PLAN_BOUNDS[f][0]) for f in BATCH_FIELDS
+)
+_BATCH_UPPER = tuple(
+    float('inf') if _PLAN_BOUNDS[f][1] is None else float(_PLAN_BOUNDS[f][1]) for f in BATCH_FIELDS
+)
+
+
 # ==================== 校验函数 ====================
 
 def validate_required(value: Any) -> bool:
@@ -143,11 +230,17 @@ def validate_type(value: Any, expected_type: str) -> bool:
         return False
 
 
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _compile_pattern(pattern: str) -> 're.Pattern[str]':
+    """编译并缓存规则中的正则，省去 re.match 每次的模块级缓存查找与参数归一化"""
+    return re.compile(pattern)
+
+
 def validate_pattern(value: str, pattern: str) -> bool:
     """正则表达式校验"""
     if not isinstance(value, str):
         value = str(value)
-    return bool(re.match(pattern, value))
+    return _compile_pattern(pattern).match(value) is not None
 
 
 def validate_sum(values: List[float], expected_sum: float, tolerance: float = 0.01) -> bool:
@@ -167,8 +260,72 @@ def validate_record(record: Dict[str, Any], rules: List[ValidationRule] = None)
     返回: (是否有效, 错误列表)
     """
     if rules is None:
-        rules = GAS_MIXTURE_RULES
+        errors = _check_fields(record, _FIELD_PLAN, partial=False)
+    else:
+        errors = _check_rules(record, rules)
+    
+    # 额外校验：摩尔分数之和（类型错误已经在上面处理）
+    _check_total(_mole_fraction_total(record), errors)
     
+    return len(errors) == 0, errors
+
+
+def _to_float(value: Any) -> float:
+    """
+    转为 float：已是 float 直接返回，空值（None、''、0 等假值）为 0.0，其余交给 float()
+    无法转换时抛出 ValueError/TypeError
+    """
+    if type(value) is float:
+        return value
+    return float(value) if value else 0.0
+
+
+def _mole_fraction_total(record: Dict[str, Any]) -> Optional[float]:
+    """摩尔分数之和（空值按 0 计）；存在无法转换的值时返回 None"""
+    try:
+        # 热点路径：把 _to_float 内联，省去每个组分一次函数调用
+        return sum([
+            x if type(x) is float else (float(x) if x else 0.0)
+            for x in map(record.get, COMPOSITION_FIELDS)
+        ])
+    except (ValueError, TypeError):
+        return None
+
+
+def _check_total(total: Optional[float], errors: List[str]) -> None:
+    """摩尔分数之和的硬性校验"""
+    if total is None:
+        return
+    if total == 0:
+        errors.append("摩尔分数不能全部为 0")
+    elif abs(total - 1.0) > SUM_HARD_TOLERANCE:  # 允许5%误差
+        errors.append(f"摩尔分数之和为 {total:.4f}，应接近 1.0")
+
+
+def _check_fields(record: Dict[str, Any], plan: Tuple[tuple, ...], partial: bool) -> List[str]:
+    """按默认规则的预编译计划项做字段校验；partial 时忽略必填"""
+    errors = []
+    append = errors.append
+    rec_get = record.get
+    for field, in_range, range_error, required_error in plan:
+        value = rec_get(field)
+        if value is None or (isinstance(value, str) and value.strip() == ''):
+            if required_error is not None and not partial:
+                append(required_error)
+            continue
+        if in_range is None:
+            continue
+        try:
+            ok = in_range(value)
+        except (ValueError, TypeError):
+            ok = False
+        if not ok:
+            append(range_error)
+    return errors
+
+
+def _check_rules(record: Dict[str, Any], rules: List[ValidationRule]) -> List[str]:
+    """逐条规则校验（自定义 rules）"""
     errors = []
     
     for rule in rules:
@@ -193,29 +350,7 @@ def validate_record(record: Dict[str, Any], rules: List[ValidationRule] = None)
                 if not validate_pattern(value, rule.params.get('pattern', '.*')):
                     errors.append(f"第{rule.field}列: {rule.error_message}")
     
-    # 额外校验：摩尔分数之和
-    mole_fractions = [
-        record.get('x_ch4', 0),
-        record.get('x_c2h6', 0),
-        record.get('x_c3h8', 0),
-        record.get('x_co2', 0),
-        record.get('x_n2', 0),
-        record.get('x_h2s', 0),
-        record.get('x_ic4h10', 0)
-    ]
-    
-    # 转换为浮点数
-    try:
-        mole_fractions = [float(x) if x else 0 for x in mole_fractions]
-        total = sum(mole_fractions)
-        if total == 0:
-            errors.append("摩尔分数不能全部为 0")
-        elif abs(total - 1.0) > SUM_HARD_TOLERANCE:  # 允许5%误差
-            errors.append(f"摩尔分数之和为 {total:.4f}，应接近 1.0")
-    except (ValueError, TypeError):
-        pass  # 类型错误已经在上面处理
-    
-    return len(errors) == 0, errors
+    return errors
 
 
 def validate_partial_record(record: Dict[str, Any], rules: List[ValidationRule] = None) -> Tuple[bool, List[str]]:
@@ -224,8 +359,22 @@ def validate_partial_record(record: Dict[str, Any], rules: List[ValidationRule]
     仅校验提供的字段，忽略 required 规则。
     """
     if rules is None:
-        rules = GAS_MIXTURE_RULES
+        # 只取更新中出现的字段，按计划顺序校验以保持错误顺序
+        index = _FIELD_PLAN_INDEX
+        positions = sorted(index[field] for field in record if field in index)
+        errors = _check_fields(record, tuple(_FIELD_PLAN[i] for i in positions), partial=True)
+    else:
+        errors = _check_partial_rules(record, rules)
+
+    # 仅当全部组分都在更新字段中时才做总和校验
+    if len(record) >= len(_COMPOSITION_SET) and _COMPOSITION_SET <= record.keys():
+        _check_total(_mole_fraction_total(record), errors)
 
+    return len(errors) == 0, errors
+
+
+def _check_partial_rules(record: Dict[str, Any], rules: List[ValidationRule]) -> List[str]:
+    """逐条规则校验出现的字段（自定义 rules），忽略 required"""
     errors = []
 
     for rule in rules:
@@ -248,20 +397,78 @@ def validate_partial_record(record: Dict[str, Any], rules: List[ValidationRule]
                 if not validate_pattern(value, rule.params.get('pattern', '.*')):
                     errors.append(f"第{rule.field}列: {rule.error_message}")
 
-    # 仅当全部组分都在更新字段中时才做总和校验
-    comp_fields = ['x_ch4', 'x_c2h6', 'x_c3h8', 'x_co2', 'x_n2', 'x_h2s', 'x_ic4h10']
-    if all(field in record for field in comp_fields):
-        try:
-            mole_fractions = [float(record.get(f) or 0) for f in comp_fields]
-            total = sum(mole_fractions)
-            if total == 0:
-                errors.append("摩尔分数不能全部为 0")
-            elif abs(total - 1.0) > SUM_HARD_TOLERANCE:
-                errors.append(f"摩尔分数之和为 {total:.4f}，应接近 1.0")
-        except (ValueError, TypeError):
-            pass
+    return errors
 
-    return len(errors) == 0, errors
+
+def _numeric_rows(records: List[Dict[str, Any]]) -> Tuple[List[int], List[list], List[int]]:
+    """
+    按记录拆分：温度/压力均为数值、摩尔分数为数值或缺失的记录可整列校验，
+    其余（字符串、空值等）保留逐条校验
+    返回: (可向量化的行号, 对应数值行, 需逐条校验的行号)
+    """
+    fast_idx = []
+    fast_rows = []
+    slow_idx = []
+    number_types = _NUMBER_TYPES
+    for idx, record in enumerate(records):
+        row = [record.get(field) for field in BATCH_FIELDS]
+        if type(row[0]) in number_types and type(row[1]) in number_types:
+            # 摩尔分数缺失时与 0 等价：范围校验跳过，总和按 0 计
+            for i in range(2, 9):
+                value = row[i]
+                if value is None:
+                    row[i] = 0.0
+                elif type(value) not in number_types:
+                    break
+            else:
+                fast_idx.append(idx)
+                fast_rows.append(row)
+                continue
+        slow_idx.append(idx)
+    return fast_idx, fast_rows, slow_idx
+
+
+def _invalid_rows_vectorized(records: List[Dict[str, Any]]) -> List[Tuple[int, List[str]]]:
+    """
+    默认规则下批量做范围与总和校验（见 _validate_kernel），只为不通过的行生成错误信息
+    返回按行号排序的 [(行号, 错误列表), ...]
+    """
+    fast_idx, fast_rows, slow_idx = _numeric_rows(records)
+    candidates = slow_idx
+    if fast_rows:
+        mask = violation_mask(
+            numpy.array(fast_rows, dtype=numpy.float64),
+            numpy.array(_BATCH_LOWER),
+            numpy.array(_BATCH_UPPER),
+            SUM_HARD_TOLERANCE,
+        )
+        candidates = sorted(candidates + [fast_idx[i] for i in numpy.flatnonzero(mask)])
+
+    invalid = []
+    for idx in candidates:
+        is_valid, record_errors = _validate_default_cached(records[idx])
+        if not is_valid:
+            invalid.append((idx, record_errors))
+    return invalid
+
+
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _validate_values(values: tuple) -> Tuple[bool, Tuple[str, ...]]:
+    """按 BATCH_FIELDS 顺序的原始取值做默认规则校验（可缓存）"""
+    is_valid, errors = validate_record(dict(zip(BATCH_FIELDS, values, strict=True)))
+    return is_valid, tuple(errors)
+
+
+def _validate_default_cached(record: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """
+    默认规则只读取 BATCH_FIELDS，取值完全相同的记录结果相同，直接复用缓存
+    键用原始值而不做取整，宁可未命中也不误用；取值不可哈希时逐条校验
+    """
+    try:
+        is_valid, errors = _validate_values(tuple(map(record.get, BATCH_FIELDS)))
+    except TypeError:
+        return validate_record(record)
+    return is_valid, list(errors)
 
 
 def validate_batch(records: List[Dict[str, Any]], rules: List[ValidationRule] = None) -> Dict:
@@ -275,14 +482,24 @@ def validate_batch(records: List[Dict[str, Any]], rules: List[ValidationRule] =
         'errors': [(行号, 错误列表), ...]
     }
     """
-    if rules is None:
-        rules = GAS_MIXTURE_RULES
+    if rules is None and numpy is not None and len(records) >= VECTORIZE_MIN_ROWS:
+        invalid = _invalid_rows_vectorized(records)
+        errors = [{'row': idx + 1, 'errors': record_errors} for idx, record_errors in invalid]
+        return {
+            'valid': len(errors) == 0,
+            'total': len(records),
+            'valid_count': len(records) - len(errors),
+            'invalid_count': len(errors),
+            'errors': errors[:50]
+        }
+
+    validate = _validate_default_cached if rules is None else lambda record: validate_record(record, rules)
     
     errors = []
     valid_count = 0
     
     for idx, record in enumerate(records):
-        is_valid, record_errors = validate_record(record, rules)
+        is_valid, record_errors = validate(record)
         if is_valid:
             valid_count += 1
         else:
@@ -306,25 +523,71 @@ def get_soft_warnings(record: Dict[str, Any], pressure_threshold: float = PRESSU
     try:
         pressure = record.get('pressure')
         if pressure is not None and float(pressure) > pressure_threshold:
-            warnings.append(
-                f"压力 {float(pressure):.3f} MPa 高于 {pressure_threshold:.0f} MPa，可能为异常值"
-            )
+            warnings.append(_pressure_warning(float(pressure), pressure_threshold))
     except (ValueError, TypeError):
         pass
 
     # 组分和提示
-    comp_fields = ['x_ch4', 'x_c2h6', 'x_c3h8', 'x_co2', 'x_n2', 'x_h2s', 'x_ic4h10']
-    try:
-        mole_fractions = [float(record.get(f) or 0) for f in comp_fields]
-        total = sum(mole_fractions)
-        if total > 0 and SUM_SOFT_TOLERANCE < abs(total - 1.0) <= SUM_HARD_TOLERANCE:
-            warnings.append(f"摩尔分数之和为 {total:.4f}，与 1.0 偏差较大")
-    except (ValueError, TypeError):
-        pass
+    total = _mole_fraction_total(record)
+    if total is not None and total > 0 and SUM_SOFT_TOLERANCE < abs(total - 1.0) <= SUM_HARD_TOLERANCE:
+        warnings.append(_sum_warning(total))
 
     return warnings
 
 
+def _pressure_warning(pressure: float, pressure_threshold: float) -> str:
+    return f"压力 {pressure:.3f} MPa 高于 {pressure_threshold:.0f} MPa，可能为异常值"
+
+
+def _sum_warning(total: float) -> str:
+    return f"摩尔分数之和为 {total:.4f}，与 1.0 偏差较大"
+
+
+def validate_and_warn_batch(
+    records: List[Dict[str, Any]], pressure_threshold: float = PRESSURE_SOFT_MAX
+) -> Dict:
+    """
+    导入流程使用：一次遍历完成默认规则校验与软性提示，压力与摩尔分数之和只解析一次
+    返回: {
+        'valid_records': 有效记录列表,
+        'errors': [{'index': 下标, 'errors': 错误列表}, ...],
+        'warnings': [{'index': 下标, 'warnings': 提示列表}, ...],  # 仅有效记录
+        'pressure_warning_count': 压力高于阈值的有效记录数（同 count_soft_warnings）
+    }
+    """
+    valid_records = []
+    error_rows = []
+    warning_rows = []
+    pressure_warning_count = 0
+
+    for idx, record in enumerate(records):
+        errors = _check_fields(record, _FIELD_PLAN, partial=False)
+        total = _mole_fraction_total(record)
+        _check_total(total, errors)
+        if errors:
+            error_rows.append({'index': idx, 'errors': errors})
+            continue
+
+        valid_records.append(record)
+        warnings = []
+        # 有效记录的压力必为可转换的数值
+        pressure = _to_float(record.get('pressure'))
+        if pressure > pressure_threshold:
+            warnings.append(_pressure_warning(pressure, pressure_threshold))
+            pressure_warning_count += 1
+        if total is not None and total > 0 and SUM_SOFT_TOLERANCE < abs(total - 1.0):
+            warnings.append(_sum_warning(total))
+        if warnings:
+            warning_rows.append({'index': idx, 'warnings': warnings})
+
+    return {
+        'valid_records': valid_records,
+        'errors': error_rows,
+        'warnings': warning_rows,
+        'pressure_warning_count': pressure_warning_count,
+    }
+
+
 def count_soft_warnings(records: List[Dict[str, Any]], pressure_threshold: float = PRESSURE_SOFT_MAX) -> int:
     """统计软性提示数量"""
     count = 0
@@ -342,6 +605,15 @@ def count_soft_warnings(records: List[Dict[str, Any]], pressure_threshold: float
 
 # ==================== 数据清洗 ====================
 
+def _clean_value(value: Any) -> float:
+    """单个字段清洗：空值或无法转换时为 0.0"""
+    # 纯空白字符串经 float() 抛出 ValueError，同样得到 0.0
+    try:
+        return _to_float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
 def clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
     """
     清洗单条记录
@@ -350,21 +622,14 @@ def clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
     - 去除空白
     """
     cleaned = {}
+    rec_get = record.get
     
-    float_fields = [
-        'temperature', 'pressure',
-        'x_ch4', 'x_c2h6', 'x_c3h8', 'x_co2', 'x_n2', 'x_h2s', 'x_ic4h10'
-    ]
-    
-    for field in float_fields:
-        value = record.get(field)
-        if value is None or (isinstance(value, str) and value.strip() == ''):
-            cleaned[field] = 0.0
-        else:
-            try:
-                cleaned[field] = float(value)
-            except (ValueError, TypeError):
-                cleaned[field] = 0.0
+    for field in BATCH_FIELDS:
+        value = rec_get(field)
+        # 已是 float 的值（表格解析结果的常见情况）无需再转换
+        if type(value) is not float:
+            value = _clean_value(value)
+        cleaned[field] = value
     
     return cleaned
 
@@ -58,6 +58,13 @@ def init_database():
         _ensure_index(cursor, "gas_mixture", "idx_gas_x_n2", "x_n2")
         _ensure_index(cursor, "gas_mixture", "idx_gas_x_h2s", "x_h2s")
         _ensure_index(cursor, "gas_mixture", "idx_gas_x_ic4h10", "x_ic4h10")
+        # 覆盖索引：按组分+温度分组查找重复数据时可按索引顺序流式聚合
+        _ensure_index(
+            cursor,
+            "gas_mixture",
+            "idx_gas_comp_temp",
+            "x_ch4, x_c2h6, x_c3h8, x_co2, x_n2, x_h2s, x_ic4h10, temperature, pressure",
+        )
         conn.commit()
 
 
@@ -5,6 +5,7 @@ Database helpers with SQLite/MySQL support based on environment configuration.
 from __future__ import annotations
 
 from contextlib import contextmanager
+from functools import lru_cache
 import os
 import sqlite3
 import threading
@@ -30,6 +31,8 @@ from backend.config import (
 )
 
 
+# URL 由 config 缓存，按 URL 记忆判断结果；reload_config() 换了 URL 后自然得到新结果
+@lru_cache(maxsize=8)
 def _is_mysql_url(url: str) -> bool:
     if not url:
         return False
@@ -71,6 +74,9 @@ class _CursorProxy:
         query = _normalize_query(query, self._driver)
         return self._cursor.executemany(query, params_list)
 
+    def __iter__(self):
+        return iter(self._cursor)
+
     def __getattr__(self, name: str):
         return getattr(self._cursor, name)
 
@@ -80,8 +86,9 @@ class _ConnectionProxy:
         self._conn = conn
         self._driver = driver
 
-    def cursor(self):
-        return _CursorProxy(self._conn.cursor(), self._driver)
+    def cursor(self, *args):
+        # MySQL 可传入游标类（如服务端游标 SSDictCursor）
+        return _CursorProxy(self._conn.cursor(*args), self._driver)
 
     def __getattr__(self, name: str):
         return getattr(self._conn, name)
@@ -183,6 +190,62 @@ def _connect_sqlite(path: str, dict_cursor: bool) -> _ConnectionProxy:
     return _ConnectionProxy(conn, "sqlite")
 
 
+class _PooledSqliteConnection(_ConnectionProxy):
+    """
+    线程内复用的 SQLite 连接：取出期间由调用方独占，close() 回滚未提交事务后归还
+    close() 可重复调用；嵌套取用时池中已无连接，会另建一条，互不回滚对方的事务
+    """
+
+    def __init__(self, conn, pool: dict, key: tuple) -> None:
+        super().__init__(conn, "sqlite")
+        self._pool = pool
+        self._key = key
+
+    def close(self) -> None:
+        pool = self._pool
+        if pool is None:
+            return
+        self._pool = None
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            self._conn.close()
+            return
+        if self._key in pool:
+            # 嵌套取用时多建的连接，池中已有同键连接则直接关闭
+            self._conn.close()
+        else:
+            pool[self._key] = self._conn
+
+
+_sqlite_local = threading.local()
+# 持久连接上的预编译语句缓存容量（sqlite3 默认 128）
+SQLITE_CACHED_STATEMENTS = 256
+
+
+def _sqlite_pool_enabled() -> bool:
+    return os.getenv("DB_POOL_ENABLED", "1") not in ("0", "false", "False")
+
+
+def _connect_sqlite_pooled(path: str, dict_cursor: bool) -> _ConnectionProxy:
+    if not _sqlite_pool_enabled():
+        return _connect_sqlite(path, dict_cursor)
+    pool = getattr(_sqlite_local, "connections", None)
+    if pool is None:
+        pool = _sqlite_local.connections = {}
+    key = (path, dict_cursor)
+    # 取出即独占：同一线程嵌套取用时池中为空，会新建连接
+    conn = pool.pop(key, None)
+    if conn is None:
+        conn = sqlite3.connect(path, cached_statements=SQLITE_CACHED_STATEMENTS)
+        if dict_cursor:
+            conn.row_factory = sqlite3.Row
+        # WAL 模式下读不阻塞写，持久连接只需设置一次
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return _PooledSqliteConnection(conn, pool, key)
+
+
 def open_connection(dict_cursor: bool = False) -> _ConnectionProxy:
     url = get_database_url()
     if _is_mysql_url(url):
@@ -191,6 +254,7 @@ def open_connection(dict_cursor: bool = False) -> _ConnectionProxy:
 
 
 def open_security_connection(dict_cursor: bool = False) -> _ConnectionProxy:
+    """每次新建连接；需要复用线程内连接时使用 get_security_connection()"""
     url = get_security_database_url()
     if _is_mysql_url(url):
         return _connect_mysql(url, dict_cursor)
@@ -208,7 +272,15 @@ def get_connection(dict_cursor: bool = False) -> Iterator[_ConnectionProxy]:
 
 @contextmanager
 def get_security_connection(dict_cursor: bool = False) -> Iterator[_ConnectionProxy]:
-    conn = open_security_connection(dict_cursor=dict_cursor)
+    """
+    安全库连接的上下文管理器：SQLite 复用线程内连接；
+    退出时（包括异常）回滚未提交的事务再归还，避免残留事务占用写锁或被后续提交带出
+    """
+    url = get_security_database_url()
+    if _is_mysql_url(url):
+        conn = _connect_mysql(url, dict_cursor)
+    else:
+        conn = _connect_sqlite_pooled(get_security_db_path(), dict_cursor)
     try:
         yield conn
     finally:
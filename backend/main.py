@@ -8,6 +8,7 @@ from fastapi import FastAPI, HTTPException, Query, UploadFile, File, Header, Dep
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse, Response, JSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, List
 from pydantic import BaseModel
 import logging
@@ -30,7 +31,8 @@ from backend.auth import (
     authenticate_user, create_access_token, get_current_user,
     create_user, change_password, list_users,
     get_admin_username, is_admin_configured, is_using_default_secret_key,
-    ensure_admin_user, reset_user_password
+    ensure_admin_user, reset_user_password, verify_tokens_batch,
+    shutdown_hash_executor
 )
 from backend.backup import (
     create_backup, restore_backup, list_backups, delete_backup,
@@ -47,7 +49,7 @@ from backend.security import (
 from backend.data_review import (
     find_duplicate_pressure_records, move_duplicates_to_review,
     get_pending_groups, get_pending_stats, update_pending_pressure,
-    approve_group, reject_group, restore_group
+    approve_group, reject_group, restore_group, ensure_initialized as init_data_review
 )
 from backend.totp import (
     setup_totp, enable_totp, disable_totp, is_totp_enabled,
@@ -55,9 +57,9 @@ from backend.totp import (
 )
 from backend.data_validation import (
     validate_record, validate_batch, clean_record,
-    validate_partial_record,
+    validate_partial_record, validate_and_warn_batch,
     get_validation_rules, get_field_constraints, get_soft_warnings,
-    count_soft_warnings, PRESSURE_SOFT_MAX
+    PRESSURE_SOFT_MAX
 )
 from backend.config import get_backup_dir, get_cors_origins
 from backend.db import get_connection
@@ -106,6 +108,9 @@ class CreateUserRequest(BaseModel):
 class ResetUserPasswordRequest(BaseModel):
     new_password: str
 
+class VerifyTokensRequest(BaseModel):
+    tokens: List[str]
+
 class BatchDeleteRequest(BaseModel):
     ids: List[int]
 
@@ -803,15 +808,14 @@ async def api_import_file(file: UploadFile = File(...), user: dict = Depends(req
         if not records:
             raise HTTPException(status_code=400, detail="文件中没有有效数据")
 
-        validation_errors = []
-        valid_records = []
-        for idx, record in enumerate(records):
-            is_valid, errors = validate_record(record)
-            if is_valid:
-                valid_records.append(record)
-            else:
-                row_number = row_numbers[idx] if idx < len(row_numbers) else (idx + 1)
-                validation_errors.append({"row": row_number, "errors": errors})
+        def row_number(idx: int) -> int:
+            return row_numbers[idx] if idx < len(row_numbers) else (idx + 1)
+
+        checked = validate_and_warn_batch(records)
+        valid_records = checked["valid_records"]
+        validation_errors = [
+            {"row": row_number(e["index"]), "errors": e["errors"]} for e in checked["errors"]
+        ]
 
         if validation_errors:
             raise HTTPException(
@@ -831,7 +835,7 @@ async def api_import_file(file: UploadFile = File(...), user: dict = Depends(req
         # 批量插入
         count = batch_create_records(valid_records)
         invalidate_read_caches()
-        warning_count = count_soft_warnings(valid_records)
+        warning_count = checked["pressure_warning_count"]
         
         return ApiResponse(
             success=True,
@@ -866,20 +870,17 @@ async def api_import_preview(file: UploadFile = File(...), user: dict = Depends(
         if not records:
             raise HTTPException(status_code=400, detail="文件中没有有效数据")
 
-        validation_errors = []
-        warning_rows = []
-        valid_count = 0
-
-        for idx, record in enumerate(records):
-            row_number = row_numbers[idx] if idx < len(row_numbers) else (idx + 1)
-            is_valid, errors = validate_record(record)
-            if is_valid:
-                valid_count += 1
-                warnings = get_soft_warnings(record)
-                if warnings:
-                    warning_rows.append({"row": row_number, "warnings": warnings})
-            else:
-                validation_errors.append({"row": row_number, "errors": errors})
+        def row_number(idx: int) -> int:
+            return row_numbers[idx] if idx < len(row_numbers) else (idx + 1)
+
+        checked = validate_and_warn_batch(records)
+        valid_count = len(checked["valid_records"])
+        validation_errors = [
+            {"row": row_number(e["index"]), "errors": e["errors"]} for e in checked["errors"]
+        ]
+        warning_rows = [
+            {"row": row_number(w["index"]), "warnings": w["warnings"]} for w in checked["warnings"]
+        ]
 
         return {
             "success": True,
@@ -1192,6 +1193,34 @@ async def api_list_users(user: dict = Depends(require_auth)):
     return {"success": True, "data": list_users()}
 
 
+# 端点：POST /api/auth/tokens/verify
+# 功能：管理员批量校验 JWT Token（签名与有效期），用于批量吊销/巡检。
+# 参数（Body）：`VerifyTokensRequest`（tokens，最多 MAX_VERIFY_TOKENS 个）
+# 参数（Header）：Authorization：`Bearer <token>`（需登录）
+# 权限：仅 admin
+# 返回值：`{success: true, data: [{valid, username, expires_at}]}`，顺序与输入一致。
+MAX_VERIFY_TOKENS = 1000
+
+
+@app.post("/api/auth/tokens/verify", tags=["Auth"])
+async def api_verify_tokens(request: VerifyTokensRequest, user: dict = Depends(require_auth)):
+    """批量校验 Token（仅管理员）"""
+    if user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="权限不足")
+
+    if len(request.tokens) > MAX_VERIFY_TOKENS:
+        raise HTTPException(status_code=400, detail=f"单次最多校验 {MAX_VERIFY_TOKENS} 个 Token")
+
+    data = []
+    for payload in verify_tokens_batch(request.tokens):
+        data.append({
+            "valid": payload is not None,
+            "username": payload.get("sub") if payload else None,
+            "expires_at": payload.get("exp") if payload else None,
+        })
+    return {"success": True, "data": data}
+
+
 # ==================== TOTP 两步验证 API ====================
 
 # 端点：POST /api/auth/totp/setup
@@ -2354,7 +2383,7 @@ async def api_backup_status(user: dict = Depends(require_auth)):
 @app.get("/api/backup/list", tags=["Backup"])
 async def api_backup_list(user: dict = Depends(require_auth)):
     """获取备份列表"""
-    return {"success": True, "data": list_backups()}
+    return {"success": True, "data": await run_in_threadpool(list_backups)}
 
 
 # 端点：POST /api/backup/create
@@ -2368,7 +2397,8 @@ async def api_create_backup(user: dict = Depends(require_auth)):
     if user["role"] != "admin":
         raise HTTPException(status_code=403, detail="权限不足")
     
-    backup_path = create_backup(manual=True)
+    # 备份是阻塞的磁盘 I/O，放到线程池执行，避免阻塞事件循环
+    backup_path = await run_in_threadpool(create_backup, manual=True)
     if backup_path:
         return {"success": True, "message": "备份创建成功", "data": {"path": backup_path}}
     if not is_backup_supported():
@@ -2388,7 +2418,7 @@ async def api_restore_backup(filename: str, user: dict = Depends(require_auth)):
     if user["role"] != "admin":
         raise HTTPException(status_code=403, detail="权限不足")
     
-    success = restore_backup(filename)
+    success = await run_in_threadpool(restore_backup, filename)
     if success:
         return {"success": True, "message": "备份恢复成功"}
     if not is_backup_supported():
@@ -2465,6 +2495,8 @@ async def startup_event():
         logger.warning("[Security] SECRET_KEY 使用默认值，请在生产环境中设置环境变量")
     if not is_admin_configured():
         logger.warning("[Auth] 未设置 ADMIN_PASSWORD，管理员登录已禁用")
+    logger.info("[App] 正在初始化审核数据表...")
+    init_data_review()
     logger.info("[App] 正在初始化备份系统...")
     init_backup_system()
     
@@ -2479,6 +2511,12 @@ async def startup_event():
     logger.info("[App] 系统启动完成 v4.0")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时执行"""
+    await run_in_threadpool(shutdown_hash_executor)
+
+
 # ==================== 启动入口 ====================
 
 if __name__ == "__main__":
@@ -17,7 +17,7 @@ try:
 except ImportError:  # pragma: no cover
     redis = None
 
-from backend.db import get_security_connection, is_security_mysql, open_security_connection
+from backend.db import get_security_connection, is_security_mysql
 
 # ==================== 配置 ====================
 
@@ -349,22 +349,21 @@ def add_crawler_block(ip: str, reason: str, duration: int = 3600):
     
     # 记录到数据库
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-        blocked_until = datetime.now() + timedelta(seconds=duration)
-        if is_security_mysql():
-            cursor.execute('''
-                INSERT INTO blocked_ips (ip_address, reason, blocked_until)
-                VALUES (?, ?, ?)
-                ON DUPLICATE KEY UPDATE reason = VALUES(reason), blocked_until = VALUES(blocked_until)
-            ''', (ip, reason, blocked_until))
-        else:
-            cursor.execute('''
-                INSERT OR REPLACE INTO blocked_ips (ip_address, reason, blocked_until)
-                VALUES (?, ?, ?)
-            ''', (ip, reason, blocked_until))
-        conn.commit()
-        conn.close()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
+            blocked_until = datetime.now() + timedelta(seconds=duration)
+            if is_security_mysql():
+                cursor.execute('''
+                    INSERT INTO blocked_ips (ip_address, reason, blocked_until)
+                    VALUES (?, ?, ?)
+                    ON DUPLICATE KEY UPDATE reason = VALUES(reason), blocked_until = VALUES(blocked_until)
+                ''', (ip, reason, blocked_until))
+            else:
+                cursor.execute('''
+                    INSERT OR REPLACE INTO blocked_ips (ip_address, reason, blocked_until)
+                    VALUES (?, ?, ?)
+                ''', (ip, reason, blocked_until))
+            conn.commit()
     except Exception as e:
         print(f"[Security] 记录封禁失败: {e}")
 
@@ -374,14 +373,13 @@ def add_crawler_block(ip: str, reason: str, duration: int = 3600):
 def record_login(username: str, ip: str, user_agent: str, success: bool, failure_reason: str = None):
     """记录登录日志"""
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO login_logs (username, ip_address, user_agent, success, failure_reason)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (username, ip, user_agent, 1 if success else 0, failure_reason))
-        conn.commit()
-        conn.close()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO login_logs (username, ip_address, user_agent, success, failure_reason)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (username, ip, user_agent, 1 if success else 0, failure_reason))
+            conn.commit()
     except Exception as e:
         print(f"[Security] 记录登录日志失败: {e}")
 
@@ -443,23 +441,22 @@ def record_login_attempt(ip: str, success: bool):
 def get_login_logs(username: str = None, limit: int = 100) -> List[Dict]:
     """获取登录日志"""
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
         
-        if username:
-            cursor.execute('''
-                SELECT id, username, ip_address, user_agent, success, failure_reason, created_at
-                FROM login_logs WHERE username = ?
-                ORDER BY created_at DESC LIMIT ?
-            ''', (username, limit))
-        else:
-            cursor.execute('''
-                SELECT id, username, ip_address, user_agent, success, failure_reason, created_at
-                FROM login_logs ORDER BY created_at DESC LIMIT ?
-            ''', (limit,))
+            if username:
+                cursor.execute('''
+                    SELECT id, username, ip_address, user_agent, success, failure_reason, created_at
+                    FROM login_logs WHERE username = ?
+                    ORDER BY created_at DESC LIMIT ?
+                ''', (username, limit))
+            else:
+                cursor.execute('''
+                    SELECT id, username, ip_address, user_agent, success, failure_reason, created_at
+                    FROM login_logs ORDER BY created_at DESC LIMIT ?
+                ''', (limit,))
         
-        rows = cursor.fetchall()
-        conn.close()
+            rows = cursor.fetchall()
         
         return [{
             'id': r['id'],
@@ -497,33 +494,32 @@ def create_session(token: str, username: str, ip: str, user_agent: str) -> bool:
     expires_at = datetime.now() + timedelta(seconds=SESSION_MAX_AGE)
     
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
         
-        # 检查用户会话数量
-        cursor.execute('SELECT COUNT(*) as count FROM sessions WHERE username = ?', (username,))
-        row = cursor.fetchone()
-        count = row['count'] if row else 0
+            # 检查用户会话数量
+            cursor.execute('SELECT COUNT(*) as count FROM sessions WHERE username = ?', (username,))
+            row = cursor.fetchone()
+            count = row['count'] if row else 0
         
-        if count >= SESSION_MAX_PER_USER:
-            # 删除最旧的会话
-            cursor.execute('''
-                DELETE FROM sessions WHERE id IN (
-                    SELECT id FROM (
-                        SELECT id FROM sessions WHERE username = ?
-                        ORDER BY last_active ASC LIMIT ?
-                    ) AS old_sessions
-                )
-            ''', (username, count - SESSION_MAX_PER_USER + 1))
+            if count >= SESSION_MAX_PER_USER:
+                # 删除最旧的会话
+                cursor.execute('''
+                    DELETE FROM sessions WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id FROM sessions WHERE username = ?
+                            ORDER BY last_active ASC LIMIT ?
+                        ) AS old_sessions
+                    )
+                ''', (username, count - SESSION_MAX_PER_USER + 1))
         
-        # 创建新会话
-        cursor.execute('''
-            INSERT INTO sessions (token_hash, username, ip_address, user_agent, expires_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (token_hash, username, ip, user_agent, expires_at.isoformat()))
+            # 创建新会话
+            cursor.execute('''
+                INSERT INTO sessions (token_hash, username, ip_address, user_agent, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (token_hash, username, ip, user_agent, expires_at.isoformat()))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         
         session = {
             'username': username,
@@ -573,39 +569,37 @@ def validate_session(token: str) -> Optional[Dict]:
     
     # 检查数据库
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT username, ip_address, created_at, expires_at
-            FROM sessions WHERE token_hash = ? AND expires_at > CURRENT_TIMESTAMP
-        ''', (token_hash,))
-        row = cursor.fetchone()
-        
-        if row:
-            # 更新最后活跃时间
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
             cursor.execute('''
-                UPDATE sessions SET last_active = CURRENT_TIMESTAMP WHERE token_hash = ?
+                SELECT username, ip_address, created_at, expires_at
+                FROM sessions WHERE token_hash = ? AND expires_at > CURRENT_TIMESTAMP
             ''', (token_hash,))
-            conn.commit()
-            conn.close()
+            row = cursor.fetchone()
+        
+            if row:
+                # 更新最后活跃时间
+                cursor.execute('''
+                    UPDATE sessions SET last_active = CURRENT_TIMESTAMP WHERE token_hash = ?
+                ''', (token_hash,))
+                conn.commit()
             
-            session = {
-                'username': row['username'],
-                'ip': row['ip_address'],
-                'created_at': row['created_at'],
-                'expires_at': row['expires_at']
-            }
+                session = {
+                    'username': row['username'],
+                    'ip': row['ip_address'],
+                    'created_at': row['created_at'],
+                    'expires_at': row['expires_at']
+                }
             
-            # 更新缓存
-            if redis_client:
-                _cache_session(redis_client, token_hash, session)
-            else:
-                with _lock:
-                    active_sessions[token_hash] = session
+                # 更新缓存
+                if redis_client:
+                    _cache_session(redis_client, token_hash, session)
+                else:
+                    with _lock:
+                        active_sessions[token_hash] = session
             
-            return session
+                return session
         
-        conn.close()
     except Exception as e:
         print(f"[Security] 验证会话失败: {e}")
     
@@ -624,11 +618,10 @@ def revoke_session(token: str) -> bool:
                 del active_sessions[token_hash]
     
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM sessions WHERE token_hash = ?', (token_hash,))
-        conn.commit()
-        conn.close()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM sessions WHERE token_hash = ?', (token_hash,))
+            conn.commit()
         return True
     except Exception as e:
         print(f"[Security] 撤销会话失败: {e}")
@@ -638,15 +631,14 @@ def revoke_session(token: str) -> bool:
 def get_user_sessions(username: str) -> List[Dict]:
     """获取用户所有会话"""
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, ip_address, user_agent, created_at, last_active, expires_at
-            FROM sessions WHERE username = ? AND expires_at > CURRENT_TIMESTAMP
-            ORDER BY last_active DESC
-        ''', (username,))
-        rows = cursor.fetchall()
-        conn.close()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, ip_address, user_agent, created_at, last_active, expires_at
+                FROM sessions WHERE username = ? AND expires_at > CURRENT_TIMESTAMP
+                ORDER BY last_active DESC
+            ''', (username,))
+            rows = cursor.fetchall()
         
         return [{
             'id': r['id'],
@@ -664,20 +656,19 @@ def get_user_sessions(username: str) -> List[Dict]:
 def revoke_all_user_sessions(username: str, except_token: str = None) -> int:
     """撤销用户所有会话"""
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
         
-        if except_token:
-            except_hash = hashlib.sha256(except_token.encode()).hexdigest()
-            cursor.execute('''
-                DELETE FROM sessions WHERE username = ? AND token_hash != ?
-            ''', (username, except_hash))
-        else:
-            cursor.execute('DELETE FROM sessions WHERE username = ?', (username,))
+            if except_token:
+                except_hash = hashlib.sha256(except_token.encode()).hexdigest()
+                cursor.execute('''
+                    DELETE FROM sessions WHERE username = ? AND token_hash != ?
+                ''', (username, except_hash))
+            else:
+                cursor.execute('DELETE FROM sessions WHERE username = ?', (username,))
         
-        count = cursor.rowcount
-        conn.commit()
-        conn.close()
+            count = cursor.rowcount
+            conn.commit()
         
         redis_client = get_redis_client()
         if redis_client:
@@ -754,14 +745,13 @@ def record_audit_log(username: str, action: str, resource: str = None,
                      new_value: str = None, ip: str = None):
     """记录审计日志"""
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO audit_logs (username, action, resource, resource_id, old_value, new_value, ip_address)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (username, action, resource, resource_id, old_value, new_value, ip))
-        conn.commit()
-        conn.close()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO audit_logs (username, action, resource, resource_id, old_value, new_value, ip_address)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (username, action, resource, resource_id, old_value, new_value, ip))
+            conn.commit()
     except Exception as e:
         print(f"[Security] 记录审计日志失败: {e}")
 
@@ -769,25 +759,24 @@ def record_audit_log(username: str, action: str, resource: str = None,
 def get_audit_logs(username: str = None, action: str = None, limit: int = 100) -> List[Dict]:
     """获取审计日志"""
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
         
-        query = 'SELECT id, username, action, resource, resource_id, old_value, new_value, ip_address, created_at FROM audit_logs WHERE 1=1'
-        params = []
+            query = 'SELECT id, username, action, resource, resource_id, old_value, new_value, ip_address, created_at FROM audit_logs WHERE 1=1'
+            params = []
         
-        if username:
-            query += ' AND username = ?'
-            params.append(username)
-        if action:
-            query += ' AND action = ?'
-            params.append(action)
+            if username:
+                query += ' AND username = ?'
+                params.append(username)
+            if action:
+                query += ' AND action = ?'
+                params.append(action)
         
-        query += ' ORDER BY created_at DESC LIMIT ?'
-        params.append(limit)
+            query += ' ORDER BY created_at DESC LIMIT ?'
+            params.append(limit)
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
         
         return [{
             'id': r['id'],
@@ -810,29 +799,28 @@ def get_audit_logs(username: str = None, action: str = None, limit: int = 100) -
 def record_data_history(record_id: int, action: str, changes: Dict = None, username: str = None):
     """记录数据修改历史"""
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
         
-        if action == 'DELETE':
-            # 删除时记录整条记录
-            cursor.execute('''
-                INSERT INTO data_history (record_id, action, old_value, username)
-                VALUES (?, ?, ?, ?)
-            ''', (record_id, action, str(changes) if changes else None, username))
-        elif action == 'CREATE':
-            cursor.execute('''
-                INSERT INTO data_history (record_id, action, new_value, username)
-                VALUES (?, ?, ?, ?)
-            ''', (record_id, action, str(changes) if changes else None, username))
-        elif action == 'UPDATE' and changes:
-            for field, (old_val, new_val) in changes.items():
+            if action == 'DELETE':
+                # 删除时记录整条记录
                 cursor.execute('''
-                    INSERT INTO data_history (record_id, action, field_name, old_value, new_value, username)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (record_id, action, field, str(old_val), str(new_val), username))
+                    INSERT INTO data_history (record_id, action, old_value, username)
+                    VALUES (?, ?, ?, ?)
+                ''', (record_id, action, str(changes) if changes else None, username))
+            elif action == 'CREATE':
+                cursor.execute('''
+                    INSERT INTO data_history (record_id, action, new_value, username)
+                    VALUES (?, ?, ?, ?)
+                ''', (record_id, action, str(changes) if changes else None, username))
+            elif action == 'UPDATE' and changes:
+                for field, (old_val, new_val) in changes.items():
+                    cursor.execute('''
+                        INSERT INTO data_history (record_id, action, field_name, old_value, new_value, username)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (record_id, action, field, str(old_val), str(new_val), username))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
     except Exception as e:
         print(f"[Security] 记录数据历史失败: {e}")
 
@@ -840,31 +828,30 @@ def record_data_history(record_id: int, action: str, changes: Dict = None, usern
 def get_data_history(record_id: int = None, action: str = None, username: str = None, limit: int = 100) -> List[Dict]:
     """获取数据历史"""
     try:
-        conn = open_security_connection(dict_cursor=True)
-        cursor = conn.cursor()
-
-        query = '''
-            SELECT id, record_id, action, field_name, old_value, new_value, username, created_at
-            FROM data_history WHERE 1=1
-        '''
-        params = []
-        if record_id:
-            query += ' AND record_id = ?'
-            params.append(record_id)
-        if action:
-            query += ' AND action = ?'
-            params.append(action)
-        if username:
-            query += ' AND username = ?'
-            params.append(username)
-
-        query += ' ORDER BY created_at DESC LIMIT ?'
-        params.append(limit)
-
-        cursor.execute(query, params)
+        with get_security_connection(dict_cursor=True) as conn:
+            cursor = conn.cursor()
+
+            query = '''
+                SELECT id, record_id, action, field_name, old_value, new_value, username, created_at
+                FROM data_history WHERE 1=1
+            '''
+            params = []
+            if record_id:
+                query += ' AND record_id = ?'
+                params.append(record_id)
+            if action:
+                query += ' AND action = ?'
+                params.append(action)
+            if username:
+                query += ' AND username = ?'
+                params.append(username)
+
+            query += ' ORDER BY created_at DESC LIMIT ?'
+            params.append(limit)
+
+            cursor.execute(query, params)
         
-        rows = cursor.fetchall()
-        conn.close()
+            rows = cursor.fetchall()
         
         return [{
             'id': r['id'],
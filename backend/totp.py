@@ -11,7 +11,7 @@ import base64
 import os
 from typing import Tuple
 
-from backend.db import is_security_mysql, open_security_connection
+from backend.db import get_security_connection, is_security_mysql
 
 # TOTP 配置
 TOTP_DIGITS = 6  # 验证码位数
@@ -101,21 +101,20 @@ def init_totp_table():
     id_column = "BIGINT PRIMARY KEY AUTO_INCREMENT" if is_security_mysql() else "INTEGER PRIMARY KEY AUTOINCREMENT"
     username_type = "VARCHAR(64)" if is_security_mysql() else "TEXT"
     secret_type = "VARCHAR(64)" if is_security_mysql() else "TEXT"
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
-    cursor.execute(f'''
-        CREATE TABLE IF NOT EXISTS user_totp (
-            id {id_column},
-            username {username_type} UNIQUE NOT NULL,
-            secret {secret_type} NOT NULL,
-            enabled INTEGER DEFAULT 0,
-            backup_codes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_used TIMESTAMP
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS user_totp (
+                id {id_column},
+                username {username_type} UNIQUE NOT NULL,
+                secret {secret_type} NOT NULL,
+                enabled INTEGER DEFAULT 0,
+                backup_codes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used TIMESTAMP
+            )
+        ''')
+        conn.commit()
 
 
 def setup_totp(username: str) -> Tuple[str, str]:
@@ -130,121 +129,110 @@ def setup_totp(username: str) -> Tuple[str, str]:
     backup_codes = [generate_secret(8)[:8] for _ in range(10)]
     backup_codes_str = ','.join(backup_codes)
     
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+    
+        # 检查是否已存在
+        cursor.execute('SELECT id FROM user_totp WHERE username = ?', (username,))
+        if cursor.fetchone():
+            cursor.execute('''
+                UPDATE user_totp SET secret = ?, enabled = 0, backup_codes = ?
+                WHERE username = ?
+            ''', (secret, backup_codes_str, username))
+        else:
+            cursor.execute('''
+                INSERT INTO user_totp (username, secret, backup_codes)
+                VALUES (?, ?, ?)
+            ''', (username, secret, backup_codes_str))
     
-    # 检查是否已存在
-    cursor.execute('SELECT id FROM user_totp WHERE username = ?', (username,))
-    if cursor.fetchone():
-        cursor.execute('''
-            UPDATE user_totp SET secret = ?, enabled = 0, backup_codes = ?
-            WHERE username = ?
-        ''', (secret, backup_codes_str, username))
-    else:
-        cursor.execute('''
-            INSERT INTO user_totp (username, secret, backup_codes)
-            VALUES (?, ?, ?)
-        ''', (username, secret, backup_codes_str))
-    
-    conn.commit()
-    conn.close()
+        conn.commit()
     
     return secret, uri
 
 
 def enable_totp(username: str, code: str) -> bool:
     """启用 TOTP（需要验证码确认）"""
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
     
-    cursor.execute('SELECT secret FROM user_totp WHERE username = ?', (username,))
-    row = cursor.fetchone()
+        cursor.execute('SELECT secret FROM user_totp WHERE username = ?', (username,))
+        row = cursor.fetchone()
     
-    if not row:
-        conn.close()
-        return False
+        if not row:
+            return False
     
-    secret = row['secret']
+        secret = row['secret']
     
-    if verify_totp(secret, code):
-        cursor.execute('UPDATE user_totp SET enabled = 1 WHERE username = ?', (username,))
-        conn.commit()
-        conn.close()
-        return True
+        if verify_totp(secret, code):
+            cursor.execute('UPDATE user_totp SET enabled = 1 WHERE username = ?', (username,))
+            conn.commit()
+            return True
     
-    conn.close()
     return False
 
 
 def disable_totp(username: str) -> bool:
     """禁用 TOTP"""
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
-    cursor.execute('UPDATE user_totp SET enabled = 0 WHERE username = ?', (username,))
-    affected = cursor.rowcount
-    conn.commit()
-    conn.close()
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute('UPDATE user_totp SET enabled = 0 WHERE username = ?', (username,))
+        affected = cursor.rowcount
+        conn.commit()
     return affected > 0
 
 
 def is_totp_enabled(username: str) -> bool:
     """检查用户是否启用了 TOTP"""
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
-    cursor.execute('SELECT enabled FROM user_totp WHERE username = ?', (username,))
-    row = cursor.fetchone()
-    conn.close()
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT enabled FROM user_totp WHERE username = ?', (username,))
+        row = cursor.fetchone()
     return bool(row and row['enabled'])
 
 
 def verify_user_totp(username: str, code: str) -> bool:
     """验证用户的 TOTP 验证码"""
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
     
-    cursor.execute('SELECT secret, backup_codes FROM user_totp WHERE username = ? AND enabled = 1', (username,))
-    row = cursor.fetchone()
+        cursor.execute('SELECT secret, backup_codes FROM user_totp WHERE username = ? AND enabled = 1', (username,))
+        row = cursor.fetchone()
     
-    if not row:
-        conn.close()
-        return False
+        if not row:
+            return False
     
-    secret = row['secret']
-    backup_codes_str = row['backup_codes']
+        secret = row['secret']
+        backup_codes_str = row['backup_codes']
     
-    # 先尝试正常验证码
-    if verify_totp(secret, code):
-        cursor.execute('UPDATE user_totp SET last_used = CURRENT_TIMESTAMP WHERE username = ?', (username,))
-        conn.commit()
-        conn.close()
-        return True
-    
-    # 尝试备用码
-    if backup_codes_str:
-        backup_codes = backup_codes_str.split(',')
-        if code in backup_codes:
-            # 使用后删除备用码
-            backup_codes.remove(code)
-            cursor.execute('UPDATE user_totp SET backup_codes = ?, last_used = CURRENT_TIMESTAMP WHERE username = ?',
-                          (','.join(backup_codes), username))
+        # 先尝试正常验证码
+        if verify_totp(secret, code):
+            cursor.execute('UPDATE user_totp SET last_used = CURRENT_TIMESTAMP WHERE username = ?', (username,))
             conn.commit()
-            conn.close()
             return True
     
-    conn.close()
+        # 尝试备用码
+        if backup_codes_str:
+            backup_codes = backup_codes_str.split(',')
+            if code in backup_codes:
+                # 使用后删除备用码
+                backup_codes.remove(code)
+                cursor.execute('UPDATE user_totp SET backup_codes = ?, last_used = CURRENT_TIMESTAMP WHERE username = ?',
+                              (','.join(backup_codes), username))
+                conn.commit()
+                return True
+    
     return False
 
 
 def get_totp_status(username: str) -> dict:
     """获取用户的 TOTP 状态"""
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT enabled, created_at, last_used, backup_codes
-        FROM user_totp WHERE username = ?
-    ''', (username,))
-    row = cursor.fetchone()
-    conn.close()
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT enabled, created_at, last_used, backup_codes
+            FROM user_totp WHERE username = ?
+        ''', (username,))
+        row = cursor.fetchone()
     
     if not row:
         return {
@@ -268,12 +256,11 @@ def regenerate_backup_codes(username: str) -> list:
     backup_codes = [generate_secret(8)[:8] for _ in range(10)]
     backup_codes_str = ','.join(backup_codes)
     
-    conn = open_security_connection(dict_cursor=True)
-    cursor = conn.cursor()
-    cursor.execute('UPDATE user_totp SET backup_codes = ? WHERE username = ?',
-                  (backup_codes_str, username))
-    conn.commit()
-    conn.close()
+    with get_security_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute('UPDATE user_totp SET backup_codes = ? WHERE username = ?',
+                      (backup_codes_str, username))
+        conn.commit()
     
     return backup_codes
 
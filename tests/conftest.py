@@ -33,9 +33,13 @@ def _session_env(test_db_dir: Path) -> Iterator[None]:
     mp.setenv("SECURITY_DB_PATH", str(test_db_dir / "security_test.db"))
     mp.delenv("DATABASE_URL", raising=False)
     mp.delenv("SECURITY_DATABASE_URL", raising=False)
+    # 配置读取带缓存，收集阶段导入的模块可能已缓存了旧值
+    from backend.config import reload_config
 
+    reload_config()
     yield
     mp.undo()
+    reload_config()
 
 
 @pytest.fixture()
@@ -82,6 +86,13 @@ def reset_databases(init_databases: None) -> None:
         cur.execute("DELETE FROM user_accounts")
         conn.commit()
 
+    # 直接改库绕过了 auth / data_review 模块的缓存失效逻辑
+    from backend.auth import clear_auth_caches
+    from backend.data_review import clear_review_caches
+
+    clear_auth_caches()
+    clear_review_caches()
+
 
 @pytest.fixture()
 def sample_record() -> dict:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+
+
+def _client_headers(token: str | None = None) -> dict[str, str]:
+    headers = {"User-Agent": "pytest"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _login(client: TestClient, username: str, password: str) -> str:
+    resp = client.post(
+        "/api/auth/login",
+        json={"username": username, "password": password},
+        headers=_client_headers(),
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["success"] is True, data
+    token = data["data"]["access_token"]
+    assert isinstance(token, str)
+    return token
+
+
+def test_verify_tokens_requires_admin(reset_databases: None) -> None:
+    # 延迟导入，确保读取测试环境变量
+    from backend.auth import create_user
+    from backend.main import app
+
+    assert create_user("alice", "AlicePass123") is True
+    with TestClient(app) as client:
+        r = client.post("/api/auth/tokens/verify", json={"tokens": []}, headers=_client_headers())
+        assert r.status_code == 401, r.text
+
+        token = _login(client, "alice", "AlicePass123")
+        r = client.post(
+            "/api/auth/tokens/verify",
+            json={"tokens": [token]},
+            headers=_client_headers(token),
+        )
+        assert r.status_code == 403, r.text
+
+
+def test_verify_tokens_rejects_oversized_batch(reset_databases: None) -> None:
+    from backend.main import MAX_VERIFY_TOKENS, app
+
+    with TestClient(app) as client:
+        token = _login(client, "admin", "AdminPass123")
+        r = client.post(
+            "/api/auth/tokens/verify",
+            json={"tokens": ["x"] * (MAX_VERIFY_TOKENS + 1)},
+            headers=_client_headers(token),
+        )
+        assert r.status_code == 400, r.text
+
+        r = client.post(
+            "/api/auth/tokens/verify",
+            json={"tokens": ["x"] * MAX_VERIFY_TOKENS},
+            headers=_client_headers(token),
+        )
+        assert r.status_code == 200, r.text
+        assert len(r.json()["data"]) == MAX_VERIFY_TOKENS
+
+
+def test_verify_tokens_response_shape(reset_databases: None) -> None:
+    from backend.auth import create_access_token, verify_token
+    from backend.main import app
+
+    good = create_access_token({"sub": "alice", "role": "user"})
+    expired = create_access_token({"sub": "bob"}, expires_delta=timedelta(seconds=-1))
+    with TestClient(app) as client:
+        token = _login(client, "admin", "AdminPass123")
+        r = client.post(
+            "/api/auth/tokens/verify",
+            json={"tokens": [good, "not-a-token", expired, good]},
+            headers=_client_headers(token),
+        )
+        assert r.status_code == 200, r.text
+        payload = r.json()
+        assert payload["success"] is True
+        # 顺序与输入一致
+        assert payload["data"] == [
+            {"valid": True, "username": "alice", "expires_at": verify_token(good)["exp"]},
+            {"valid": False, "username": None, "expires_at": None},
+            {"valid": False, "username": None, "expires_at": None},
+            {"valid": True, "username": "alice", "expires_at": verify_token(good)["exp"]},
+        ]
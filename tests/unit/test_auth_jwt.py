@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import os
 from datetime import timedelta
 
-from backend.auth import create_access_token, hash_password, verify_password, verify_token
+from backend.auth import (
+    authenticate_user,
+    create_access_token,
+    create_user,
+    create_users_bulk,
+    hash_password,
+    verify_password,
+    verify_token,
+    verify_tokens_batch,
+)
 
 
 def test_password_hash_and_verify() -> None:
@@ -13,6 +25,15 @@ def test_password_hash_and_verify() -> None:
     assert verify_password("wrong", pw_hash) is False
 
 
+def test_verify_password_accepts_legacy_format() -> None:
+    # 旧格式：base64(salt(32) + key)，无版本前缀
+    salt = os.urandom(32)
+    key = hashlib.pbkdf2_hmac("sha256", b"StrongPass123", salt, 100000)
+    legacy = base64.b64encode(salt + key).decode("utf-8")
+    assert verify_password("StrongPass123", legacy) is True
+    assert verify_password("wrong", legacy) is False
+
+
 def test_jwt_token_roundtrip() -> None:
     token = create_access_token({"sub": "alice", "role": "user"})
     payload = verify_token(token)
@@ -34,3 +55,107 @@ def test_jwt_token_tamper_rejected() -> None:
 def test_jwt_token_expired_rejected() -> None:
     token = create_access_token({"sub": "alice"}, expires_delta=timedelta(seconds=-1))
     assert verify_token(token) is None
+
+
+def test_verify_token_cache_returns_copies() -> None:
+    token = create_access_token({"sub": "alice"})
+    first = verify_token(token)
+    assert first is not None
+    first["sub"] = "mallory"
+    second = verify_token(token)
+    assert second is not None
+    assert second["sub"] == "alice"
+
+
+def test_verify_tokens_batch_preserves_order() -> None:
+    good = create_access_token({"sub": "alice"})
+    expired = create_access_token({"sub": "bob"}, expires_delta=timedelta(seconds=-1))
+    results = verify_tokens_batch([good, "not-a-token", expired, good])
+    assert [r is not None for r in results] == [True, False, False, True]
+    assert results[0] is not results[3]
+    assert results[3]["sub"] == "alice"
+
+
+def test_verify_token_rejects_malformed_input() -> None:
+    token = create_access_token({"sub": "alice"})
+    assert verify_token(token + "!") is None
+    assert verify_token("a.b") is None
+    assert verify_token(token.replace(".", "..", 1)) is None
+    assert verify_token(token + "A" * 5000) is None
+
+
+def test_create_users_bulk_rejects_duplicates_and_bad_roles(reset_databases: None) -> None:
+    assert create_user("carol", "CarolPass123") is True
+    results = create_users_bulk([
+        ("alice", "AlicePass123", "user"),
+        ("alice", "OtherPass123", "user"),
+        ("carol", "CarolPass456", "user"),
+        ("admin", "AdminPass456", "admin"),
+        ("dave", "DavePass123", "superuser"),
+        ("erin", "ErinPass123", "admin"),
+    ])
+    assert results == [True, False, False, False, False, True]
+
+
+def test_create_users_bulk_passwords_authenticate(reset_databases: None) -> None:
+    assert create_users_bulk([
+        ("alice", "AlicePass123", "user"),
+        ("alice", "OtherPass123", "user"),
+        ("erin", "ErinPass123", "admin"),
+    ]) == [True, False, True]
+
+    assert authenticate_user("alice", "AlicePass123") == {"username": "alice", "role": "user"}
+    # 批次内重复的第二条不能覆盖第一条的密码
+    assert authenticate_user("alice", "OtherPass123") is None
+    assert authenticate_user("erin", "ErinPass123") == {"username": "erin", "role": "admin"}
+
+
+def test_hash_passwords_parallel_path_reuses_pool(monkeypatch) -> None:
+    import backend.auth as auth_module
+
+    monkeypatch.setattr(auth_module, "BULK_HASH_MIN_PARALLEL", 1)
+    passwords = ["AlicePass123", "BobPass123", "CarolPass123"]
+    salts = [os.urandom(auth_module.SALT_BYTES) for _ in passwords]
+
+    try:
+        hashes = auth_module._hash_passwords(passwords, salts)
+        assert auth_module._hash_executor is not None
+        executor = auth_module._hash_executor
+        assert [verify_password(p, h) for p, h in zip(passwords, hashes)] == [True, True, True]
+        assert verify_password("wrong", hashes[0]) is False
+
+        # 第二次调用复用同一个进程池
+        assert auth_module._hash_passwords(passwords[:1], salts[:1]) == hashes[:1]
+        assert auth_module._hash_executor is executor
+    finally:
+        auth_module.shutdown_hash_executor()
+    assert auth_module._hash_executor is None
+
+
+def test_create_user_does_not_overwrite_concurrent_account(reset_databases: None, monkeypatch) -> None:
+    import backend.auth as auth_module
+
+    assert create_user("alice", "AlicePass123") is True
+    # 模拟存在性检查与写入之间另一请求已创建同名用户
+    monkeypatch.setattr(auth_module, "_get_user_from_db", lambda username: None)
+    assert create_user("alice", "MalloryPass123", "admin") is False
+    monkeypatch.undo()
+
+    assert authenticate_user("alice", "AlicePass123") == {"username": "alice", "role": "user"}
+    assert authenticate_user("alice", "MalloryPass123") is None
+
+
+def test_create_users_bulk_does_not_overwrite_concurrent_account(reset_databases: None, monkeypatch) -> None:
+    import backend.auth as auth_module
+
+    assert create_user("carol", "CarolPass123") is True
+    # 模拟存在性检查之后、哈希写入之前另一请求已创建同名用户
+    monkeypatch.setattr(auth_module, "_get_user_from_db", lambda username: None)
+    assert create_users_bulk([
+        ("alice", "AlicePass123", "user"),
+        ("carol", "MalloryPass123", "admin"),
+    ]) == [True, False]
+    monkeypatch.undo()
+
+    assert authenticate_user("carol", "CarolPass123") == {"username": "carol", "role": "user"}
+    assert authenticate_user("alice", "AlicePass123") == {"username": "alice", "role": "user"}
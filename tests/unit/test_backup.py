@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+
+@pytest.fixture()
+def backup_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """启用备份并使用独立的数据库文件与备份目录。"""
+    from backend.config import reload_config
+
+    db_path = tmp_path / "gas_backup_test.db"
+    monkeypatch.setenv("BACKUP_ENABLED", "1")
+    monkeypatch.setenv("BACKUP_DIR", str(tmp_path / "backups"))
+    monkeypatch.setenv("DATABASE_PATH", str(db_path))
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.execute("INSERT INTO t (v) VALUES ('original')")
+    conn.commit()
+    conn.close()
+
+    reload_config()
+    yield db_path
+    monkeypatch.undo()
+    reload_config()
+
+
+def _read_values(db_path: Path) -> list[str]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT v FROM t ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def _read_backup_values(backup_path: Path, tmp_path: Path) -> list[str]:
+    """按后缀读取备份：.db.zst 先解压到临时文件"""
+    if backup_path.name.endswith(".zst"):
+        import zstandard
+
+        plain = tmp_path / (backup_path.name[: -len(".zst")])
+        with open(backup_path, "rb") as src, open(plain, "wb") as dst:
+            zstandard.ZstdDecompressor().copy_stream(src, dst)
+        backup_path = plain
+    return _read_values(backup_path)
+
+
+def test_create_and_list_backups(backup_env: Path) -> None:
+    from backend.backup import create_backup, list_backups
+
+    path = create_backup(manual=True)
+    assert path is not None and os.path.exists(path)
+
+    backups = list_backups()
+    assert [b["filename"] for b in backups] == [os.path.basename(path)]
+    assert backups[0]["type"] == "manual"
+    assert backups[0]["size"] == os.path.getsize(path)
+
+
+def test_list_backups_sorted_newest_first(backup_env: Path) -> None:
+    from backend.backup import list_backups
+    from backend.config import get_backup_dir
+
+    backup_dir = Path(get_backup_dir())
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    for i, name in enumerate(
+        ["gas_data_auto_20240101_000000.db", "gas_data_auto_20240102_000000.db"]
+    ):
+        f = backup_dir / name
+        f.write_bytes(b"x")
+        os.utime(f, (1_700_000_000 + i, 1_700_000_000 + i))
+    (backup_dir / "notes.txt").write_text("ignored")
+
+    backups = list_backups()
+    names = [b["filename"] for b in backups]
+    assert names == ["gas_data_auto_20240102_000000.db", "gas_data_auto_20240101_000000.db"]
+    # 类型与时间取自文件名
+    assert backups[0]["type"] == "auto"
+    assert backups[0]["created_at"] == "2024-01-02T00:00:00"
+
+
+def test_restore_backup_roundtrip(backup_env: Path) -> None:
+    from backend.backup import create_backup, restore_backup
+
+    path = create_backup(manual=False)
+    assert path is not None
+
+    conn = sqlite3.connect(backup_env)
+    conn.execute("UPDATE t SET v = 'changed'")
+    conn.commit()
+    conn.close()
+    assert _read_values(backup_env) == ["changed"]
+
+    assert restore_backup(os.path.basename(path)) is True
+    assert _read_values(backup_env) == ["original"]
+
+
+def test_restore_backup_with_open_connections(backup_env: Path) -> None:
+    from backend.backup import create_backup, restore_backup
+
+    path = create_backup(manual=False)
+    assert path is not None
+
+    # 另一条连接在恢复前留下未合并的 WAL 帧，并在恢复后继续写入
+    conn = sqlite3.connect(backup_env, isolation_level=None)
+    try:
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        conn.execute("UPDATE t SET v = 'changed'")
+        assert restore_backup(os.path.basename(path)) is True
+        assert [row[0] for row in conn.execute("SELECT v FROM t ORDER BY id")] == ["original"]
+        conn.execute("INSERT INTO t (v) VALUES ('later')")
+    finally:
+        conn.close()
+
+    assert _read_values(backup_env) == ["original", "later"]
+
+
+def test_restore_aborts_when_safety_backup_fails(backup_env: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from backend import backup as backup_module
+
+    path = backup_module.create_backup(manual=False)
+    assert path is not None
+    conn = sqlite3.connect(backup_env)
+    conn.execute("UPDATE t SET v = 'changed'")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(backup_module, "create_backup", lambda manual=False: None)
+    assert backup_module.restore_backup(os.path.basename(path)) is False
+    assert _read_values(backup_env) == ["changed"]
+
+
+def test_create_backup_prunes_oldest(backup_env: Path) -> None:
+    from backend.backup import MAX_BACKUPS, create_backup, list_backups
+    from backend.config import get_backup_dir
+
+    backup_dir = Path(get_backup_dir())
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(MAX_BACKUPS):
+        f = backup_dir / f"gas_data_auto_202401{i + 1:02d}_000000.db"
+        f.write_bytes(b"x")
+        os.utime(f, (1_700_000_000 + i, 1_700_000_000 + i))
+
+    path = create_backup(manual=True)
+    assert path is not None
+
+    names = [b["filename"] for b in list_backups()]
+    assert len(names) == MAX_BACKUPS
+    assert names[0] == os.path.basename(path)
+    assert "gas_data_auto_20240101_000000.db" not in names
+
+
+def test_auto_backup_cancelled_after_stop(backup_env: Path) -> None:
+    from backend import backup
+
+    conn = sqlite3.connect(backup_env)
+    conn.executemany("INSERT INTO t (v) VALUES (?)", [("x" * 200,)] * 2000)
+    conn.commit()
+    conn.close()
+
+    backup._stop_event.set()
+    try:
+        assert backup.create_backup(manual=False) is None
+        # 手动备份不受停止标记影响
+        assert backup.create_backup(manual=True) is not None
+    finally:
+        backup._stop_event.clear()
+
+    names = backup.list_backups(details=False)
+    assert len(names) == 1 and "_manual_" in names[0]
+
+
+def test_list_backup_names_sorted_by_embedded_timestamp(backup_env: Path) -> None:
+    from backend.backup import list_backups
+    from backend.config import get_backup_dir
+
+    backup_dir = Path(get_backup_dir())
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    for name in (
+        "gas_data_manual_20240101_000000.db",
+        "gas_data_auto_20240103_000000.db",
+        "gas_data_auto_20240102_000000.db",
+    ):
+        (backup_dir / name).write_bytes(b"x")
+    (backup_dir / "notes.txt").write_text("ignored")
+
+    assert list_backups(details=False) == [
+        "gas_data_auto_20240103_000000.db",
+        "gas_data_auto_20240102_000000.db",
+        "gas_data_manual_20240101_000000.db",
+    ]
+
+
+def test_start_auto_backup_runs_first_backup_in_worker(backup_env: Path) -> None:
+    from backend import backup
+
+    backup.start_auto_backup()
+    try:
+        thread = backup._backup_thread
+        assert thread is not None
+        for _ in range(100):
+            if backup.list_backups(details=False):
+                break
+            time.sleep(0.05)
+    finally:
+        backup.stop_auto_backup()
+    thread.join(timeout=5)
+    backup._stop_event.clear()
+
+    assert not thread.is_alive()
+    names = backup.list_backups(details=False)
+    assert len(names) == 1 and "_auto_" in names[0]
+
+
+def test_unchanged_database_backup_is_hardlinked(backup_env: Path, tmp_path: Path) -> None:
+    from backend.backup import create_backup
+
+    first = create_backup(manual=False)
+    second = create_backup(manual=True)
+    assert first is not None and second is not None and first != second
+    assert os.stat(first).st_ino == os.stat(second).st_ino
+
+    conn = sqlite3.connect(backup_env)
+    conn.execute("UPDATE t SET v = 'changed'")
+    conn.commit()
+    conn.close()
+
+    time.sleep(1.1)
+    third = create_backup(manual=True)
+    assert third is not None
+    assert os.stat(third).st_ino != os.stat(second).st_ino
+    assert _read_backup_values(Path(third), tmp_path) == ["changed"]
+
+
+def test_auto_backup_skipped_when_database_unchanged(backup_env: Path) -> None:
+    from backend.backup import create_backup, list_backups
+
+    assert create_backup(manual=False) is not None
+    time.sleep(1.1)
+    assert create_backup(manual=False) is None
+    assert len(list_backups(details=False)) == 1
+
+
+def test_hardlinked_backup_listed_by_name_and_counted_once(backup_env: Path) -> None:
+    from backend.backup import get_backup_status, list_backups
+    from backend.config import get_backup_dir
+
+    backup_dir = Path(get_backup_dir())
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    first = backup_dir / "gas_data_auto_20240101_000000.db"
+    second = backup_dir / "gas_data_auto_20240102_000000.db"
+    first.write_bytes(b"x" * 100)
+    second.write_bytes(b"y" * 10)
+    os.utime(first, (1_700_000_000, 1_700_000_000))
+    os.utime(second, (1_700_000_010, 1_700_000_010))
+    # 硬链接的新备份沿用第一份的修改时间
+    os.link(first, backup_dir / "gas_data_manual_20240103_000000.db")
+
+    assert [b["filename"] for b in list_backups()] == [
+        "gas_data_manual_20240103_000000.db",
+        "gas_data_auto_20240102_000000.db",
+        "gas_data_auto_20240101_000000.db",
+    ]
+    status = get_backup_status()
+    assert status["last_backup"] == "2024-01-03T00:00:00"
+    assert status["total_size"] == "110.0 B"
+
+
+def test_compressed_backup_roundtrip(backup_env: Path, tmp_path: Path) -> None:
+    pytest.importorskip("zstandard")
+    from backend.backup import COMPRESSED_SUFFIX, create_backup, list_backups, restore_backup
+
+    path = create_backup(manual=False)
+    assert path is not None and path.endswith(COMPRESSED_SUFFIX)
+    assert not os.path.exists(path[: -len(".zst")])
+    assert list_backups(details=False) == [os.path.basename(path)]
+    assert _read_backup_values(Path(path), tmp_path) == ["original"]
+
+    conn = sqlite3.connect(backup_env)
+    conn.execute("UPDATE t SET v = 'changed'")
+    conn.commit()
+    conn.close()
+
+    assert restore_backup(os.path.basename(path)) is True
+    assert _read_values(backup_env) == ["original"]
+
+
+def test_failed_compression_keeps_raw_backup(backup_env: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import types
+
+    from backend import backup as backup_module
+
+    targets: list[str] = []
+
+    class _FailingCompressor:
+        def __init__(self, **kwargs) -> None:
+            pass
+
+        def copy_stream(self, src, dst, write_size: int) -> None:
+            targets.append(dst.name)
+            dst.write(b"partial")
+            raise OSError("disk full")
+
+    monkeypatch.setattr(backup_module, "zstandard", types.SimpleNamespace(ZstdCompressor=_FailingCompressor))
+
+    assert backup_module.create_backup(manual=True) is None
+    names = sorted(os.listdir(backup_module.get_backup_dir()))
+    # 压缩失败时不留下半成品 .zst，已落盘的原始备份保留
+    assert len(names) == 1 and names[0].endswith(backup_module.BACKUP_SUFFIX)
+    assert _read_values(Path(backup_module.get_backup_dir()) / names[0]) == ["original"]
+    # 压缩输出先写临时文件，崩溃时最终文件名下不会出现截断的 .zst
+    assert len(targets) == 1 and targets[0].endswith(backup_module.COMPRESSED_SUFFIX + ".tmp")
+
+
+def test_backup_config_follows_reload_config(backup_env: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from backend.backup import create_backup, is_backup_supported
+    from backend.config import reload_config
+
+    assert is_backup_supported() is True
+    other_dir = tmp_path / "other_backups"
+    monkeypatch.setenv("BACKUP_DIR", str(other_dir))
+    reload_config()
+    path = create_backup(manual=True)
+    assert path is not None and Path(path).parent == other_dir
+
+    monkeypatch.setenv("BACKUP_ENABLED", "0")
+    reload_config()
+    assert is_backup_supported() is False
@@ -0,0 +1,567 @@
+from __future__ import annotations
+
+import pickle
+from dataclasses import dataclass
+from typing import Iterator
+
+import pytest
+import redis
+
+from backend.cache import cache_key_generator
+
+
+def test_cache_key_is_stable_and_kwargs_order_insensitive() -> None:
+    key = cache_key_generator([1], "a", limit=10, offset=0)
+    assert key == cache_key_generator([1], "a", offset=0, limit=10)
+    assert len(key) == 32
+    assert key != cache_key_generator([1], "b", limit=10, offset=0)
+    assert key != cache_key_generator([1], "a", limit=11, offset=0)
+
+
+def test_cache_key_inlines_short_primitive_arguments() -> None:
+    assert cache_key_generator(42) == "i:42"
+    assert cache_key_generator("42") == "s2:42"
+    assert cache_key_generator(1, None, user_id=7) == "i:1|n:|user_id=i:7"
+    assert len({cache_key_generator(v) for v in (1, True, 1.0, "1")}) == 4
+    assert cache_key_generator("a|s1:b") != cache_key_generator("a", "b")
+    # 过长的参数回退到哈希
+    assert len(cache_key_generator("x" * 200)) == 32
+
+
+def test_cache_key_canonicalizes_dicts_and_sets() -> None:
+    assert cache_key_generator({"a": 1, "b": {"x": 1, "y": 2}}) == cache_key_generator(
+        {"b": {"y": 2, "x": 1}, "a": 1}
+    )
+    assert cache_key_generator({3, 1, 2}) == cache_key_generator({1, 2, 3})
+    assert cache_key_generator({1, 2}) != cache_key_generator([1, 2])
+    assert cache_key_generator({1, "a"}) == cache_key_generator({"a", 1})
+
+
+def test_cache_key_accepts_arbitrary_objects() -> None:
+    class Point:
+        def __init__(self, x: int) -> None:
+            self.x = x
+
+        def __repr__(self) -> str:
+            return f"Point({self.x})"
+
+    assert cache_key_generator(Point(1)) == cache_key_generator(Point(1))
+    assert cache_key_generator(Point(1)) != cache_key_generator(Point(2))
+    assert cache_key_generator(2**80) != cache_key_generator(2**80 + 1)
+
+
+def test_serialize_roundtrip_preserves_types() -> None:
+    from backend.cache import _deserialize, _serialize
+
+    for value in ("123", "hello", 5, 1.5, True, b"\x00raw", {"a": [1, 2, None]}, [{"x": "y"}]):
+        restored = _deserialize(_serialize(value))
+        assert restored == value
+        assert type(restored) is type(value)
+
+
+@dataclass
+class _Row:
+    id: int
+
+
+def test_serialize_roundtrip_preserves_non_json_types() -> None:
+    import datetime
+    import uuid
+
+    from backend.cache import _FMT_PICKLE, _deserialize, _serialize
+
+    now = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    values = [
+        (1, "a"),
+        {"created_at": now, "pair": (1, 2)},
+        [now, datetime.date(2024, 1, 2)],
+        {"id": uuid.UUID(int=1)},
+        {1: "int key"},
+        [float("nan"), 2**80],
+    ]
+    for value in values:
+        encoded = _serialize(value)
+        assert encoded[:1] == _FMT_PICKLE
+        restored = _deserialize(encoded)
+        assert repr(restored) == repr(value)
+    assert _deserialize(_serialize({"t": (1, 2)}))["t"] == (1, 2)
+    assert type(_deserialize(_serialize({"at": now}))["at"]) is datetime.datetime
+    assert _deserialize(_serialize([_Row(1)])) == [_Row(1)]
+
+
+def test_deserialize_legacy_untagged_values() -> None:
+    from backend.cache import _deserialize
+
+    assert _deserialize(b'{"a": 1}') == {"a": 1}
+    assert _deserialize(pickle.dumps({1, 2})) == {1, 2}
+    assert _deserialize(b"plain text") == "plain text"
+
+
+class FakeRedis:
+    """覆盖 RedisCache 用到的命令的内存实现。"""
+
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.calls: list[str] = []
+        self.eval_enabled = True
+        self.info_sections = {
+            "stats": {"keyspace_hits": 3, "keyspace_misses": 1, "total_commands_processed": 10},
+            "memory": {"used_memory_human": "1.00M"},
+            "clients": {"connected_clients": 2},
+        }
+
+    def ping(self) -> bool:
+        self.calls.append("ping")
+        return True
+
+    def get(self, key: str):
+        self.calls.append("get")
+        return self.store.get(key)
+
+    def mget(self, keys):
+        self.calls.append("mget")
+        return [self.store.get(k) for k in keys]
+
+    def getex(self, key: str, ex: int):
+        self.calls.append("getex")
+        return self.store.get(key)
+
+    def setex(self, key: str, ttl: int, value: bytes) -> bool:
+        self.calls.append("setex")
+        self.store[key] = value
+        return True
+
+    def set(self, key: str, value: bytes, ex: int, nx: bool = False):
+        self.calls.append("set_nx" if nx else "set")
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def scan_iter(self, match: str, count: int):
+        self.calls.append("scan")
+        prefix = match.rstrip("*")
+        return iter([k for k in list(self.store) if k.startswith(prefix)])
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def register_script(self, source: str):
+        def script(keys=(), args=()):
+            self.calls.append("evalsha")
+            if not self.eval_enabled:
+                raise redis.ResponseError("unknown command 'EVALSHA'")
+            cursor, pattern = int(args[0]), args[1]
+            keys = [k for k in list(self.store) if k.startswith(pattern.rstrip("*"))]
+            # 每次调用只扫描两个键，模拟多轮游标
+            batch = keys[:2]
+            for k in batch:
+                del self.store[k]
+            return [b"0" if len(keys) <= 2 else str(cursor + 1).encode(), len(batch)]
+
+        return script
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.ops: list[tuple] = []
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self.ops.append(("setex", key, value))
+
+    def unlink(self, *keys: str) -> None:
+        self.ops.append(("unlink", keys))
+
+    def info(self, section: str) -> None:
+        self.ops.append(("info", section))
+
+    def execute(self) -> list:
+        self.client.calls.append("pipeline")
+        results: list = []
+        for op in self.ops:
+            if op[0] == "setex":
+                self.client.store[op[1]] = op[2]
+                results.append(True)
+            elif op[0] == "info":
+                results.append(self.client.info_sections[op[1]])
+            else:
+                results.append(sum(self.client.store.pop(k, None) is not None for k in op[1]))
+        self.ops = []
+        return results
+
+
+@pytest.fixture()
+def fake_cache() -> Iterator[FakeRedis]:
+    from backend import cache as cache_module
+
+    client = FakeRedis()
+    instance = cache_module.RedisCache()
+    instance._client = client
+    instance._connected = True
+    cache_module.reset_cache()
+    cache_module._cache_instance = instance
+    yield client
+    cache_module.reset_cache()
+
+
+def test_cached_batch_only_computes_misses(fake_cache: FakeRedis) -> None:
+    from backend.cache import cached_batch
+
+    computed: list[list[int]] = []
+
+    @cached_batch(ttl=60)
+    def square(items: list[int]) -> list[int]:
+        computed.append(list(items))
+        return [i * i for i in items]
+
+    assert square([1, 2, 3]) == [1, 4, 9]
+    assert square([3, 4, 1]) == [9, 16, 1]
+    assert computed == [[1, 2, 3], [4]]
+    assert fake_cache.calls.count("mget") == 2
+    assert fake_cache.calls.count("pipeline") == 2
+    assert "setex" not in fake_cache.calls
+
+
+def test_clear_pattern_unlinks_in_pipelined_batches(
+    fake_cache: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from backend import cache as cache_module
+
+    monkeypatch.setattr(cache_module, "CLEAR_BATCH_SIZE", 3)
+    monkeypatch.setattr(cache_module, "CLEAR_PIPELINE_BATCHES", 2)
+    fake_cache.eval_enabled = False
+    for i in range(10):
+        fake_cache.store[f"cache:x:{i}"] = b"v"
+    fake_cache.store["other"] = b"v"
+
+    assert cache_module.get_cache().clear_pattern("cache:*") == 10
+    assert list(fake_cache.store) == ["other"]
+    # 4 批 UNLINK，每 2 批执行一次管道
+    assert fake_cache.calls.count("pipeline") == 2
+    # EVAL 不可用后不再尝试脚本
+    fake_cache.store["cache:y"] = b"v"
+    assert cache_module.get_cache().clear_pattern("cache:*") == 1
+    assert fake_cache.calls.count("evalsha") == 1
+
+
+def test_clear_pattern_runs_server_side_script(fake_cache: FakeRedis) -> None:
+    from backend.cache import get_cache
+
+    for i in range(5):
+        fake_cache.store[f"cache:x:{i}"] = b"v"
+    fake_cache.store["other"] = b"v"
+
+    assert get_cache().clear_pattern("cache:*") == 5
+    assert list(fake_cache.store) == ["other"]
+    assert fake_cache.calls.count("evalsha") == 3
+    assert "scan" not in fake_cache.calls and "pipeline" not in fake_cache.calls
+
+
+def test_is_connected_pings_at_most_once_per_interval(fake_cache: FakeRedis) -> None:
+    from backend.cache import get_cache
+
+    cache = get_cache()
+    cache.set("k", {"v": 1})
+    assert cache.get("k") == {"v": 1}
+    assert cache.get("missing", default="d") == "d"
+    assert fake_cache.calls.count("ping") == 1
+
+    cache._last_ping_ts -= 2.0
+    cache.get("k")
+    assert fake_cache.calls.count("ping") == 2
+
+
+def test_get_cache_returns_singleton_until_reset() -> None:
+    from backend.cache import get_cache, reset_cache
+
+    reset_cache()
+    try:
+        first = get_cache()
+        assert get_cache() is first
+        reset_cache()
+        assert get_cache() is not first
+    finally:
+        reset_cache()
+
+
+class ZeroCopyBytes(bytearray):
+    """以 PickleBuffer 导出数据的 bytearray（PEP 574 示例）。"""
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return type(self)._reconstruct, (pickle.PickleBuffer(self),), None
+        return type(self), (bytearray(self),), None
+
+    @classmethod
+    def _reconstruct(cls, obj):
+        with memoryview(obj) as m:
+            return cls(m)
+
+
+def test_large_buffers_pickled_out_of_band() -> None:
+    from backend.cache import PICKLE_OOB_MIN_BYTES, _FMT_PICKLE, _FMT_PICKLE_OOB, _deserialize, _serialize
+
+    big = {"blob": ZeroCopyBytes(b"ab" * PICKLE_OOB_MIN_BYTES), "n": {1, 2}}
+    encoded = _serialize(big)
+    assert encoded[:1] == _FMT_PICKLE_OOB
+    assert _deserialize(encoded) == big
+
+    small = {"blob": ZeroCopyBytes(b"ab"), "n": {1}}
+    encoded = _serialize(small)
+    assert encoded[:1] == _FMT_PICKLE
+    assert _deserialize(encoded) == small
+
+
+class FakeAsyncRedis:
+    def __init__(self) -> None:
+        self.sync = FakeRedis()
+        self.down = False
+
+    def _check(self) -> None:
+        if self.down:
+            import redis
+
+            raise redis.ConnectionError("connection refused")
+
+    async def ping(self) -> bool:
+        self._check()
+        return self.sync.ping()
+
+    async def get(self, key: str):
+        self._check()
+        return self.sync.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int, nx: bool = False):
+        self._check()
+        return self.sync.set(key, value, ex=ex, nx=nx)
+
+    async def mget(self, keys: list[str]):
+        self.sync.calls.append("mget")
+        self._check()
+        return [self.sync.store.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = False) -> "FakeAsyncPipeline":
+        return FakeAsyncPipeline(self)
+
+
+class FakeAsyncPipeline:
+    def __init__(self, client: FakeAsyncRedis) -> None:
+        self.client = client
+        self.items: list[tuple[str, bytes]] = []
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self.items.append((key, value))
+
+    async def execute(self) -> list[bool]:
+        self.client.sync.calls.append("execute")
+        self.client._check()
+        self.client.sync.store.update(self.items)
+        return [True] * len(self.items)
+
+
+def test_cached_coroutine_uses_async_client() -> None:
+    import asyncio
+
+    from backend import cache as cache_module
+
+    calls: list[int] = []
+
+    @cache_module.cached(ttl=60)
+    async def double(x: int) -> dict:
+        calls.append(x)
+        return {"value": x * 2}
+
+    async def run() -> FakeAsyncRedis:
+        client = FakeAsyncRedis()
+        instance = cache_module.AsyncRedisCache()
+        instance._client = client
+        instance._connected = True
+        cache_module._async_caches[asyncio.get_running_loop()] = instance
+        assert await double(2) == {"value": 4}
+        assert await double(2) == {"value": 4}
+        return client
+
+    cache_module.reset_cache()
+    try:
+        client = asyncio.run(run())
+    finally:
+        cache_module.reset_cache()
+    assert calls == [2]
+    assert client.sync.calls.count("get") == 2
+    assert client.sync.calls.count("set_nx") == 1
+
+
+def test_large_values_compressed_when_zstandard_available() -> None:
+    from backend import cache as cache_module
+
+    value = {"rows": [{"id": i, "name": "gas"} for i in range(1000)]}
+    encoded = cache_module._serialize(value)
+    if cache_module.zstandard is not None:
+        assert encoded[:1] == cache_module._FMT_ZSTD
+        assert len(encoded) < cache_module.CACHE_COMPRESS_MIN_BYTES
+    assert cache_module._deserialize(encoded) == value
+    assert cache_module._serialize(b"x" * 10000)[:1] == cache_module._FMT_RAW
+
+
+def test_cached_sliding_refreshes_ttl_on_hit(fake_cache: FakeRedis) -> None:
+    from backend.cache import cached
+
+    @cached(ttl=30, sliding=True)
+    def lookup(x: int) -> int:
+        return x + 1
+
+    assert lookup(1) == 2
+    assert lookup(1) == 2
+    assert fake_cache.calls.count("getex") == 2
+    assert fake_cache.calls.count("set_nx") == 1
+    assert "get" not in fake_cache.calls
+
+
+def test_set_nx_keeps_existing_value(fake_cache: FakeRedis) -> None:
+    from backend.cache import get_cache
+
+    cache = get_cache()
+    assert cache.set("k", "first") is True
+    assert cache.set("k", "second", nx=True) is False
+    assert cache.get("k") == "first"
+
+
+def test_cached_skips_none_and_empty_results_by_default(fake_cache: FakeRedis) -> None:
+    from backend.cache import cached
+
+    calls: list[int] = []
+
+    @cached(ttl=30)
+    def lookup(x: int):
+        calls.append(x)
+        return {0: None, 1: [], 2: ""}.get(x, x)
+
+    @cached(ttl=30, cache_none=True, cache_empty=True)
+    def lookup_all(x: int):
+        calls.append(x)
+        return None if x == 0 else []
+
+    for x in (0, 1, 2, 3):
+        lookup(x)
+        lookup(x)
+    assert calls == [0, 0, 1, 1, 2, 2, 3]
+
+    calls.clear()
+    for x in (0, 1):
+        assert lookup_all(x) == (None if x == 0 else [])
+        lookup_all(x)
+    assert calls == [0, 1]
+
+
+def test_cached_uses_prefixed_bytes_keys(fake_cache: FakeRedis) -> None:
+    from backend.cache import _cache_key_bytes, cache_key_generator, cached
+
+    @cached(ttl=30, key_prefix="t")
+    def lookup(x: object) -> int:
+        return 1
+
+    lookup(5)
+    lookup({"a": [1, 2]})
+    prefix = f"cache:t:{__name__}:lookup:".encode()
+    assert list(fake_cache.store) == [
+        prefix + b"i:5",
+        prefix + cache_key_generator({"a": [1, 2]}).encode(),
+    ]
+    assert _cache_key_bytes(({"a": [1, 2]},), {}).decode() == cache_key_generator({"a": [1, 2]})
+
+
+def test_get_stats_reads_info_sections_in_one_round_trip(fake_cache: FakeRedis) -> None:
+    from backend.cache import get_cache
+
+    stats = get_cache().get_stats()
+    assert stats == {
+        "connected": True,
+        "used_memory": "1.00M",
+        "connected_clients": 2,
+        "total_commands_processed": 10,
+        "keyspace_hits": 3,
+        "keyspace_misses": 1,
+        "hit_rate": 0.75,
+    }
+    assert fake_cache.calls.count("pipeline") == 1
+
+
+def test_async_cache_reconnects_after_connection_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    import asyncio
+
+    from backend import cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "_monotonic", lambda: now[0])
+    calls: list[int] = []
+
+    @cache_module.cached(ttl=60)
+    async def double(x: int) -> dict:
+        calls.append(x)
+        return {"value": x * 2}
+
+    async def run() -> None:
+        client = FakeAsyncRedis()
+        instance = cache_module.AsyncRedisCache()
+        instance._client = client
+        instance._connected = True
+        instance._last_ping_ts = now[0]
+        cache_module._async_caches[asyncio.get_running_loop()] = instance
+
+        await double(2)
+        client.down = True
+        for _ in range(3):
+            await double(2)
+        assert instance._connected is False
+        assert len(calls) == 4
+
+        # Redis 恢复后，PING_INTERVAL 到期时重连，之后重新命中缓存
+        client.down = False
+        now[0] += cache_module.PING_INTERVAL
+        for _ in range(4):
+            assert await double(2) == {"value": 4}
+        assert instance._connected is True
+        assert len(calls) == 4
+
+    cache_module.reset_cache()
+    try:
+        asyncio.run(run())
+    finally:
+        cache_module.reset_cache()
+
+
+def test_async_cache_batch_paths_reconnect(monkeypatch: pytest.MonkeyPatch) -> None:
+    import asyncio
+
+    from backend import cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "_monotonic", lambda: now[0])
+
+    async def run() -> None:
+        client = FakeAsyncRedis()
+        instance = cache_module.AsyncRedisCache()
+        instance._client = client
+        instance._connected = True
+        instance._last_ping_ts = now[0]
+
+        assert await instance.mset_ex([("a", 1), ("b", {"x": 2})]) is True
+        client.down = True
+        assert await instance.mget(["a", "b"], default="miss") == ["miss", "miss"]
+        assert instance._connected is False
+
+        # 断开期间（PING_INTERVAL 内）批量读写直接降级为未命中，不再访问 Redis
+        calls = len(client.sync.calls)
+        assert await instance.mset_ex([("c", 3)]) is False
+        assert await instance.mget(["a"]) == [None]
+        assert len(client.sync.calls) == calls
+
+        # Redis 恢复且 PING_INTERVAL 到期后，批量路径同样会重连
+        client.down = False
+        now[0] += cache_module.PING_INTERVAL
+        assert await instance.mget(["a", "b"]) == [1, {"x": 2}]
+        assert instance._connected is True
+        assert await instance.mset_ex([("c", 3)]) is True
+
+    asyncio.run(run())
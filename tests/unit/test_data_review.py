@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import pytest
+
+
+def _insert(records: list[dict]) -> None:
+    from backend.database import batch_create_records
+
+    batch_create_records(records)
+
+
+def _count(table: str) -> int:
+    from backend.db import get_connection
+
+    with get_connection(dict_cursor=True) as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT COUNT(*) as n FROM {table}")
+        return cur.fetchone()["n"]
+
+
+def test_move_duplicates_to_review(reset_databases: None, sample_record: dict) -> None:
+    from backend.data_review import get_pending_groups, move_duplicates_to_review
+
+    other = dict(sample_record, temperature=320.0)
+    _insert(
+        [dict(sample_record, pressure=p) for p in (10.0, 11.0, 12.0)]
+        + [dict(other, pressure=p) for p in (5.0, 6.0)]
+        + [dict(sample_record, temperature=340.0)]
+    )
+
+    assert move_duplicates_to_review() == {"moved": 5, "groups": 2}
+    assert _count("gas_mixture") == 1
+    assert _count("pending_review") == 5
+
+    groups = get_pending_groups()["groups"]
+    assert [g["group_id"] for g in groups] == ["G0001", "G0002"]
+    by_temp = {g["temperature"]: g for g in groups}
+    assert [p["pressure"] for p in by_temp[300.0]["pressures"]] == [10.0, 11.0, 12.0]
+    assert by_temp[320.0]["composition"]["x_ch4"] == sample_record["x_ch4"]
+    assert all(p["original_id"] for g in groups for p in g["pressures"])
+
+
+def test_move_high_pressure_to_review(reset_databases: None, sample_record: dict) -> None:
+    from backend.data_review import get_pending_stats, move_high_pressure_to_review
+
+    assert get_pending_stats() == {
+        "pending_groups": 0,
+        "pending_records": 0,
+        "approved": 0,
+        "rejected": 0,
+    }
+    _insert(
+        [dict(sample_record, pressure=p) for p in (10.0, 60.0, 70.0)]
+        + [dict(sample_record, temperature=320.0, pressure=80.0)]
+    )
+
+    result = move_high_pressure_to_review(threshold=50.0)
+    assert result == {"moved": 3, "groups": 2, "threshold": 50.0}
+    assert _count("gas_mixture") == 1
+    assert get_pending_stats() == {
+        "pending_groups": 2,
+        "pending_records": 3,
+        "approved": 0,
+        "rejected": 0,
+    }
+
+
+def test_find_duplicates_preserves_full_pressure_precision(
+    reset_databases: None, sample_record: dict
+) -> None:
+    from backend.data_review import find_duplicate_pressure_records, move_duplicates_to_review
+    from backend.db import get_connection
+
+    pressures = [0.1 + 0.2, 1 / 3]
+    _insert([dict(sample_record, pressure=p) for p in pressures])
+
+    (group,) = find_duplicate_pressure_records()
+    assert sorted(group["pressures"]) == sorted(pressures)
+
+    move_duplicates_to_review()
+    with get_connection(dict_cursor=True) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT pressure FROM pending_review ORDER BY pressure")
+        assert [r["pressure"] for r in cur.fetchall()] == sorted(pressures)
+
+
+def test_next_group_number_ignores_non_numeric_ids(reset_databases: None) -> None:
+    from backend.data_review import _get_next_group_number
+    from backend.db import get_connection
+
+    with get_connection(dict_cursor=True) as conn:
+        cur = conn.cursor()
+        assert _get_next_group_number(cur) == 1
+        cur.executemany(
+            "INSERT INTO pending_review (group_id, temperature, pressure) VALUES (?, 300, 1)",
+            [("G0009",), ("G12",), ("G",), ("G12a",), ("g99",), ("X100",)],
+        )
+        assert _get_next_group_number(cur) == 13
+
+
+def test_approve_group_moves_selected_records_back(
+    reset_databases: None, sample_record: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from backend import data_review
+    from backend.data_review import (
+        approve_group,
+        get_pending_groups,
+        get_pending_stats,
+        move_duplicates_to_review,
+    )
+    from backend.database import get_record_by_id
+    from backend.db import get_connection
+
+    # 每批一行，覆盖多批 INSERT ... RETURNING
+    monkeypatch.setattr(data_review, "APPROVE_INSERT_BATCH_SIZE", 1)
+    _insert([dict(sample_record, pressure=p) for p in (10.0, 11.0, 12.0)])
+    move_duplicates_to_review()
+    (group,) = get_pending_groups()["groups"]
+    keep = [p["id"] for p in group["pressures"][:2]]
+
+    assert approve_group(group["group_id"], keep, username="admin") == {
+        "approved": 2,
+        "group_id": group["group_id"],
+    }
+    assert get_pending_stats()["approved"] == 2
+    assert get_pending_stats()["rejected"] == 1
+
+    with get_connection(dict_cursor=True) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT approved_record_id, pressure FROM pending_review WHERE status = 'approved'")
+        approved = cur.fetchall()
+    for row in approved:
+        record = get_record_by_id(row["approved_record_id"])
+        assert record is not None and record["pressure"] == row["pressure"]
+        assert record["x_ch4"] == sample_record["x_ch4"]
+
+
+def test_restore_group_removes_approved_records(reset_databases: None, sample_record: dict) -> None:
+    from backend.data_review import (
+        approve_group,
+        get_pending_groups,
+        get_pending_stats,
+        move_duplicates_to_review,
+        restore_group,
+    )
+
+    _insert([dict(sample_record, pressure=p) for p in (10.0, 11.0)])
+    move_duplicates_to_review()
+    (group,) = get_pending_groups()["groups"]
+    approve_group(group["group_id"], [p["id"] for p in group["pressures"]])
+    assert _count("gas_mixture") == 2
+
+    assert restore_group(group["group_id"]) == {"restored": 2}
+    assert _count("gas_mixture") == 0
+    assert get_pending_stats()["pending_records"] == 2
+
+
+def test_pending_group_total_cached_until_review_changes(
+    reset_databases: None, sample_record: dict
+) -> None:
+    from backend.data_review import get_pending_groups, move_duplicates_to_review, reject_group
+    from backend.db import get_connection
+
+    _insert([dict(sample_record, pressure=p) for p in (10.0, 11.0)])
+    move_duplicates_to_review()
+    assert get_pending_groups(per_page=1)["total"] == 1
+
+    # 绕过模块直接写库：缓存期内总数不变
+    with get_connection(dict_cursor=True) as conn:
+        cur = conn.cursor()
+        cur.executemany(
+            "INSERT INTO pending_review (group_id, temperature, pressure) VALUES (?, 1, 1)",
+            [("G9998",), ("G9999",)],
+        )
+        conn.commit()
+    assert get_pending_groups(per_page=1, page=2)["total"] == 1
+
+    # 模块内的变更会使缓存失效
+    assert reject_group("G0001") is True
+    assert get_pending_groups(per_page=1)["total"] == 2
+
+
+def test_parse_ids_matches_for_short_and_long_lists() -> None:
+    from backend.data_review import NUMPY_PARSE_MIN_LEN, _parse_ids
+
+    assert _parse_ids("3,1,2") == [3, 1, 2]
+    ids = list(range(100000, 100000 + NUMPY_PARSE_MIN_LEN))
+    parsed = _parse_ids(",".join(map(str, ids)))
+    assert parsed == ids
+    assert all(type(i) is int for i in parsed)
+
+
+def test_move_high_pressure_numbers_groups_after_existing(
+    reset_databases: None, sample_record: dict
+) -> None:
+    from backend.data_review import (
+        get_pending_groups,
+        move_duplicates_to_review,
+        move_high_pressure_to_review,
+    )
+
+    _insert([dict(sample_record, pressure=p) for p in (10.0, 11.0)])
+    assert move_duplicates_to_review()["groups"] == 1
+
+    high = ((330.0, 60.0), (310.0, 70.0), (330.0, 90.0))
+    _insert([dict(sample_record, temperature=t, pressure=p) for t, p in high])
+    assert move_high_pressure_to_review(threshold=50.0)["groups"] == 2
+
+    groups = {g["group_id"]: g for g in get_pending_groups()["groups"]}
+    assert sorted(groups) == ["G0001", "G0002", "G0003"]
+    assert groups["G0002"]["temperature"] == 310.0
+    assert [p["pressure"] for p in groups["G0003"]["pressures"]] == [60.0, 90.0]
+
+
+def test_approve_group_per_row_insert_without_returning(
+    reset_databases: None, sample_record: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import sqlite3
+
+    from backend.data_review import approve_group, get_pending_groups, move_duplicates_to_review
+    from backend.database import get_record_by_id
+    from backend.db import get_connection
+
+    monkeypatch.setattr(sqlite3, "sqlite_version_info", (3, 34, 0))
+    _insert([dict(sample_record, pressure=p) for p in (10.0, 11.0)])
+    move_duplicates_to_review()
+    (group,) = get_pending_groups()["groups"]
+    assert approve_group(group["group_id"], [p["id"] for p in group["pressures"]])["approved"] == 2
+
+    with get_connection(dict_cursor=True) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT approved_record_id, pressure FROM pending_review")
+        rows = cur.fetchall()
+    assert sorted(get_record_by_id(r["approved_record_id"])["pressure"] for r in rows) == [10.0, 11.0]
+    assert all(get_record_by_id(r["approved_record_id"])["pressure"] == r["pressure"] for r in rows)
+
+
+def test_init_review_tables_skips_ddl_when_schema_current(
+    init_databases: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from backend import data_review
+
+    calls: list[str] = []
+    monkeypatch.setattr(data_review, "_ensure_index", lambda *args: calls.append("index"))
+
+    data_review.init_review_tables()
+    assert calls == []
+
+    monkeypatch.setattr(data_review, "REVIEW_SCHEMA_VERSION", data_review.REVIEW_SCHEMA_VERSION + 1)
+    data_review.init_review_tables()
+    assert calls
+    calls.clear()
+    data_review.init_review_tables()
+    assert calls == []
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import pytest
+
 from backend.data_validation import (
+    GAS_MIXTURE_RULES,
     PRESSURE_SOFT_MAX,
     clean_record,
     count_soft_warnings,
     get_soft_warnings,
+    validate_batch,
     validate_partial_record,
     validate_record,
 )
@@ -56,3 +60,182 @@ def test_count_soft_warnings(sample_record: dict) -> None:
     r2 = dict(sample_record)
     r2["pressure"] = PRESSURE_SOFT_MAX + 0.1
     assert count_soft_warnings([r1, r2]) == 1
+
+
+def test_validate_batch_vectorized_matches_per_record(sample_record: dict) -> None:
+    from backend import data_validation
+
+    variants = [
+        {},
+        {"temperature": 50.0},
+        {"pressure": None},
+        {"pressure": ""},
+        {"temperature": "abc"},
+        {"temperature": "300"},
+        {"x_ch4": 1.5, "x_c2h6": -0.1},
+        {"x_ch4": None},
+        {"x_ch4": 0.0, "x_c2h6": 0.0, "x_c3h8": 0.0, "x_co2": 0.0, "x_n2": 0.0},
+        {"x_ch4": 0.5},
+        {"x_n2": " "},
+        {"pressure": True},
+    ]
+    records = [dict(sample_record, **variants[i % len(variants)]) for i in range(120)]
+    assert len(records) >= data_validation.VECTORIZE_MIN_ROWS
+
+    result = validate_batch(records)
+    expected = [
+        {"row": idx + 1, "errors": validate_record(r)[1]}
+        for idx, r in enumerate(records)
+        if not validate_record(r)[0]
+    ]
+    assert result["valid_count"] == len(records) - len(expected)
+    assert result["invalid_count"] == len(expected)
+    assert result["errors"] == expected[:50]
+
+
+def test_default_rule_plan_matches_generic_rules(sample_record: dict) -> None:
+    variants = [
+        {},
+        {"temperature": None, "pressure": 20000.0},
+        {"temperature": 5000, "pressure": "  "},
+        {"temperature": "x", "x_ch4": "1.2", "x_n2": []},
+        {"x_ch4": -0.5, "x_h2s": ""},
+        {"pressure": "12.5"},
+    ]
+    for variant in variants:
+        record = dict(sample_record, **variant)
+        assert validate_record(record) == validate_record(record, GAS_MIXTURE_RULES)
+        partial = dict(variant)
+        assert validate_partial_record(partial) == validate_partial_record(partial, GAS_MIXTURE_RULES)
+
+
+def test_violation_mask_loop_matches_numpy() -> None:
+    np = pytest.importorskip("numpy")
+    from backend import _validate_kernel as kernel
+    from backend.data_validation import _BATCH_LOWER, _BATCH_UPPER, SUM_HARD_TOLERANCE
+
+    rng = np.random.default_rng(0)
+    arr = rng.uniform(-0.2, 1.2, (500, 9))
+    arr[:, 0] *= 1000
+    arr[:, 1] *= 12000
+    arr[::7, 2:] = 0.0
+    arr[::11, 3] = np.nan
+    args = (arr, np.array(_BATCH_LOWER), np.array(_BATCH_UPPER), SUM_HARD_TOLERANCE)
+
+    expected = kernel._violation_mask_numpy(*args)
+    assert (kernel._violation_mask_loop(*args) == expected).all()
+    assert (kernel.violation_mask(*args) == expected).all()
+    assert expected[0] == (
+        (kernel.TEMPERATURE_OUT if not 100 <= arr[0, 0] <= 1000 else 0)
+        | (kernel.PRESSURE_OUT if not 0 <= arr[0, 1] <= 10000 else 0)
+        | (kernel.FRACTION_OUT if ((arr[0, 2:] < 0) | (arr[0, 2:] > 1)).any() else 0)
+        | (kernel.SUM_OUT if abs(sum(arr[0, 2:]) - 1.0) > SUM_HARD_TOLERANCE else 0)
+    )
+
+
+@pytest.mark.parametrize(
+    "bounds", [(0, 1), (0, None), (None, 1), (None, None)]
+)
+def test_mk_range_matches_validate_range(bounds: tuple) -> None:
+    from backend.data_validation import _mk_range, validate_range
+
+    in_range = _mk_range(*bounds)
+    for value in (-1, 0, 0.5, 1, 2, "0.3", "abc", float("nan"), [1]):
+        try:
+            ok = in_range(value)
+        except (ValueError, TypeError):
+            ok = False
+        assert ok == validate_range(value, *bounds)
+
+
+def test_validate_batch_reuses_results_for_identical_rows(sample_record: dict) -> None:
+    from backend.data_validation import _validate_values
+
+    _validate_values.cache_clear()
+    bad = dict(sample_record, temperature=50.0)
+    records = [dict(bad), dict(bad), dict(sample_record), dict(sample_record, x_n2=[0.1])]
+
+    result = validate_batch(records)
+    assert [e["row"] for e in result["errors"]] == [1, 2, 4]
+    assert result["errors"][0]["errors"] == validate_record(bad)[1]
+    assert result["errors"][0]["errors"] is not result["errors"][1]["errors"]
+    info = _validate_values.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_clean_batch_coerces_each_field() -> None:
+    from backend.data_validation import BATCH_FIELDS, clean_batch
+
+    np = pytest.importorskip("numpy")
+    values = [2.5, "  3 ", "1_000", "abc", None, " ", True, np.float64(0.25), [1]]
+    (cleaned,) = clean_batch([dict(zip(BATCH_FIELDS, values))])
+    assert list(cleaned) == list(BATCH_FIELDS)
+    assert list(cleaned.values()) == [2.5, 3.0, 1000.0, 0.0, 0.0, 0.0, 1.0, 0.25, 0.0]
+    assert all(type(v) is float for v in cleaned.values())
+
+
+def test_validate_and_warn_batch_matches_separate_passes(sample_record: dict) -> None:
+    from backend.data_validation import validate_and_warn_batch
+
+    records = [
+        dict(sample_record),
+        dict(sample_record, pressure=PRESSURE_SOFT_MAX + 5),
+        dict(sample_record, x_ch4=sample_record["x_ch4"] + 0.03),
+        dict(sample_record, pressure="15", x_ch4=sample_record["x_ch4"] - 0.04),
+        dict(sample_record, temperature=None),
+        dict(sample_record, x_ch4=sample_record["x_ch4"] + 0.2),
+        dict(sample_record, x_n2="abc"),
+    ]
+    result = validate_and_warn_batch(records)
+
+    valid = [r for r in records if validate_record(r)[0]]
+    assert result["valid_records"] == valid
+    assert result["errors"] == [
+        {"index": i, "errors": validate_record(r)[1]}
+        for i, r in enumerate(records)
+        if not validate_record(r)[0]
+    ]
+    assert result["warnings"] == [
+        {"index": i, "warnings": get_soft_warnings(r)}
+        for i, r in enumerate(records)
+        if validate_record(r)[0] and get_soft_warnings(r)
+    ]
+    assert result["pressure_warning_count"] == count_soft_warnings(valid) == 2
+
+
+def test_validate_pattern_reuses_compiled_pattern() -> None:
+    from backend.data_validation import _compile_pattern, validate_pattern
+
+    _compile_pattern.cache_clear()
+    assert validate_pattern("AB12", r"[A-Z]+\d+") is True
+    assert validate_pattern(123, r"\d+$") is True
+    assert validate_pattern("x12", r"[A-Z]+\d+") is False
+    assert _compile_pattern.cache_info().hits == 1
+
+
+def test_validation_rule_is_frozen_and_slotted() -> None:
+    import dataclasses
+
+    rule = GAS_MIXTURE_RULES[0]
+    assert not hasattr(rule, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        rule.field = "pressure"  # type: ignore[misc]
+
+
+def test_validate_partial_record_reports_errors_in_rule_order() -> None:
+    ok, errors = validate_partial_record({"x_n2": 2.0, "unknown": "x", "temperature": 5.0})
+    assert ok is False
+    assert errors == [
+        "第temperature列: 温度必须在 100-1000 K 范围内",
+        "第x_n2列: N2 摩尔分数必须在 0-1 范围内",
+    ]
+
+
+def test_to_float_handles_empty_and_numeric_values() -> None:
+    from backend.data_validation import _to_float
+
+    value = 0.25
+    assert _to_float(value) is value
+    assert [_to_float(v) for v in (None, "", 0, False, "1.5", 2, True)] == [0.0, 0.0, 0.0, 0.0, 1.5, 2.0, 1.0]
+    with pytest.raises(ValueError):
+        _to_float(" ")
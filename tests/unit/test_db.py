@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+
+
+def _blocked_ips() -> list[str]:
+    from backend.db import open_security_connection
+
+    conn = open_security_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT ip_address FROM blocked_ips ORDER BY ip_address")
+        return [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def test_security_connection_rolls_back_failed_write(reset_databases: None) -> None:
+    from backend.db import get_security_connection
+
+    with pytest.raises(RuntimeError):
+        with get_security_connection() as conn:
+            conn.cursor().execute("INSERT INTO blocked_ips (ip_address) VALUES ('1.1.1.1')")
+            raise RuntimeError("boom")
+
+    # 同一线程随后的无关提交不能把失败调用的写入带出
+    with get_security_connection() as conn:
+        conn.cursor().execute("INSERT INTO blocked_ips (ip_address) VALUES ('2.2.2.2')")
+        conn.commit()
+
+    assert _blocked_ips() == ["2.2.2.2"]
+
+
+def test_nested_security_connection_keeps_outer_transaction(reset_databases: None) -> None:
+    from backend.db import get_security_connection
+
+    with get_security_connection() as outer:
+        outer.cursor().execute("INSERT INTO blocked_ips (ip_address) VALUES ('1.1.1.1')")
+        with get_security_connection() as inner:
+            assert inner._conn is not outer._conn
+            inner.cursor().execute("SELECT COUNT(*) FROM sessions")
+        outer.commit()
+
+    assert _blocked_ips() == ["1.1.1.1"]
+    # 嵌套时多建的连接不会留在池中：之后同一线程始终复用同一条连接
+    with get_security_connection() as first:
+        pooled = first._conn
+    with get_security_connection() as second:
+        assert second._conn is pooled
+
+
+def test_failed_security_write_in_caller_not_committed_later(reset_databases: None) -> None:
+    from backend.auth import _upsert_users
+    from backend.db import get_security_connection, open_security_connection
+
+    # 第二行违反 NOT NULL：executemany 已写入第一行后抛错
+    with pytest.raises(Exception):
+        _upsert_users([("alice", "hash", "user", True), ("bob", None, "user", True)])
+
+    with get_security_connection() as conn:
+        conn.cursor().execute("INSERT INTO blocked_ips (ip_address) VALUES ('3.3.3.3')")
+        conn.commit()
+
+    conn = open_security_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM user_accounts")
+        assert cur.fetchone()[0] == 0
+    finally:
+        conn.close()
+    assert _blocked_ips() == ["3.3.3.3"]